@@ -0,0 +1,110 @@
+"""
+Add per-company date indexes to production_records / rejected_modules and a unique
+(company_id, serial_number) key on rejected_modules
+Run this script to update the database schema (safe to re-run)
+
+Usage:
+    python add_company_report_indexes.py            # indexes; aborts listing duplicate rejections
+    python add_company_report_indexes.py --dedupe   # back up and remove duplicates, then add the key
+"""
+
+import sys
+from app import create_app
+from app.models.database import db
+from sqlalchemy import text
+
+INDEXES = (
+    ('production_records', 'idx_company_date', 'CREATE INDEX idx_company_date ON production_records (company_id, date)'),
+    ('rejected_modules', 'idx_company_rejection_date', 'CREATE INDEX idx_company_rejection_date ON rejected_modules (company_id, rejection_date)'),
+)
+
+BACKUP_TABLE = 'rejected_modules_duplicates_backup'
+LIST_LIMIT = 50
+
+# Every row of a (company_id, serial_number) group except the oldest (lowest id)
+DUPLICATE_ROWS = """
+    FROM rejected_modules newer
+    JOIN rejected_modules older
+      ON older.company_id = newer.company_id
+     AND older.serial_number = newer.serial_number
+     AND older.id < newer.id
+"""
+
+def index_exists(table, index_name):
+    result = db.session.execute(text("""
+        SELECT DISTINCT INDEX_NAME
+        FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND TABLE_NAME = :table
+        AND INDEX_NAME = :index_name
+    """), {'table': table, 'index_name': index_name})
+    return result.first() is not None
+
+def add_company_report_indexes(dedupe=False):
+    app = create_app()
+
+    with app.app_context():
+        try:
+            for table, index_name, ddl in INDEXES:
+                if not index_exists(table, index_name):
+                    print(f"Creating {index_name} index on {table}...")
+                    db.session.execute(text(ddl))
+                    db.session.commit()
+                    print(f"✅ {index_name} created")
+
+            if not index_exists('rejected_modules', 'uq_company_serial'):
+                # The unique key cannot be added while duplicates exist
+                groups = db.session.execute(text("""
+                    SELECT company_id, serial_number, COUNT(*) AS copies
+                    FROM rejected_modules
+                    GROUP BY company_id, serial_number
+                    HAVING COUNT(*) > 1
+                    ORDER BY company_id, serial_number
+                """)).fetchall()
+                if groups:
+                    print(f"⚠️  {len(groups)} serials are rejected more than once:")
+                    for company_id, serial_number, copies in groups[:LIST_LIMIT]:
+                        print(f"   company {company_id}  {serial_number}  ({copies} rows)")
+                    if len(groups) > LIST_LIMIT:
+                        print(f"   ... and {len(groups) - LIST_LIMIT} more")
+
+                    if not dedupe:
+                        print("\n❌ uq_company_serial not created. Review the rows above, then re-run with --dedupe")
+                        print(f"   to keep the oldest row of each serial (removed rows are copied to {BACKUP_TABLE})")
+                        return
+
+                    print(f"Backing up duplicate rows to {BACKUP_TABLE}...")
+                    db.session.execute(text(f"CREATE TABLE IF NOT EXISTS {BACKUP_TABLE} LIKE rejected_modules"))
+                    result = db.session.execute(text(f"""
+                        INSERT IGNORE INTO {BACKUP_TABLE}
+                        SELECT DISTINCT newer.* {DUPLICATE_ROWS}
+                    """))
+                    print(f"✅ {result.rowcount} rows backed up")
+
+                    print("Removing duplicate rejections (keeping the oldest row of each serial)...")
+                    result = db.session.execute(text(f"DELETE newer {DUPLICATE_ROWS}"))
+                    db.session.commit()
+                    print(f"✅ {result.rowcount} duplicate rows removed")
+
+                print("Creating uq_company_serial unique key on rejected_modules...")
+                db.session.execute(text("""
+                    ALTER TABLE rejected_modules
+                    ADD CONSTRAINT uq_company_serial UNIQUE (company_id, serial_number)
+                """))
+                db.session.commit()
+                print("✅ uq_company_serial created")
+
+            print("\n🎉 Migration completed successfully!")
+            print("\n📋 Summary:")
+            print("   - idx_company_date: production_records (company_id, date)")
+            print("   - idx_company_rejection_date: rejected_modules (company_id, rejection_date)")
+            print("   - uq_company_serial: rejected_modules UNIQUE (company_id, serial_number)")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {str(e)}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == '__main__':
+    add_company_report_indexes(dedupe='--dedupe' in sys.argv)
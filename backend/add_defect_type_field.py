@@ -0,0 +1,46 @@
+"""
+Add defect_type field to rejected_modules table
+Run this script to update the database schema
+"""
+
+from app import create_app
+from app.models.database import db
+from sqlalchemy import text
+
+def add_defect_type_field():
+    app = create_app()
+
+    with app.app_context():
+        try:
+            # Check if column already exists
+            result = db.session.execute(text("""
+                SELECT COLUMN_NAME
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_NAME = 'rejected_modules'
+                AND COLUMN_NAME = 'defect_type'
+            """))
+
+            if result.first() is not None:
+                print("✅ Column already exists! No migration needed.")
+                return
+
+            print("Adding defect_type column...")
+            db.session.execute(text("""
+                ALTER TABLE rejected_modules
+                ADD COLUMN defect_type VARCHAR(20) DEFAULT 'Minor'
+            """))
+            print("✅ defect_type column added")
+
+            db.session.commit()
+            print("\n🎉 Migration completed successfully!")
+            print("\n📋 Summary:")
+            print("   - defect_type: Minor / Major classification of a rejected module")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {str(e)}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == '__main__':
+    add_defect_type_field()
@@ -0,0 +1,99 @@
+"""
+Add serial_stem / serial_counter fields and the available-counter index to master_modules
+Run this script to update the database schema (backfill runs in id chunks and can be re-run)
+"""
+
+from app import create_app
+from app.models.database import db
+from app.models.master_data import MasterModule
+from app.services.serial_search import parse_serial
+from sqlalchemy import text, update
+
+BACKFILL_CHUNK = 10000
+
+def add_serial_counter_fields():
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            # Check if columns already exist
+            result = db.session.execute(text("""
+                SELECT COLUMN_NAME 
+                FROM INFORMATION_SCHEMA.COLUMNS 
+                WHERE TABLE_NAME = 'master_modules' 
+                AND COLUMN_NAME IN ('serial_stem', 'serial_counter')
+            """))
+            existing_columns = [row[0] for row in result]
+            
+            # Add serial_stem column
+            if 'serial_stem' not in existing_columns:
+                print("Adding serial_stem column...")
+                db.session.execute(text("""
+                    ALTER TABLE master_modules 
+                    ADD COLUMN serial_stem VARCHAR(100) NULL
+                """))
+                print("✅ serial_stem column added")
+            
+            # Add serial_counter column
+            if 'serial_counter' not in existing_columns:
+                print("Adding serial_counter column...")
+                db.session.execute(text("""
+                    ALTER TABLE master_modules 
+                    ADD COLUMN serial_counter BIGINT NULL
+                """))
+                print("✅ serial_counter column added")
+            
+            db.session.commit()
+            
+            # Composite index for "next N available from serial X"
+            result = db.session.execute(text("""
+                SELECT DISTINCT INDEX_NAME 
+                FROM INFORMATION_SCHEMA.STATISTICS 
+                WHERE TABLE_NAME = 'master_modules' 
+                AND INDEX_NAME = 'idx_order_available_counter'
+            """))
+            if result.first() is None:
+                print("Creating idx_order_available_counter index...")
+                db.session.execute(text("""
+                    CREATE INDEX idx_order_available_counter 
+                    ON master_modules (order_id, is_rejected, is_delivered, serial_counter)
+                """))
+                db.session.commit()
+                print("✅ idx_order_available_counter created")
+            
+            # Backfill in id chunks - only rows not parsed yet, so the script can resume
+            min_id, max_id = db.session.query(db.func.min(MasterModule.id), db.func.max(MasterModule.id)).one()
+            if min_id is not None:
+                print(f"Backfilling serial_stem / serial_counter for ids {min_id}..{max_id}...")
+                updated = 0
+                for start in range(min_id, max_id + 1, BACKFILL_CHUNK):
+                    rows = db.session.query(MasterModule.id, MasterModule.serial_number).filter(
+                        MasterModule.id.between(start, start + BACKFILL_CHUNK - 1),
+                        MasterModule.serial_stem.is_(None)
+                    ).all()
+                    if rows:
+                        params = []
+                        for module_id, serial in rows:
+                            stem, counter = parse_serial(serial)
+                            params.append({'id': module_id, 'serial_stem': stem, 'serial_counter': counter})
+                        # ORM bulk UPDATE by primary key (executemany)
+                        db.session.execute(update(MasterModule), params)
+                        db.session.commit()
+                        updated += len(rows)
+                    print(f"   ... up to id {min(start + BACKFILL_CHUNK - 1, max_id)} ({updated} updated)")
+                print("✅ Backfill complete")
+            
+            print("\n🎉 Migration completed successfully!")
+            print("\n📋 Summary:")
+            print("   - serial_stem: Serial without its trailing counter digits")
+            print("   - serial_counter: Trailing digits as a number (BIGINT)")
+            print("   - idx_order_available_counter: (order_id, is_rejected, is_delivered, serial_counter)")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {str(e)}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == '__main__':
+    add_serial_counter_fields()
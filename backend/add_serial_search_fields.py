@@ -0,0 +1,104 @@
+"""
+Add serial_reversed column, serial search indexes and the trigram table to master_modules
+Run this script to update the database schema
+
+Usage:
+    python add_serial_search_fields.py            # column + indexes + backfill
+    python add_serial_search_fields.py --ngrams   # also (re)build master_serial_ngrams
+"""
+
+import sys
+from app import create_app
+from app.models.database import db
+from app.models.master_data import MasterModule, MasterSerialNgram
+from app.services.serial_search import index_module_ngrams
+from sqlalchemy import text
+
+BACKFILL_CHUNK = 10000
+
+def add_serial_search_fields(build_ngrams=False):
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            # Check if column already exists
+            result = db.session.execute(text("""
+                SELECT COLUMN_NAME 
+                FROM INFORMATION_SCHEMA.COLUMNS 
+                WHERE TABLE_NAME = 'master_modules' 
+                AND COLUMN_NAME = 'serial_reversed'
+            """))
+            if result.first() is None:
+                print("Adding serial_reversed column...")
+                db.session.execute(text("""
+                    ALTER TABLE master_modules 
+                    ADD COLUMN serial_reversed VARCHAR(100) NULL
+                """))
+                db.session.commit()
+                print("✅ serial_reversed column added")
+            else:
+                print("✅ serial_reversed column already exists")
+            
+            # Indexes
+            result = db.session.execute(text("""
+                SELECT DISTINCT INDEX_NAME 
+                FROM INFORMATION_SCHEMA.STATISTICS 
+                WHERE TABLE_NAME = 'master_modules'
+            """))
+            existing_indexes = [row[0] for row in result]
+            for index_name, columns in (('idx_order_serial', 'order_id, serial_number'),
+                                        ('idx_order_serial_reversed', 'order_id, serial_reversed')):
+                if index_name not in existing_indexes:
+                    print(f"Creating index {index_name}...")
+                    db.session.execute(text(f"CREATE INDEX {index_name} ON master_modules ({columns})"))
+                    db.session.commit()
+                    print(f"✅ {index_name} created")
+            
+            # Backfill reversed serials in id chunks (short transactions, no long table lock)
+            min_id, max_id = db.session.query(db.func.min(MasterModule.id), db.func.max(MasterModule.id)).one()
+            if min_id is not None:
+                print(f"Backfilling serial_reversed for ids {min_id}..{max_id}...")
+                for start in range(min_id, max_id + 1, BACKFILL_CHUNK):
+                    db.session.execute(text("""
+                        UPDATE master_modules 
+                        SET serial_reversed = REVERSE(serial_number) 
+                        WHERE id BETWEEN :start AND :end AND serial_reversed IS NULL
+                    """), {'start': start, 'end': start + BACKFILL_CHUNK - 1})
+                    db.session.commit()
+                    print(f"   ... up to id {min(start + BACKFILL_CHUNK - 1, max_id)}")
+                print("✅ serial_reversed backfilled")
+            
+            MasterSerialNgram.__table__.create(db.engine, checkfirst=True)
+            print("✅ master_serial_ngrams table ready")
+            
+            if build_ngrams and min_id is not None:
+                print("Rebuilding serial trigram index...")
+                db.session.execute(MasterSerialNgram.__table__.delete())
+                db.session.commit()
+                for start in range(min_id, max_id + 1, BACKFILL_CHUNK):
+                    rows = db.session.query(MasterModule.order_id, MasterModule.id, MasterModule.serial_number).filter(
+                        MasterModule.id.between(start, start + BACKFILL_CHUNK - 1)
+                    ).all()
+                    by_order = {}
+                    for order_id, module_id, serial in rows:
+                        by_order.setdefault(order_id, []).append((module_id, serial))
+                    for order_id, modules in by_order.items():
+                        index_module_ngrams(db.session, order_id, modules)
+                    db.session.commit()
+                    print(f"   ... up to id {min(start + BACKFILL_CHUNK - 1, max_id)}")
+                print("✅ Trigram index built (set SERIAL_NGRAM_INDEX=true to use it)")
+            
+            print("\n🎉 Migration completed successfully!")
+            print("\n📋 Summary:")
+            print("   - serial_reversed: Reversed serial for indexed suffix (counter) search")
+            print("   - idx_order_serial / idx_order_serial_reversed: prefix and suffix search indexes")
+            print("   - master_serial_ngrams: optional trigram index for substring search")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {str(e)}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == '__main__':
+    add_serial_search_fields(build_ngrams='--ngrams' in sys.argv)
@@ -19,8 +19,20 @@ class Company(db.Model):
     production_records = db.relationship('ProductionRecord', backref='company', lazy=True, cascade='all, delete-orphan')
     rejected_modules = db.relationship('RejectedModule', backref='company', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        return {
+    # Embeddable collections for to_dict(include=...)
+    INCLUDES = ('production_records', 'rejected_modules')
+
+    def to_dict(self, include=(), counts=None, fields=None):
+        """
+        Serialize the company
+
+        Args:
+            include: Collections to embed (see INCLUDES); load them with
+                selectinload first to avoid a query per company
+            counts: Optional (production_record_count, rejected_module_count)
+            fields: Optional subset of summary keys to return (id is always kept)
+        """
+        data = {
             'id': self.id,
             'companyName': self.company_name,
             'moduleWattage': self.module_wattage,
@@ -28,10 +40,17 @@ class Company(db.Model):
             'cellsPerModule': self.cells_per_module,
             'cellsReceivedQty': self.cells_received_qty,
             'cellsReceivedMW': self.cells_received_mw,
-            'createdDate': self.created_date.strftime('%Y-%m-%d') if self.created_date else None,
-            'productionRecords': [pr.to_dict() for pr in self.production_records],
-            'rejectedModules': [rm.to_dict() for rm in self.rejected_modules]
+            'createdDate': self.created_date.strftime('%Y-%m-%d') if self.created_date else None
         }
+        if counts is not None:
+            data['productionRecordCount'], data['rejectedModuleCount'] = counts
+        if fields:
+            data = {key: value for key, value in data.items() if key == 'id' or key in fields}
+        if 'production_records' in include:
+            data['productionRecords'] = [pr.to_dict() for pr in self.production_records]
+        if 'rejected_modules' in include:
+            data['rejectedModules'] = [rm.to_dict() for rm in self.rejected_modules]
+        return data
 
 
 class ProductionRecord(db.Model):
@@ -47,6 +66,10 @@ class ProductionRecord(db.Model):
     module_rejection_percent = db.Column(db.Float, default=0.0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('idx_company_date', 'company_id', 'date'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -68,13 +91,20 @@ class RejectedModule(db.Model):
     rejection_date = db.Column(db.Date, nullable=False)
     reason = db.Column(db.String(200), default='')
     stage = db.Column(db.String(100), default='Visual Inspection')
+    defect_type = db.Column(db.String(20), default='Minor')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('idx_company_rejection_date', 'company_id', 'rejection_date'),
+        db.UniqueConstraint('company_id', 'serial_number', name='uq_company_serial'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
             'serialNumber': self.serial_number,
             'rejectionDate': self.rejection_date.strftime('%Y-%m-%d') if self.rejection_date else None,
             'reason': self.reason,
-            'stage': self.stage
+            'stage': self.stage,
+            'defectType': self.defect_type or 'Minor'
         }
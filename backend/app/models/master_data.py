@@ -20,6 +20,7 @@ class MasterOrder(db.Model):
     
     # Relationships
     modules = db.relationship('MasterModule', backref='order', lazy=True, cascade='all, delete-orphan')
+    stats = db.relationship('MasterOrderStats', uselist=False, lazy=True, cascade='all, delete-orphan')
 
 class MasterModule(db.Model):
     """Pre-generated module data with FTR/Rejection status"""
@@ -31,6 +32,9 @@ class MasterModule(db.Model):
     # Excel data columns (from RFID FTR format)
     date = db.Column(db.String(50), nullable=True)
     serial_number = db.Column(db.String(100), nullable=False)  # ID column
+    serial_reversed = db.Column(db.String(100), nullable=True)  # Reversed serial for indexed suffix search
+    serial_stem = db.Column(db.String(100), nullable=True)  # Serial without its trailing counter digits (MasterOrder.serial_prefix strips all digits)
+    serial_counter = db.Column(db.BigInteger, nullable=True)  # Trailing digits of the serial as a number
     pmax = db.Column(db.Float, nullable=True)
     isc = db.Column(db.Float, nullable=True)
     voc = db.Column(db.Float, nullable=True)
@@ -71,9 +75,31 @@ class MasterModule(db.Model):
     __table_args__ = (
         db.Index('idx_order_sequence', 'order_id', 'sequence_number'),
         db.Index('idx_serial', 'serial_number'),
+        db.Index('idx_order_serial', 'order_id', 'serial_number'),
+        db.Index('idx_order_serial_reversed', 'order_id', 'serial_reversed'),
+        db.Index('idx_order_available_counter', 'order_id', 'is_rejected', 'is_delivered', 'serial_counter'),
         db.Index('idx_production', 'production_date', 'production_shift'),
     )
 
+class MasterSerialNgram(db.Model):
+    """Trigram index of serial numbers for substring search (optional, see SERIAL_NGRAM_INDEX)"""
+    __tablename__ = 'master_serial_ngrams'
+    
+    order_id = db.Column(db.Integer, primary_key=True)
+    gram = db.Column(db.String(3), primary_key=True)
+    module_id = db.Column(db.Integer, primary_key=True)
+
+class MasterOrderStats(db.Model):
+    """Per-order module counters, kept current by the master data endpoints"""
+    __tablename__ = 'master_order_stats'
+    
+    order_id = db.Column(db.Integer, db.ForeignKey('master_orders.id'), primary_key=True)
+    produced_count = db.Column(db.Integer, nullable=False, default=0)
+    rejected_count = db.Column(db.Integer, nullable=False, default=0)
+    delivered_count = db.Column(db.Integer, nullable=False, default=0)
+    allocated_sequence = db.Column(db.Integer, nullable=True)  # Last sequence_number booked by daily production
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class DailyProduction(db.Model):
     """Daily production tracking"""
     __tablename__ = 'daily_production'
@@ -1,27 +1,91 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+import json
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from app.models.database import db, Company, ProductionRecord, RejectedModule
+from app.services.rejection_store import ingest_rejections
+from app.services.company_queries import (
+    page_production_records, page_rejected_modules, parse_company_args, parse_page_args,
+    query_companies, serialize_companies
+)
 
 company_bp = Blueprint('company', __name__)
 
 # Get all companies
 @company_bp.route('/api/companies', methods=['GET'])
 def get_companies():
+    """
+    Company summaries with productionRecordCount / rejectedModuleCount
+
+    Query params:
+        fields: Comma-separated summary keys to return
+        include: production_records,rejected_modules to embed collections
+        start_date / end_date: Restrict embedded collections to a date range
+    """
     try:
-        companies = Company.query.all()
-        return jsonify([company.to_dict() for company in companies]), 200
+        try:
+            opts = parse_company_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        rows = query_companies(db.session, include=opts['include'], start=opts['start'], end=opts['end'])
+        return jsonify(serialize_companies(rows, opts['fields'], opts['include'])), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # Get single company
 @company_bp.route('/api/companies/<int:company_id>', methods=['GET'])
 def get_company(company_id):
+    """Single company summary, same fields / include / date params as the list"""
     try:
-        company = Company.query.get_or_404(company_id)
-        return jsonify(company.to_dict()), 200
+        try:
+            opts = parse_company_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        rows = query_companies(db.session, company_id=company_id, include=opts['include'], start=opts['start'], end=opts['end'])
+        if not rows:
+            return jsonify({'error': 'Company not found'}), 404
+        return jsonify(serialize_companies(rows, opts['fields'], opts['include'])[0]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 404
 
+# List production records (paginated, optional date range)
+@company_bp.route('/api/companies/<int:company_id>/production', methods=['GET'])
+def list_production_records(company_id):
+    try:
+        if not db.session.get(Company, company_id):
+            return jsonify({'error': 'Company not found'}), 404
+        try:
+            opts = parse_company_args(request.args)
+            limit, offset = parse_page_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify(page_production_records(
+            db.session, company_id, opts['start'], opts['end'], limit, offset
+        )), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# List rejected modules (paginated, optional date range)
+@company_bp.route('/api/companies/<int:company_id>/rejections', methods=['GET'])
+def list_rejected_modules(company_id):
+    try:
+        if not db.session.get(Company, company_id):
+            return jsonify({'error': 'Company not found'}), 404
+        try:
+            opts = parse_company_args(request.args)
+            limit, offset = parse_page_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify(page_rejected_modules(
+            db.session, company_id, opts['start'], opts['end'], limit, offset
+        )), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Create company
 @company_bp.route('/api/companies', methods=['POST'])
 def create_company():
@@ -151,40 +215,68 @@ def add_rejected_module(company_id):
             serial_number=data.get('serialNumber'),
             rejection_date=datetime.strptime(data.get('rejectionDate'), '%Y-%m-%d').date(),
             reason=data.get('reason', ''),
-            stage=data.get('stage', 'Visual Inspection')
+            stage=data.get('stage', 'Visual Inspection'),
+            defect_type=data.get('defectType', 'Minor')
         )
         
         db.session.add(rejection)
         db.session.commit()
         
         return jsonify(rejection.to_dict()), 201
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Serial number already rejected for this company'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _bulk_summary(progress):
+    message = f"{progress['added']} rejections added successfully"
+    if progress['skipped']:
+        message += f" ({progress['skipped']} duplicate serials skipped)"
+    if progress['invalid']:
+        message += f" ({progress['invalid']} rows without a serial or valid date skipped)"
+    return dict(progress, message=message)
+
 # Bulk add rejected modules (Excel upload)
 @company_bp.route('/api/companies/<int:company_id>/rejections/bulk', methods=['POST'])
 def bulk_add_rejections(company_id):
+    """
+    Insert rejections in chunks, committing each chunk
+
+    With ?stream=1 (or Accept: application/x-ndjson) the response is NDJSON:
+    one progress line per chunk, then a final line with "done": true and
+    "status": "ok" (plus the summary message) or "status": "error" (plus
+    "error"). The HTTP status is sent before the first chunk runs, so it is
+    201 even when a chunk fails - stream clients must check the final
+    line's status. Chunks committed before a failure stay committed.
+    """
     try:
-        company = Company.query.get_or_404(company_id)
-        data = request.get_json()
+        if not db.session.get(Company, company_id):
+            return jsonify({'error': 'Company not found'}), 404
+        data = request.get_json() or {}
         rejections_data = data.get('rejections', [])
         
-        rejections = []
-        for rej_data in rejections_data:
-            rejection = RejectedModule(
-                company_id=company_id,
-                serial_number=rej_data.get('serialNumber'),
-                rejection_date=datetime.strptime(rej_data.get('rejectionDate'), '%Y-%m-%d').date(),
-                reason=rej_data.get('reason', ''),
-                stage=rej_data.get('stage', 'Visual Inspection')
-            )
-            rejections.append(rejection)
-        
-        db.session.add_all(rejections)
-        db.session.commit()
+        # Serials the company already has are skipped by the unique key
+        progress_iter = ingest_rejections(db.session, company_id, rejections_data)
+        
+        if request.args.get('stream') or request.accept_mimetypes.best == 'application/x-ndjson':
+            def generate():
+                progress = {'processed': 0, 'total': len(rejections_data), 'added': 0, 'skipped': 0, 'invalid': 0}
+                try:
+                    for progress in progress_iter:
+                        yield json.dumps(progress) + '\n'
+                    yield json.dumps(dict(_bulk_summary(progress), done=True, status='ok')) + '\n'
+                except Exception as e:
+                    db.session.rollback()
+                    yield json.dumps(dict(progress, error=str(e), done=True, status='error')) + '\n'
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson'), 201
         
-        return jsonify({'message': f'{len(rejections)} rejections added successfully'}), 201
+        progress = {'processed': 0, 'total': 0, 'added': 0, 'skipped': 0, 'invalid': 0}
+        for progress in progress_iter:
+            pass
+        return jsonify(_bulk_summary(progress)), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -1,16 +1,18 @@
 """
 IPQC API Routes
 """
-from flask import Blueprint, request, jsonify, send_file, current_app
-from werkzeug.utils import secure_filename
-import os
-import json
-import zipfile
+from flask import Blueprint, Response, request, jsonify, send_file, current_app, stream_with_context
+import io
 from datetime import datetime
 
-from app.services.form_generator import IPQCFormGenerator
-from app.services.pdf_generator import IPQCPDFGenerator, SerialNumberGenerator
-from app.services.excel_generator import generate_ipqc_excel
+from app.services.form_generator import IPQCFormGenerator, form_rng
+from app.services.pdf_generator import SerialNumberGenerator
+from app.services.ipqc_batch import (
+    render_complete_zip, render_ipqc_excel_bytes, render_ipqc_pdf_bytes, stream_batch_zip, validate_specs
+)
+from app.services.render_cache import cache_key, get_render_cache
+from app.services.render_service import RenderUnavailable, get_render_service, render_unavailable_response
+from app.services.seeding import seeded_mode
 from app.models.ipqc_data import BOMData
 
 ipqc_bp = Blueprint('ipqc', __name__)
@@ -19,6 +21,33 @@ ipqc_bp = Blueprint('ipqc', __name__)
 form_generator = IPQCFormGenerator()
 
 
+def _form_parts(ipqc_form):
+    """(stages, bom, metadata) of a generated form - the render inputs"""
+    return ipqc_form.get('stages', []), ipqc_form.get('bom', {}), ipqc_form.get('metadata', {})
+
+
+def _cached_ipqc_pdf(ipqc_form):
+    """IPQC PDF bytes, from the render cache when this form was rendered before"""
+    parts = _form_parts(ipqc_form)
+    return get_render_cache(current_app).render(
+        cache_key('ipqc_pdf', *parts),
+        lambda: get_render_service(current_app).run(render_ipqc_pdf_bytes, *parts)
+    )
+
+
+def _cached_ipqc_excel(ipqc_form):
+    """IPQC workbook bytes, from the render cache when this form was rendered before"""
+    parts = _form_parts(ipqc_form)
+    return get_render_cache(current_app).render(
+        cache_key('ipqc_excel', *parts),
+        lambda: get_render_service(current_app).run(render_ipqc_excel_bytes, *parts)
+    )
+
+
+def _download_stamp():
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
 @ipqc_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -29,6 +58,24 @@ def health_check():
     })
 
 
+@ipqc_bp.route('/render-service/stats', methods=['GET'])
+def render_service_stats():
+    """Worker, admission and timeout counters of the report rendering pool"""
+    try:
+        return jsonify(get_render_service(current_app).stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@ipqc_bp.route('/render-cache/stats', methods=['GET'])
+def render_cache_stats():
+    """Hit / miss / size metrics of the report render cache"""
+    try:
+        return jsonify(get_render_cache(current_app).stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @ipqc_bp.route('/generate-ipqc', methods=['POST'])
 def generate_ipqc():
     """
@@ -41,8 +88,13 @@ def generate_ipqc():
         "customer_id": "GSPL/IPQC/IPC/003",
         "po_number": "PO12345",
         "serial_start": 10001,
-        "module_count": 1
+        "module_count": 1,
+        "line": "1",        // optional, part of the seed
+        "seeded": true      // optional, reproducible values (default SEEDED_GENERATION, off)
     }
+    
+    Seeded forms are reproducible: the same customer, date, shift, line,
+    serial prefix / start and PO always give the same readings.
     """
     try:
         data = request.get_json()
@@ -80,7 +132,11 @@ def generate_ipqc():
             cell_manufacturer=cell_manufacturer,
             cell_efficiency=cell_efficiency,
             jb_cable_length=jb_cable_length,
-            golden_module_number=golden_module_number
+            golden_module_number=golden_module_number,
+            rng=form_rng(
+                customer_id, date, shift, data.get('line'), seeded_mode(data, current_app.config),
+                serial_prefix=serial_prefix, serial_start=serial_start, po_number=po_number
+            )
         )
         
         return jsonify({
@@ -117,25 +173,20 @@ def generate_pdf():
         
         ipqc_data = data['ipqc_data']
         
-        # Initialize PDF generator
-        pdf_folder = current_app.config['PDF_FOLDER']
-        pdf_generator = IPQCPDFGenerator(pdf_folder)
-        
-        # Generate PDF
-        pdf_path = pdf_generator.generate_ipqc_pdf(
-            ipqc_data=ipqc_data.get('stages', []),
-            bom_data=ipqc_data.get('bom', {}),
-            metadata=ipqc_data.get('metadata', {})
-        )
+        # Generate PDF (re-posting the same form is served from the render cache)
+        pdf_bytes = _cached_ipqc_pdf(ipqc_data)
+        customer_name = ipqc_data.get('metadata', {}).get('customer_name', 'Report')
         
         # Return PDF file
         return send_file(
-            pdf_path,
+            io.BytesIO(pdf_bytes),
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=os.path.basename(pdf_path)
+            download_name=f"IPQC_{customer_name}_{_download_stamp()}.pdf"
         )
         
+    except RenderUnavailable as e:
+        return render_unavailable_response(e)
     except Exception as e:
         return jsonify({
             "error": str(e),
@@ -171,26 +222,26 @@ def generate_pdf_only():
             cell_manufacturer=cell_manufacturer,
             cell_efficiency=cell_efficiency,
             jb_cable_length=jb_cable_length,
-            golden_module_number=golden_module_number
+            golden_module_number=golden_module_number,
+            rng=form_rng(
+                customer, data.get('date'), data.get('shift'), data.get('line'), seeded_mode(data, current_app.config),
+                serial_prefix=serial_prefix, serial_start=data.get('serial_start', 1), po_number=po_number
+            )
         )
         
         # Generate PDF only
-        pdf_folder = current_app.config['PDF_FOLDER']
-        pdf_generator = IPQCPDFGenerator(pdf_folder)
-        
-        pdf_path = pdf_generator.generate_ipqc_pdf(
-            ipqc_data=ipqc_form.get('stages', []),
-            bom_data=ipqc_form.get('bom', {}),
-            metadata=ipqc_form.get('metadata', {})
-        )
+        pdf_bytes = _cached_ipqc_pdf(ipqc_form)
+        customer_name = ipqc_form.get('metadata', {}).get('customer_name', 'Report')
         
         return send_file(
-            pdf_path,
+            io.BytesIO(pdf_bytes),
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=os.path.basename(pdf_path)
+            download_name=f"IPQC_{customer_name}_{_download_stamp()}.pdf"
         )
         
+    except RenderUnavailable as e:
+        return render_unavailable_response(e)
     except Exception as e:
         return jsonify({
             "error": str(e),
@@ -226,23 +277,26 @@ def generate_excel_only():
             cell_manufacturer=cell_manufacturer,
             cell_efficiency=cell_efficiency,
             jb_cable_length=jb_cable_length,
-            golden_module_number=golden_module_number
+            golden_module_number=golden_module_number,
+            rng=form_rng(
+                customer, data.get('date'), data.get('shift'), data.get('line'), seeded_mode(data, current_app.config),
+                serial_prefix=serial_prefix, serial_start=data.get('serial_start', 1), po_number=po_number
+            )
         )
         
         # Generate Excel only
-        excel_path = generate_ipqc_excel(
-            ipqc_data=ipqc_form.get('stages', []),
-            bom_data=ipqc_form.get('bom', {}),
-            metadata=ipqc_form.get('metadata', {})
-        )
+        excel_bytes = _cached_ipqc_excel(ipqc_form)
+        customer_name = ipqc_form.get('metadata', {}).get('customer_id', 'Unknown').replace('/', '_')
         
         return send_file(
-            excel_path,
+            io.BytesIO(excel_bytes),
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             as_attachment=True,
-            download_name=os.path.basename(excel_path)
+            download_name=f"IPQC_Report_{customer_name}_{_download_stamp()}.xlsx"
         )
         
+    except RenderUnavailable as e:
+        return render_unavailable_response(e)
     except Exception as e:
         return jsonify({
             "error": str(e),
@@ -289,42 +343,31 @@ def generate_complete():
             cell_manufacturer=cell_manufacturer,
             cell_efficiency=cell_efficiency,
             jb_cable_length=jb_cable_length,
-            golden_module_number=golden_module_number
-        )
-        
-        # Generate PDF
-        pdf_folder = current_app.config['PDF_FOLDER']
-        pdf_generator = IPQCPDFGenerator(pdf_folder)
-        
-        pdf_path = pdf_generator.generate_ipqc_pdf(
-            ipqc_data=ipqc_form.get('stages', []),
-            bom_data=ipqc_form.get('bom', {}),
-            metadata=ipqc_form.get('metadata', {})
-        )
-        
-        # Generate Excel
-        excel_path = generate_ipqc_excel(
-            ipqc_data=ipqc_form.get('stages', []),
-            bom_data=ipqc_form.get('bom', {}),
-            metadata=ipqc_form.get('metadata', {})
+            golden_module_number=golden_module_number,
+            rng=form_rng(
+                customer, data.get('date'), data.get('shift'), data.get('line'), seeded_mode(data, current_app.config),
+                serial_prefix=serial_prefix, serial_start=data.get('serial_start', 1), po_number=po_number
+            )
         )
         
-        # Create ZIP file with both PDF and Excel
+        # Render PDF and Excel concurrently into memory and zip them (no temp files)
         zip_filename = f"IPQC_Report_{customer.replace('/', '_')}_{data.get('date', '').replace('-', '')}.zip"
-        zip_path = os.path.join(pdf_folder, zip_filename)
-        
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            zipf.write(pdf_path, os.path.basename(pdf_path))
-            zipf.write(excel_path, os.path.basename(excel_path))
+        base_name = f"IPQC_{customer.replace('/', '_')}_{data.get('date', '').replace('-', '')}_{data.get('shift', '')}"
+        zip_bytes = get_render_cache(current_app).render(
+            cache_key('ipqc_complete', base_name, *_form_parts(ipqc_form)),
+            lambda: render_complete_zip(ipqc_form, base_name, get_render_service(current_app)).getvalue()
+        )
         
         # Return ZIP file
         return send_file(
-            zip_path,
+            io.BytesIO(zip_bytes),
             mimetype='application/zip',
             as_attachment=True,
             download_name=zip_filename
         )
         
+    except RenderUnavailable as e:
+        return render_unavailable_response(e)
     except Exception as e:
         return jsonify({
             "error": str(e),
@@ -332,6 +375,63 @@ def generate_complete():
         }), 500
 
 
+@ipqc_bp.route('/generate-batch', methods=['POST'])
+def generate_batch():
+    """
+    Generate IPQC packs (PDF + Excel) for many dates/shifts, streamed back as one ZIP
+    
+    Expected JSON:
+    {
+        "customer_id": "GSPL/IPQC/IPC/003",
+        "po_number": "PO12345",
+        "serial_prefix": "GS04875KG302250",
+        "specs": [
+            {"date": "2024-01-15", "shift": "A", "serial_start": 1, "module_count": 1},
+            {"date": "2024-01-15", "shift": "B", "serial_start": 101, "module_count": 1},
+            ...
+        ]
+    }
+    
+    Other fields (cell_manufacturer, cell_efficiency, jb_cable_length,
+    golden_module_number, seeded) apply to every spec, as in /generate-complete.
+    A spec may carry a "line" for its seed.
+    """
+    try:
+        data = request.get_json() or {}
+        
+        try:
+            specs = validate_specs(data.get('specs'), current_app.config.get('IPQC_BATCH_MAX_SPECS', 200))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        customer = data.get('customer_id') or data.get('customer') or 'Boeing'
+        options = {
+            'customer_id': customer,
+            'po_number': data.get('po_number'),
+            'serial_prefix': data.get('serial_prefix', 'GS04875KG302250'),
+            'cell_manufacturer': data.get('cell_manufacturer', 'Solar Space'),
+            'cell_efficiency': data.get('cell_efficiency', 25.7),
+            'jb_cable_length': data.get('jb_cable_length', 1200),
+            'golden_module_number': data.get('golden_module_number', 'GM-2024-001'),
+            'seeded': seeded_mode(data, current_app.config),
+            # Uploaded BOMs live in this process only, so workers get it explicitly
+            'bom': BOMData.get_bom(customer)
+        }
+        
+        zip_filename = f"IPQC_Batch_{customer.replace('/', '_')}_{specs[0]['date'].replace('-', '')}_{len(specs)}.zip"
+        return Response(
+            stream_with_context(stream_batch_zip(specs, options, get_render_service(current_app))),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename="{zip_filename}"'}
+        )
+        
+    except Exception as e:
+        return jsonify({
+            "error": str(e),
+            "message": "Failed to generate IPQC batch"
+        }), 500
+
+
 @ipqc_bp.route('/upload-bom', methods=['POST'])
 def upload_bom():
     """
@@ -508,11 +608,12 @@ def add_bulk_rejections():
     }
     """
     try:
-        from app.models.database import get_db_connection
+        from app.models.database import db, Company
+        from app.services.rejection_store import SNAKE_UPLOAD_FIELDS, ingest_rejections
         
         data = request.get_json()
         
-        if 'company_id' not in data or 'rejections' not in data:
+        if not data or 'company_id' not in data or 'rejections' not in data:
             return jsonify({
                 "error": "Missing company_id or rejections"
             }), 400
@@ -525,64 +626,35 @@ def add_bulk_rejections():
                 "error": "No rejections provided"
             }), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get existing serial numbers for this company to prevent duplicates
-        cursor.execute("""
-            SELECT serial_number 
-            FROM rejected_modules 
-            WHERE company_id = %s
-        """, (company_id,))
-        
-        existing_serials = set(row[0] for row in cursor.fetchall())
-        
-        # Filter unique rejections
-        unique_rejections = [
-            r for r in rejections 
-            if r.get('serial_number') not in existing_serials
-        ]
-        
-        if not unique_rejections:
-            conn.close()
+        if not db.session.get(Company, company_id):
             return jsonify({
-                "success": True,
-                "message": "All serial numbers already exist",
-                "added": 0,
-                "skipped": len(rejections)
-            }), 200
+                "error": "Company not found"
+            }), 404
+        
+        # Same chunked parse / INSERT IGNORE / commit path as the company bulk upload;
+        # existing serials are skipped by the (company_id, serial_number) unique key
+        progress = {'added': 0, 'skipped': 0, 'invalid': 0}
+        for progress in ingest_rejections(db.session, company_id, rejections, fields=SNAKE_UPLOAD_FIELDS):
+            pass
+        added_count = progress['added']
+        duplicate_count = progress['skipped']
+        invalid_count = progress['invalid']
         
-        # Insert unique rejections
-        added_count = 0
-        for rejection in unique_rejections:
-            cursor.execute("""
-                INSERT INTO rejected_modules 
-                (company_id, rejection_date, serial_number, rejection_reason, stage, defect_type)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (
-                company_id,
-                rejection.get('rejection_date'),
-                rejection.get('serial_number'),
-                rejection.get('rejection_reason'),
-                rejection.get('stage', 'Not Specified'),
-                rejection.get('defect_type', 'Minor')
-            ))
-            added_count += 1
-        
-        conn.commit()
-        conn.close()
-        
-        skipped_count = len(rejections) - added_count
+        skipped_count = duplicate_count + invalid_count
         
         return jsonify({
             "success": True,
-            "message": f"Successfully added {added_count} rejection(s)",
+            "message": f"Successfully added {added_count} rejection(s)" if added_count else "All serial numbers already exist",
             "added": added_count,
             "skipped": skipped_count,
+            "duplicates": duplicate_count,
+            "invalid": invalid_count,
             "total_received": len(rejections)
         }), 200
         
     except Exception as e:
+        from app.models.database import db
+        db.session.rollback()
         return jsonify({
             "error": str(e),
             "message": "Failed to add bulk rejections"
@@ -2,11 +2,30 @@
 Master Data Routes - Upload & Manage Pre-generated Production Data
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.models.master_data import MasterOrder, MasterModule, DailyProduction
 from app.models.database import db
+from app.services.master_ingest import ingest_master_upload, UploadRejected
+from app.services.excel_stream_reader import spool_upload
+from app.services.master_bulk import (
+    clean_serials, mark_rejected, mark_delivered, write_conflict_report, conflict_report_path,
+    UPDATED, ALREADY_REJECTED, ALREADY_DELIVERED, NOT_FOUND, DELIVERY_OUTCOMES
+)
+from app.services.ftr_export import query_ftr_rows, send_ftr_workbook
+from app.services.module_browser import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, parse_fields, fetch_page, cached_total, invalidate_totals
+)
+from app.services.serial_search import (
+    search_criteria, serial_range_criteria, parse_serial, reverse_serial,
+    ngram_index_enabled, index_module_ngrams, remove_ngrams
+)
+from app.services.production_allocator import allocate_daily_production, AllocationError
+from app.services.order_stats import get_order_stats, adjust_order_stats
+from app.services.upload_jobs import UploadJobStore, DEFAULT_JOBS_DB, FAILED, JobFailed, job_status, submit_job
 from datetime import datetime
+import os
 import random
+import time
 
 master_bp = Blueprint('master', __name__, url_prefix='/api/master')
 
@@ -43,178 +62,90 @@ def upload_excel_data():
         if existing_order:
             return jsonify({'error': 'Order number already exists'}), 400
         
-        # Read Excel file
-        import pandas as pd
-        import io
-        
-        # Read Excel in chunks for large files
-        file_content = file.read()
-        df = pd.read_excel(io.BytesIO(file_content), engine='openpyxl')
-        
-        # Remove completely empty rows
-        df = df.dropna(how='all')
-        
-        # Check if first row contains header keywords
-        first_row_str = ' '.join([str(val).lower() for val in df.iloc[0].values if pd.notna(val)])
-        if 'pmax' in first_row_str or 'date' in first_row_str or 'id' in first_row_str:
-            # First row is header, use it as column names
-            df.columns = df.iloc[0]
-            df = df.drop(df.index[0]).reset_index(drop=True)
-        
-        # Normalize column names
-        df.columns = df.columns.str.strip()
-        
-        # Validate max rows (500,000 limit)
-        if len(df) > 500000:
-            return jsonify({'error': f'Excel file has {len(df)} rows. Maximum 500,000 rows allowed.'}), 400
-        
-        # Check if ID column exists
-        if 'ID' not in df.columns:
-            return jsonify({'error': 'Missing required column: ID (Serial Number)'}), 400
-        
-        # Remove rows where ID is empty or invalid
-        df = df[df['ID'].notna()]
-        df = df[df['ID'].astype(str).str.strip() != '']
-        
-        # Extract serial prefix from first serial
-        first_serial = str(df['ID'].iloc[0]).strip()
-        # Assuming format like GS04890TG3002500001
-        serial_prefix = ''.join([c for c in first_serial if not c.isdigit()])
-        
-        # Create master order
-        order = MasterOrder(
-            company_name=company_name,
-            order_number=order_number,
-            total_modules=len(df),
-            serial_prefix=serial_prefix,
-            rejection_percentage=0.0  # All FTR data
-        )
-        db.session.add(order)
-        db.session.flush()
-        
-        # Store progress in session/cache for polling
-        import json
-        import tempfile
-        import os
-        temp_dir = tempfile.gettempdir()
-        progress_file = os.path.join(temp_dir, f'upload_progress_{order.id}.json')
-        
-        def update_progress(current, total, status):
-            try:
-                with open(progress_file, 'w') as f:
-                    json.dump({
-                        'current': current,
-                        'total': total,
-                        'status': status,
-                        'percent': int((current / total) * 100) if total > 0 else 0
-                    }, f)
-            except:
-                pass
-        
-        # Process modules in larger batches for performance
-        batch_size = 5000
-        modules_batch = []
-        processed = 0
-        total_rows = len(df)
-        
-        update_progress(0, total_rows, 'Starting processing...')
-        
-        for idx, row in df.iterrows():
-            processed += 1
-            if processed % 5000 == 0:
-                print(f"Processed {processed}/{total_rows} rows...")
-                update_progress(processed, total_rows, f'Processing rows... {processed:,} / {total_rows:,}')
-            # Get serial number from ID column
-            serial = str(row['ID']).strip() if pd.notna(row['ID']) else ''
-            
-            if not serial:
-                continue
-            
-            module = MasterModule(
-                order_id=order.id,
-                serial_number=serial,
-                sequence_number=idx + 1,
-                is_rejected=False,  # All FTR data
-                
-                # Store all FTR parameters
-                date=str(row.get('Date', '')) if pd.notna(row.get('Date')) else None,
-                pmax=float(row['Pmax']) if pd.notna(row.get('Pmax')) else None,
-                isc=float(row['Isc']) if pd.notna(row.get('Isc')) else None,
-                voc=float(row['Voc']) if pd.notna(row.get('Voc')) else None,
-                ipm=float(row['Ipm']) if pd.notna(row.get('Ipm')) else None,
-                vpm=float(row['Vpm']) if pd.notna(row.get('Vpm')) else None,
-                ff=float(row['FF']) if pd.notna(row.get('FF')) else None,
-                rs=float(row['Rs']) if pd.notna(row.get('Rs')) else None,
-                rsh=float(row['Rsh']) if pd.notna(row.get('Rsh')) else None,
-                eff=float(row['Eff']) if pd.notna(row.get('Eff')) else None,
-                t_object=float(row['T_Object']) if pd.notna(row.get('T_Object')) else None,
-                t_target=float(row['T_Target']) if pd.notna(row.get('T_Target')) else None,
-                irr_target=float(row['Irr_Target']) if pd.notna(row.get('Irr_Target')) else None,
-                class_grade=str(row.get('Class', '')) if pd.notna(row.get('Class')) else None,
-                sweep_time=float(row['Sweep_Time']) if pd.notna(row.get('Sweep_Time')) else None,
-                irr_monitor=float(row['Irr_Monitor']) if pd.notna(row.get('Irr_Monitor')) else None,
-                isc_monitor=float(row['Isc_Monitor']) if pd.notna(row.get('Isc_Monitor')) else None,
-                t_monitor=float(row['T_Monitor']) if pd.notna(row.get('T_Monitor')) else None,
-                cell_temp=float(row['Cell_Temp']) if pd.notna(row.get('Cell_Temp')) else None,
-                t_ambient=float(row['T_Ambient']) if pd.notna(row.get('T_Ambient')) else None,
-                binning=str(row.get('Binning', '')) if pd.notna(row.get('Binning')) else None
-            )
-            modules_batch.append(module)
-            
-            # Bulk insert
-            if len(modules_batch) >= batch_size:
-                db.session.bulk_save_objects(modules_batch)
-                db.session.commit()
-                modules_batch = []
-        
-        # Insert remaining
-        if modules_batch:
-            db.session.bulk_save_objects(modules_batch)
-        
-        db.session.commit()
-        
-        update_progress(total_rows, total_rows, 'Complete!')
-        
-        # Cleanup progress file
+        # Spool upload to disk; parsing and inserts run on the upload worker pool
+        spool_path = spool_upload(file, current_app.config['UPLOAD_FOLDER'])
+        store = _get_job_store()
+        job_id = None
         try:
-            import os
-            if os.path.exists(progress_file):
-                os.remove(progress_file)
-        except:
-            pass
+            job_id = store.create('master_upload', 'Waiting for a free worker...')
+            submit_job(
+                current_app._get_current_object(),
+                store,
+                job_id,
+                _run_master_upload,
+                spool_path,
+                company_name,
+                order_number,
+                max_workers=current_app.config.get('UPLOAD_WORKERS', 2)
+            )
+        except Exception as e:
+            # The job never reached a worker, so nothing else removes the spool file
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+            if job_id:
+                store.update(job_id, state=FAILED, message='Failed', error=str(e), finished_at=time.time())
+            raise
         
         return jsonify({
-            'message': 'FTR Excel data uploaded successfully',
-            'order': {
-                'id': order.id,
-                'company_name': order.company_name,
-                'order_number': order.order_number,
-                'total_modules': len(df),
-                'ftr_count': len(df),
-                'rejection_count': 0,
-                'serial_prefix': serial_prefix
-            }
-        }), 201
+            'message': 'Upload accepted, processing in background',
+            'job_id': job_id,
+            'status_url': f'/api/master/upload-jobs/{job_id}'
+        }), 202
         
     except Exception as e:
-        db.session.rollback()
         import traceback
         return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
 
+def _get_job_store():
+    """Upload job store for this app (one SQLite file shared by all workers)"""
+    store = current_app.extensions.get('upload_jobs')
+    if store is None:
+        store = UploadJobStore(current_app.config.get('UPLOAD_JOBS_DB') or DEFAULT_JOBS_DB)
+        current_app.extensions['upload_jobs'] = store
+    return store
+
+def _run_master_upload(progress, spool_path, company_name, order_number):
+    """Upload job body: stream the spooled workbook into a new order"""
+    try:
+        return ingest_master_upload(db.session, spool_path, company_name, order_number, progress_callback=progress)
+    except UploadRejected as e:
+        raise JobFailed(str(e))
+    finally:
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+
+@master_bp.route('/upload-jobs/<job_id>', methods=['GET'])
+def get_upload_job(job_id):
+    """Get state, progress, throughput and ETA of an upload job"""
+    try:
+        job = _get_job_store().get(job_id)
+        if not job:
+            return jsonify({'error': 'Upload job not found'}), 404
+        return jsonify(job_status(job)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@master_bp.route('/upload-jobs/<job_id>/cancel', methods=['POST'])
+def cancel_upload_job(job_id):
+    """Cancel a queued or running upload job (partial data is removed)"""
+    try:
+        store = _get_job_store()
+        job = store.get(job_id)
+        if not job:
+            return jsonify({'error': 'Upload job not found'}), 404
+        if not store.request_cancel(job_id):
+            return jsonify({'error': f"Upload job already {job['state']}"}), 409
+        return jsonify(job_status(store.get(job_id))), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @master_bp.route('/upload-progress/<int:order_id>', methods=['GET'])
 def get_upload_progress(order_id):
-    """Get upload progress for an order"""
+    """Get upload progress for an order (latest job that created it)"""
     try:
-        import json
-        import os
-        import tempfile
-        temp_dir = tempfile.gettempdir()
-        progress_file = os.path.join(temp_dir, f'upload_progress_{order_id}.json')
-        
-        if os.path.exists(progress_file):
-            with open(progress_file, 'r') as f:
-                progress = json.load(f)
-            return jsonify(progress), 200
+        job = _get_job_store().latest_for_order(order_id)
+        if job:
+            return jsonify(job_status(job)), 200
         else:
             return jsonify({'current': 0, 'total': 0, 'status': 'No upload in progress', 'percent': 0}), 200
     except Exception as e:
@@ -226,12 +157,15 @@ def get_master_orders():
     try:
         orders = MasterOrder.query.all()
         
+        # Materialized counters: one query for all orders instead of 3 COUNTs per order
+        stats = get_order_stats(db.session, [order.id for order in orders])
+        
         orders_list = []
         for order in orders:
             total = order.total_modules
-            produced = MasterModule.query.filter_by(order_id=order.id, is_produced=True).count()
-            rejected = MasterModule.query.filter_by(order_id=order.id, is_rejected=True).count()
-            delivered = MasterModule.query.filter_by(order_id=order.id, is_delivered=True).count()
+            produced = stats[order.id].produced_count
+            rejected = stats[order.id].rejected_count
+            delivered = stats[order.id].delivered_count
             
             orders_list.append({
                 'id': order.id,
@@ -246,9 +180,13 @@ def get_master_orders():
                 'created_at': order.created_at.isoformat()
             })
         
+        # Keeps counter rows built for orders that had none
+        db.session.commit()
+        
         return jsonify({'orders': orders_list}), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @master_bp.route('/daily-production', methods=['POST'])
@@ -285,43 +223,15 @@ def assign_daily_production():
         if not order:
             return jsonify({'error': 'Order not found'}), 404
         
-        # Get next available modules (not yet produced)
-        available_modules = MasterModule.query.filter_by(
-            order_id=order_id,
-            is_produced=False
-        ).order_by(MasterModule.sequence_number).limit(modules_count).all()
-        
-        if len(available_modules) < modules_count:
-            return jsonify({
-                'error': f'Only {len(available_modules)} modules available, requested {modules_count}'
-            }), 400
-        
-        # Assign production data
-        ftr_count = 0
-        rejection_count = 0
-        
-        for module in available_modules:
-            module.is_produced = True
-            module.production_date = production_date
-            module.production_shift = shift
-            module.line_number = line_number
-            
-            if module.is_rejected:
-                rejection_count += 1
-            else:
-                ftr_count += 1
+        # Book the next contiguous range of unproduced modules (locked per order)
+        try:
+            booking = allocate_daily_production(
+                db.session, order_id, production_date, shift, line_number, modules_count
+            )
+        except AllocationError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
         
-        # Create daily production record
-        daily_prod = DailyProduction(
-            order_id=order_id,
-            production_date=production_date,
-            shift=shift,
-            line_number=line_number,
-            modules_produced=modules_count,
-            ftr_count=ftr_count,
-            rejection_count=rejection_count
-        )
-        db.session.add(daily_prod)
         db.session.commit()
         
         return jsonify({
@@ -330,10 +240,10 @@ def assign_daily_production():
                 'date': production_date.isoformat(),
                 'shift': shift,
                 'line_number': line_number,
-                'modules_produced': modules_count,
-                'ftr_count': ftr_count,
-                'rejection_count': rejection_count,
-                'rejection_serials': [m.serial_number for m in available_modules if m.is_rejected]
+                'modules_produced': booking['modules_produced'],
+                'ftr_count': booking['ftr_count'],
+                'rejection_count': booking['rejection_count'],
+                'rejection_serials': booking['rejection_serials']
             }
         }), 201
         
@@ -473,30 +383,14 @@ def upload_rejections():
         serial_col = df.columns[0]
         reason_col = df.columns[1] if len(df.columns) > 1 else None
         
-        rejected_count = 0
-        not_found = []
+        serials = clean_serials(df[serial_col])
+        reasons = None
+        if reason_col:
+            reason_values = df.loc[serials.index, reason_col]
+            reasons = reason_values.map(str).where(reason_values.notna(), None).tolist()
         
-        for idx, row in df.iterrows():
-            serial = str(row[serial_col]).strip() if pd.notna(row[serial_col]) else ''
-            
-            if not serial:
-                continue
-            
-            # Find module in this order
-            module = MasterModule.query.filter_by(
-                order_id=order_id,
-                serial_number=serial
-            ).first()
-            
-            if module:
-                module.is_rejected = True
-                if reason_col and pd.notna(row[reason_col]):
-                    module.rejection_reason = str(row[reason_col])
-                else:
-                    module.rejection_reason = 'Rejected via upload'
-                rejected_count += 1
-            else:
-                not_found.append(serial)
+        # One SELECT + one UPDATE per chunk of serials
+        rejected_count, not_found = mark_rejected(db.session, order.id, serials.tolist(), reasons)
         
         db.session.commit()
         
@@ -564,38 +458,22 @@ def upload_delivered_ftr():
         # First column is serial number
         serial_col = df.columns[0]
         
-        delivered_count = 0
-        not_found = []
-        already_rejected = []
-        
-        for idx, row in df.iterrows():
-            serial = str(row[serial_col]).strip() if pd.notna(row[serial_col]) else ''
-            
-            if not serial:
-                continue
-            
-            # Find module in this order
-            module = MasterModule.query.filter_by(
-                order_id=order_id,
-                serial_number=serial
-            ).first()
-            
-            if module:
-                if module.is_rejected:
-                    already_rejected.append(serial)
-                else:
-                    module.is_delivered = True
-                    module.delivered_date = datetime.now().date()
-                    delivered_count += 1
-            else:
-                not_found.append(serial)
+        serials = clean_serials(df[serial_col]).tolist()
         
+        # Classify + update in SQL, one SELECT + one UPDATE per chunk of serials
+        outcomes = mark_delivered(db.session, order.id, serials, datetime.now().date())
         db.session.commit()
         
+        delivered_count = len(outcomes[UPDATED])
+        not_found = outcomes[NOT_FOUND]
+        already_rejected = outcomes[ALREADY_REJECTED]
+        already_delivered = outcomes[ALREADY_DELIVERED]
+        
         response_data = {
             'message': f'Successfully marked {delivered_count} modules as delivered',
             'delivered_count': delivered_count,
-            'order_id': order_id
+            'order_id': order_id,
+            'summary': {outcome: len(outcomes[outcome]) for outcome in DELIVERY_OUTCOMES}
         }
         
         if not_found:
@@ -606,6 +484,19 @@ def upload_delivered_ftr():
             response_data['rejected_warning'] = f'{len(already_rejected)} serials were already rejected (skipped)'
             response_data['rejected_serials'] = already_rejected[:10]  # First 10 only
         
+        if already_delivered:
+            response_data['delivered_warning'] = f'{len(already_delivered)} serials were already delivered (skipped)'
+            response_data['already_delivered_serials'] = already_delivered[:10]  # First 10 only
+        
+        # Full lists are available as an Excel download
+        if not_found or already_rejected or already_delivered:
+            report_id = write_conflict_report({
+                'Not Found': not_found,
+                'Already Rejected': already_rejected,
+                'Already Delivered': already_delivered
+            })
+            response_data['conflict_report_url'] = f'/api/master/delivered-conflicts/{report_id}'
+        
         return jsonify(response_data), 200
         
     except Exception as e:
@@ -613,6 +504,26 @@ def upload_delivered_ftr():
         import traceback
         return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
 
+@master_bp.route('/delivered-conflicts/<report_id>', methods=['GET'])
+def download_delivered_conflicts(report_id):
+    """Download the full conflict lists of a delivered-FTR upload"""
+    try:
+        from flask import send_file
+        
+        path = conflict_report_path(report_id)
+        if not path:
+            return jsonify({'error': 'Report not found or expired'}), 404
+        
+        return send_file(
+            path,
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            as_attachment=True,
+            download_name=f'Delivered_Conflicts_{report_id[:8]}.xlsx'
+        )
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @master_bp.route('/download-ftr-by-quantity', methods=['POST'])
 def download_ftr_by_quantity():
     """
@@ -626,11 +537,6 @@ def download_ftr_by_quantity():
     }
     """
     try:
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, Alignment, PatternFill
-        import tempfile
-        from flask import send_file
-        
         data = request.json
         order_id = data.get('order_id')
         start_serial = data.get('start_serial')
@@ -645,12 +551,16 @@ def download_ftr_by_quantity():
             return jsonify({'error': 'Order not found'}), 404
         
         # Get modules starting from start_serial, only non-rejected and non-delivered, limit by quantity
-        modules = MasterModule.query.filter(
+        range_criteria, order_by = serial_range_criteria(start_serial)
+        modules = query_ftr_rows(
+            db.session,
             MasterModule.order_id == order_id,
             MasterModule.is_rejected == False,
             MasterModule.is_delivered == False,
-            MasterModule.serial_number >= start_serial
-        ).order_by(MasterModule.serial_number).limit(quantity).all()
+            *range_criteria,
+            limit=quantity,
+            order_by=order_by
+        )
         
         if not modules:
             return jsonify({'error': 'No modules found starting from given serial'}), 404
@@ -660,66 +570,8 @@ def download_ftr_by_quantity():
                 'error': f'Only {len(modules)} available modules (non-rejected & non-delivered) starting from {start_serial}. Requested: {quantity}'
             }), 400
         
-        # Create Excel workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'FTR Data'
-        
-        # Header style
-        header_font = Font(bold=True, size=11)
-        header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-        header_alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Headers - Only required columns
-        headers = ['SN', 'ID', 'Pmax', 'Isc', 'Voc', 'Ipm', 'Vpm', 'FF', 'Rs', 'Eff', 'Binning']
-        
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num)
-            cell.value = header
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-        
-        # Data rows
-        for row_num, module in enumerate(modules, 2):
-            ws.cell(row=row_num, column=1).value = row_num - 1  # SN
-            ws.cell(row=row_num, column=2).value = module.serial_number  # ID
-            ws.cell(row=row_num, column=3).value = module.pmax
-            ws.cell(row=row_num, column=4).value = module.isc
-            ws.cell(row=row_num, column=5).value = module.voc
-            ws.cell(row=row_num, column=6).value = module.ipm
-            ws.cell(row=row_num, column=7).value = module.vpm
-            ws.cell(row=row_num, column=8).value = module.ff
-            ws.cell(row=row_num, column=9).value = module.rs
-            ws.cell(row=row_num, column=10).value = module.eff
-            ws.cell(row=row_num, column=11).value = module.binning
-        
-        # Auto-adjust column widths
-        for col in ws.columns:
-            max_length = 0
-            column = col[0].column_letter
-            for cell in col:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 20)
-            ws.column_dimensions[column].width = adjusted_width
-        
-        # Save to temp file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-        wb.save(temp_file.name)
-        temp_file.close()
-        
         filename = f'FTR_Data_{order.order_number}_{quantity}_modules.xlsx'
-        
-        return send_file(
-            temp_file.name,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=filename
-        )
+        return send_ftr_workbook(modules, filename)
         
     except Exception as e:
         import traceback
@@ -742,11 +594,6 @@ def download_ftr_by_serials():
     }
     """
     try:
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, Alignment, PatternFill
-        import tempfile
-        from flask import send_file
-        
         data = request.json
         order_id = data.get('order_id')
         serial_numbers = data.get('serial_numbers', [])
@@ -766,87 +613,32 @@ def download_ftr_by_serials():
             start_serial = serial_range.get('start')
             end_serial = serial_range.get('end')
             
-            modules = MasterModule.query.filter(
+            range_criteria, order_by = serial_range_criteria(start_serial, end_serial)
+            modules = query_ftr_rows(
+                db.session,
                 MasterModule.order_id == order_id,
                 MasterModule.is_rejected == False,
                 MasterModule.is_delivered == False,
-                MasterModule.serial_number >= start_serial,
-                MasterModule.serial_number <= end_serial
-            ).order_by(MasterModule.serial_number).all()
+                *range_criteria,
+                order_by=order_by
+            )
         elif serial_numbers:
             # Specific serials - ONLY NON-REJECTED
-            modules = MasterModule.query.filter(
+            modules = query_ftr_rows(
+                db.session,
                 MasterModule.order_id == order_id,
                 MasterModule.is_rejected == False,
                 MasterModule.is_delivered == False,
                 MasterModule.serial_number.in_(serial_numbers)
-            ).order_by(MasterModule.serial_number).all()
+            )
         else:
             return jsonify({'error': 'serial_numbers or serial_range required'}), 400
         
         if not modules:
             return jsonify({'error': 'No modules found for given serials'}), 404
         
-        # Create Excel workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'FTR Data'
-        
-        # Header style
-        header_font = Font(bold=True, size=11)
-        header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-        header_alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Headers - Only required columns
-        headers = ['SN', 'ID', 'Pmax', 'Isc', 'Voc', 'Ipm', 'Vpm', 'FF', 'Rs', 'Eff', 'Binning']
-        
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num)
-            cell.value = header
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-        
-        # Data rows - Only required columns
-        for row_num, module in enumerate(modules, 2):
-            ws.cell(row=row_num, column=1).value = row_num - 1  # SN (serial count starting from 1)
-            ws.cell(row=row_num, column=2).value = module.serial_number  # ID
-            ws.cell(row=row_num, column=3).value = module.pmax
-            ws.cell(row=row_num, column=4).value = module.isc
-            ws.cell(row=row_num, column=5).value = module.voc
-            ws.cell(row=row_num, column=6).value = module.ipm
-            ws.cell(row=row_num, column=7).value = module.vpm
-            ws.cell(row=row_num, column=8).value = module.ff
-            ws.cell(row=row_num, column=9).value = module.rs
-            ws.cell(row=row_num, column=10).value = module.eff
-            ws.cell(row=row_num, column=11).value = module.binning
-        
-        # Auto-adjust column widths
-        for col in ws.columns:
-            max_length = 0
-            column = col[0].column_letter
-            for cell in col:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 20)
-            ws.column_dimensions[column].width = adjusted_width
-        
-        # Save to temp file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-        wb.save(temp_file.name)
-        temp_file.close()
-        
         filename = f'FTR_Data_{order.order_number}_{len(modules)}_modules.xlsx'
-        
-        return send_file(
-            temp_file.name,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=filename
-        )
+        return send_ftr_workbook(modules, filename)
         
     except Exception as e:
         import traceback
@@ -854,49 +646,48 @@ def download_ftr_by_serials():
 
 @master_bp.route('/modules/<int:order_id>', methods=['GET'])
 def get_modules(order_id):
-    """Get modules for an order with pagination and search"""
+    """
+    Get modules for an order with pagination and search
+    
+    Query params:
+        limit: Page size (max 1000)
+        after / before: Keyset cursor (sequence_number) from next_cursor / prev_cursor
+        offset: Legacy offset paging (used only when no cursor is given)
+        fields: Comma-separated columns to return (default: all FTR columns)
+        search: Serial number filter
+        match: auto | prefix | suffix | contains (auto is a substring match, trigram-indexed when enabled)
+    """
     try:
-        limit = int(request.args.get('limit', 50))
-        offset = int(request.args.get('offset', 0))
+        limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        after = request.args.get('after', type=int)
+        before = request.args.get('before', type=int)
         search = request.args.get('search', '')
         
-        query = MasterModule.query.filter_by(order_id=order_id)
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
+        criteria = []
+        match = request.args.get('match', 'auto')
         if search:
-            query = query.filter(MasterModule.serial_number.like(f'%{search}%'))
-        
-        total = query.count()
-        modules = query.order_by(MasterModule.sequence_number).offset(offset).limit(limit).all()
-        
-        modules_list = []
-        for m in modules:
-            modules_list.append({
-                'id': m.id,
-                'serial_number': m.serial_number,
-                'date': m.date,
-                'pmax': m.pmax,
-                'isc': m.isc,
-                'voc': m.voc,
-                'ipm': m.ipm,
-                'vpm': m.vpm,
-                'ff': m.ff,
-                'rs': m.rs,
-                'rsh': m.rsh,
-                'eff': m.eff,
-                't_object': m.t_object,
-                't_target': m.t_target,
-                'irr_target': m.irr_target,
-                'class_grade': m.class_grade,
-                'sweep_time': m.sweep_time,
-                'irr_monitor': m.irr_monitor,
-                'isc_monitor': m.isc_monitor,
-                't_monitor': m.t_monitor,
-                'cell_temp': m.cell_temp,
-                't_ambient': m.t_ambient,
-                'binning': m.binning
-            })
+            try:
+                criteria, match = search_criteria(order_id, search, match)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        # Legacy offset paging still works, but its cost grows with the offset
+        offset = int(request.args.get('offset', 0)) if after is None and before is None else 0
         
-        return jsonify({'modules': modules_list, 'total': total}), 200
+        page = fetch_page(db.session, order_id, fields, limit, after=after, before=before, offset=offset, criteria=criteria)
+        
+        total, total_cached = cached_total(db.session, order_id, criteria, cache_key=(search, match) if search else None)
+        page['total'] = total
+        page['total_cached'] = total_cached
+        if search:
+            page['match'] = match
+        
+        return jsonify(page), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -914,6 +705,11 @@ def update_module(module_id):
         # Update fields
         if 'serial_number' in data:
             module.serial_number = data['serial_number']
+            module.serial_reversed = reverse_serial(data['serial_number'])
+            module.serial_stem, module.serial_counter = parse_serial(data['serial_number'])
+            remove_ngrams(db.session, module.order_id, [module.id])
+            if ngram_index_enabled():
+                index_module_ngrams(db.session, module.order_id, [(module.id, module.serial_number)])
         if 'pmax' in data:
             module.pmax = data['pmax']
         if 'isc' in data:
@@ -942,8 +738,18 @@ def delete_module(module_id):
         if not module:
             return jsonify({'error': 'Module not found'}), 404
         
+        remove_ngrams(db.session, module.order_id, [module.id])
         db.session.delete(module)
+        db.session.flush()
+        adjust_order_stats(
+            db.session,
+            module.order_id,
+            produced=-1 if module.is_produced else 0,
+            rejected=-1 if module.is_rejected else 0,
+            delivered=-1 if module.is_delivered else 0
+        )
         db.session.commit()
+        invalidate_totals(module.order_id)
         
         return jsonify({'message': 'Module deleted successfully'}), 200
         
@@ -962,10 +768,12 @@ def delete_order(order_id):
         
         # Delete all modules first (cascade should handle this, but explicit is better)
         MasterModule.query.filter_by(order_id=order_id).delete()
+        remove_ngrams(db.session, order_id)
         
         # Delete order
         db.session.delete(order)
         db.session.commit()
+        invalidate_totals(order_id)
         
         return jsonify({'message': 'Order and all modules deleted successfully'}), 200
         
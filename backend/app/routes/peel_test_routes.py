@@ -3,11 +3,14 @@ Peel Test Routes
 API endpoints for Peel Test Report management
 """
 
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, send_file, current_app
 from app.models.database import db
 from app.models.peel_test_data import PeelTestReport, PeelTestResult
-from app.services.peel_test_pdf_generator import generate_peel_test_pdf
-from app.services.peel_test_excel_generator import generate_peel_test_excel
+from app.services.peel_test_excel_generator import peel_excel_rng
+from app.services.render_service import (
+    RenderUnavailable, get_render_service, render_peel_test_excel, render_peel_test_pdf, render_unavailable_response
+)
+from app.services.seeding import seeded_mode
 from datetime import datetime
 import os
 import zipfile
@@ -182,8 +185,12 @@ def download_peel_test_pdf(report_id):
     try:
         report = PeelTestReport.query.get_or_404(report_id)
         
-        # Generate PDF
-        pdf_path = generate_peel_test_pdf(report)
+        # Generate PDF on the render pool (workers get plain data, not the ORM object)
+        pdf_path = get_render_service(current_app).run(render_peel_test_pdf, {
+            'date': report.report_date.isoformat(),
+            'shift': report.shift,
+            'seeded': seeded_mode(request.args, current_app.config)
+        })
         
         return send_file(
             pdf_path,
@@ -192,6 +199,8 @@ def download_peel_test_pdf(report_id):
             download_name=f'peel_test_report_{report_id}.pdf'
         )
         
+    except RenderUnavailable as e:
+        return render_unavailable_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -248,12 +257,14 @@ def generate_peel_test_excel_report():
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
         
-        generated_files = []
+        seeded = seeded_mode(data, current_app.config)
         
-        # Generate one Excel file per line (each file has 12 sheets)
-        for line_num in range(1, stringer_count + 1):
-            excel_file = generate_peel_test_excel(line_num, report_date, output_folder)
-            generated_files.append(excel_file)
+        # Generate one Excel file per line concurrently on the render pool
+        # (each file has 12 sheets, reproducible per date and line when seeded)
+        generated_files = get_render_service(current_app).run_all([
+            (render_peel_test_excel, line_num, report_date, output_folder, peel_excel_rng(line_num, report_date, seeded))
+            for line_num in range(1, stringer_count + 1)
+        ])
         
         # Verify all files exist
         for file_path in generated_files:
@@ -304,5 +315,7 @@ def generate_peel_test_excel_report():
         
         return response
         
+    except RenderUnavailable as e:
+        return render_unavailable_response(e)
     except Exception as e:
         return jsonify({'error': str(e), 'message': 'Failed to generate Excel report'}), 500
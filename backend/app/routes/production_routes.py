@@ -1,11 +1,56 @@
-from flask import Blueprint, request, send_file, jsonify
-from app.services.production_pdf_generator import ProductionPDFGenerator
-from app.services.excel_generator import generate_production_excel
+from flask import Blueprint, request, send_file, jsonify, current_app
+from app.services.production_report_data import (
+    build_excel_report_args, build_pdf_report_data, load_report_company, parse_report_date, rejection_fingerprint
+)
+from app.services.render_cache import cache_key, get_render_cache
+from app.services.render_service import (
+    RenderUnavailable, get_render_service, render_production_excel_bytes,
+    render_production_pdf_bytes, render_unavailable_response
+)
+from app.models.database import db
 from datetime import datetime
+from io import BytesIO
 import os
 
 production_bp = Blueprint('production', __name__)
 
+
+def _server_report_args(data, builder, **kwargs):
+    """
+    Run a production_report_data builder for {company_id, start_date, end_date, report_options}
+
+    The rejections are not read here: the render worker queries them itself
+    from the returned rejection source, streaming the rows instead of pickling
+    the whole set over. The rejection fingerprint versions them for the render
+    cache key.
+
+    Returns:
+        tuple: (builder result, rejection fingerprint, rejection source, None)
+            or (None, None, None, error response)
+    """
+    try:
+        start = parse_report_date(data.get('start_date'), 'start_date')
+        end = parse_report_date(data.get('end_date'), 'end_date')
+        company_id = int(data.get('company_id'))
+    except (TypeError, ValueError) as e:
+        return None, None, None, (jsonify({'error': str(e)}), 400)
+    if start > end:
+        return None, None, None, (jsonify({'error': 'start_date must not be after end_date'}), 400)
+
+    company = load_report_company(db.session, company_id)
+    if not company:
+        return None, None, None, (jsonify({'error': 'Company not found'}), 404)
+
+    result = builder(db.session, company, start, end, data.get('report_options'), **kwargs)
+    source = {
+        'database_uri': current_app.config['SQLALCHEMY_DATABASE_URI'],
+        'company_id': company_id,
+        'start': start,
+        'end': end
+    }
+    return result, rejection_fingerprint(db.session, company_id, start, end), source, None
+
+
 @production_bp.route('/api/generate-production-report', methods=['POST'])
 def generate_production_report():
     """Generate production report PDF"""
@@ -16,9 +61,26 @@ def generate_production_report():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        # Generate PDF
-        pdf_generator = ProductionPDFGenerator()
-        pdf_buffer = pdf_generator.generate_production_report(data, 'production_report.pdf')
+        # Assemble the report from the database when only the company and range are posted
+        if data.get('company_id') is not None:
+            data, rejections_version, rejection_source, error = _server_report_args(
+                data, build_pdf_report_data, remarks=data.get('remarks', '')
+            )
+            if error:
+                return error
+            data = {k: v for k, v in data.items() if k != 'rejected_modules'}
+            key_inputs = (data, rejections_version)
+        else:
+            rejection_source = None
+            key_inputs = (data,)
+        
+        # Generate PDF on the render pool (served from the render cache when the same report
+        # was rendered before)
+        pdf_bytes = get_render_cache(current_app).render(
+            cache_key('production_pdf', *key_inputs),
+            lambda: get_render_service(current_app).run(render_production_pdf_bytes, data, rejection_source)
+        )
+        pdf_buffer = BytesIO(pdf_bytes)
         
         # Save to generated_pdfs folder
         output_dir = os.path.join(os.path.dirname(__file__), '../../generated_pdfs')
@@ -39,6 +101,8 @@ def generate_production_report():
             download_name=filename
         )
         
+    except RenderUnavailable as e:
+        return render_unavailable_response(e)
     except Exception as e:
         print(f"Error generating production report: {str(e)}")
         import traceback
@@ -55,36 +119,45 @@ def generate_production_excel_report():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        # Extract data
-        company = data.get('company', {})
-        production_data = data.get('production_data', [])
-        rejections = data.get('rejections', [])
-        start_date = data.get('start_date', '')
-        end_date = data.get('end_date', '')
-        cells_received_qty = data.get('cells_received_qty', 0)
-        cells_received_mw = data.get('cells_received_mw', 0)
-        report_options = data.get('report_options', {})
+        # Assemble the report from the database when only the company and range are posted
+        if data.get('company_id') is not None:
+            args, rejections_version, rejection_source, error = _server_report_args(data, build_excel_report_args)
+            if error:
+                return error
+            args = args[:2] + (None,) + args[3:]
+            key_inputs = (args[:2] + args[3:], rejections_version)
+        else:
+            rejection_source = None
+            args = (
+                data.get('company', {}),
+                data.get('production_data', []),
+                data.get('rejections', []),
+                data.get('start_date', ''),
+                data.get('end_date', ''),
+                data.get('cells_received_qty', 0),
+                data.get('cells_received_mw', 0),
+                data.get('report_options', {})
+            )
+            key_inputs = args
         
-        # Generate Excel
-        filepath = generate_production_excel(
-            company, 
-            production_data, 
-            rejections, 
-            start_date, 
-            end_date,
-            cells_received_qty,
-            cells_received_mw,
-            report_options
+        # Generate Excel on the render pool (served from the render cache when the same report
+        # was rendered before)
+        excel_bytes = get_render_cache(current_app).render(
+            cache_key('production_excel', *key_inputs),
+            lambda: get_render_service(current_app).run(render_production_excel_bytes, args, rejection_source)
         )
         
         # Return the Excel file
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         return send_file(
-            filepath,
+            BytesIO(excel_bytes),
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             as_attachment=True,
-            download_name=os.path.basename(filepath)
+            download_name=f"Production_Report_{args[0].get('name', 'Report')}_{timestamp}.xlsx"
         )
         
+    except RenderUnavailable as e:
+        return render_unavailable_response(e)
     except Exception as e:
         print(f"Error generating Excel report: {str(e)}")
         import traceback
@@ -0,0 +1,160 @@
+"""
+Company Queries
+Summary listing with pre-aggregated counts, opt-in eager includes and
+paginated, date-filtered production / rejection sub-resources
+"""
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+from app.models.database import Company, ProductionRecord, RejectedModule
+from app.services.production_report_data import parse_report_date
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 5000
+
+# Summary keys accepted by ?fields=
+SUMMARY_FIELDS = (
+    'companyName', 'moduleWattage', 'moduleType', 'cellsPerModule', 'cellsReceivedQty',
+    'cellsReceivedMW', 'createdDate', 'productionRecordCount', 'rejectedModuleCount',
+)
+
+
+def _parse_list(value, allowed, name):
+    if not value:
+        return []
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    unknown = [item for item in items if item not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown {name}: {', '.join(unknown)}")
+    return items
+
+
+def parse_company_args(args):
+    """
+    Read fields / include / start_date / end_date from request args
+
+    Returns:
+        dict: fields, include, start, end
+
+    Raises:
+        ValueError: On unknown names or malformed dates
+    """
+    start = args.get('start_date')
+    end = args.get('end_date')
+    return {
+        'fields': _parse_list(args.get('fields'), SUMMARY_FIELDS, 'fields'),
+        'include': _parse_list(args.get('include'), Company.INCLUDES, 'include'),
+        'start': parse_report_date(start, 'start_date') if start else None,
+        'end': parse_report_date(end, 'end_date') if end else None,
+    }
+
+
+def parse_page_args(args):
+    """
+    limit / offset from request args, clamped to MAX_PAGE_SIZE
+
+    Raises:
+        ValueError: On non-integer values
+    """
+    limit = min(max(int(args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    offset = max(int(args.get('offset', 0)), 0)
+    return limit, offset
+
+
+def _date_range(column, start, end):
+    criteria = []
+    if start is not None:
+        criteria.append(column >= start)
+    if end is not None:
+        criteria.append(column <= end)
+    return criteria
+
+
+def _include_options(include, start, end):
+    """selectinload options for the requested collections, restricted to the date range"""
+    options = []
+    if 'production_records' in include:
+        criteria = _date_range(ProductionRecord.date, start, end)
+        rel = Company.production_records.and_(*criteria) if criteria else Company.production_records
+        options.append(selectinload(rel))
+    if 'rejected_modules' in include:
+        criteria = _date_range(RejectedModule.rejection_date, start, end)
+        rel = Company.rejected_modules.and_(*criteria) if criteria else Company.rejected_modules
+        options.append(selectinload(rel))
+    return options
+
+
+def _count_subquery(model, label):
+    return (
+        select(model.company_id, func.count(model.id).label(label))
+        .group_by(model.company_id)
+        .subquery()
+    )
+
+
+def query_companies(session, company_id=None, include=(), start=None, end=None):
+    """
+    Companies with their production / rejection counts in one statement
+
+    Counts come from grouped subqueries joined to companies, so no collection
+    is loaded unless it is asked for through include (one extra SELECT ... IN
+    per collection, not one per company).
+
+    Returns:
+        list: (Company, production_record_count, rejected_module_count) tuples
+    """
+    production_counts = _count_subquery(ProductionRecord, 'production_count')
+    rejection_counts = _count_subquery(RejectedModule, 'rejection_count')
+
+    stmt = (
+        select(
+            Company,
+            func.coalesce(production_counts.c.production_count, 0),
+            func.coalesce(rejection_counts.c.rejection_count, 0)
+        )
+        .outerjoin(production_counts, production_counts.c.company_id == Company.id)
+        .outerjoin(rejection_counts, rejection_counts.c.company_id == Company.id)
+        .order_by(Company.id)
+        .options(*_include_options(include, start, end))
+    )
+    if company_id is not None:
+        stmt = stmt.where(Company.id == company_id)
+    return [tuple(row) for row in session.execute(stmt)]
+
+
+def serialize_companies(rows, fields=(), include=()):
+    """(Company, counts...) rows -> to_dict payloads"""
+    return [
+        company.to_dict(include=include, counts=(production_count, rejection_count), fields=fields)
+        for company, production_count, rejection_count in rows
+    ]
+
+
+def _page(session, model, company_id, date_column, order_by, start, end, limit, offset):
+    criteria = [model.company_id == company_id] + _date_range(date_column, start, end)
+    total = session.execute(select(func.count()).select_from(model).where(*criteria)).scalar()
+    items = session.execute(
+        select(model).where(*criteria).order_by(*order_by).limit(limit).offset(offset)
+    ).scalars()
+    return {
+        'items': [item.to_dict() for item in items],
+        'total': total,
+        'limit': limit,
+        'offset': offset,
+        'has_more': offset + limit < total
+    }
+
+
+def page_production_records(session, company_id, start=None, end=None, limit=DEFAULT_PAGE_SIZE, offset=0):
+    """One page of a company's production records ordered by date"""
+    return _page(
+        session, ProductionRecord, company_id, ProductionRecord.date,
+        (ProductionRecord.date, ProductionRecord.id), start, end, limit, offset
+    )
+
+
+def page_rejected_modules(session, company_id, start=None, end=None, limit=DEFAULT_PAGE_SIZE, offset=0):
+    """One page of a company's rejections ordered by date then serial"""
+    return _page(
+        session, RejectedModule, company_id, RejectedModule.rejection_date,
+        (RejectedModule.rejection_date, RejectedModule.serial_number, RejectedModule.id), start, end, limit, offset
+    )
@@ -1,14 +1,159 @@
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
 from openpyxl.utils import get_column_letter
+from copy import copy
 from datetime import datetime
 import os
 import json
 
+
+def _solid(color):
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+_THIN_BORDER = Border(left=Side(style='thin'), right=Side(style='thin'),
+                      top=Side(style='thin'), bottom=Side(style='thin'))
+_MEDIUM_BORDER = Border(left=Side(style='medium'), right=Side(style='medium'),
+                        top=Side(style='medium'), bottom=Side(style='medium'))
+_CENTER = Alignment(horizontal='center', vertical='center')
+
+_INVENTORY_FILLS = ("E8F5E9", "FFF9C4", "FFCCBC", "C5E1A5")
+_KPI_COLORS = ("4CAF50", "2196F3", "FF9800", "F44336")
+_STATUS_FILLS = {'low': "C8E6C9", 'medium': "FFF9C4", 'high': "FFCCBC", 'critical': "FFCDD2"}
+
+
+def _production_style_specs():
+    """Name -> NamedStyle attributes of every cell style used by the production report sheets"""
+    white_title = Font(name='Calibri', size=16, bold=True, color="FFFFFF")
+    specs = {
+        # Summary
+        'pr_summary_title': dict(font=Font(name='Calibri', size=18, bold=True, color="FFFFFF"),
+                                 fill=_solid("0D47A1"), alignment=_CENTER, border=_THIN_BORDER),
+        'pr_summary_header': dict(font=Font(name='Calibri', size=14, bold=True, color="FFFFFF"),
+                                  fill=_solid("1976D2"), alignment=_CENTER, border=_THIN_BORDER),
+        'pr_summary_label': dict(font=Font(name='Calibri', size=11, bold=True), fill=_solid("E3F2FD"), border=_THIN_BORDER),
+        'pr_summary_value': dict(font=Font(name='Calibri', size=11), border=_THIN_BORDER),
+        'pr_summary_total_label': dict(font=Font(name='Calibri', size=11, bold=True), fill=_solid("C8E6C9"), border=_THIN_BORDER),
+        'pr_summary_total_value': dict(font=Font(name='Calibri', size=12, bold=True),
+                                       alignment=Alignment(horizontal='center'), border=_THIN_BORDER),
+        'pr_border': dict(border=_THIN_BORDER),
+        # Production Details
+        'pr_production_header': dict(font=Font(name='Calibri', size=11, bold=True, color="FFFFFF"),
+                                     fill=_solid("FF6F00"), alignment=_CENTER, border=_THIN_BORDER),
+        # Cell Inventory
+        'pr_inventory_title': dict(font=white_title, fill=_solid("4CAF50"), alignment=_CENTER),
+        'pr_inventory_header': dict(font=Font(name='Calibri', size=12, bold=True, color="FFFFFF"),
+                                    fill=_solid("81C784"), alignment=_CENTER),
+        # KPI Metrics
+        'pr_kpi_title': dict(font=white_title, fill=_solid("9C27B0"), alignment=_CENTER),
+        'pr_kpi_value': dict(font=Font(name='Calibri', size=14, bold=True), alignment=_CENTER,
+                             border=_MEDIUM_BORDER, number_format='#,##0.00'),
+        'pr_kpi_value_pct': dict(font=Font(name='Calibri', size=14, bold=True), alignment=_CENTER,
+                                 border=_MEDIUM_BORDER, number_format='0.00"%"'),
+        'pr_kpi_text': dict(font=Font(name='Calibri', size=11), alignment=_CENTER, border=_MEDIUM_BORDER),
+        'pr_kpi_border': dict(border=_MEDIUM_BORDER),
+        # Rejection Summary
+        'pr_rejsum_title': dict(font=white_title, fill=_solid("E91E63"), alignment=_CENTER),
+        'pr_rejsum_header': dict(font=Font(name='Calibri', size=11, bold=True, color="FFFFFF"),
+                                 fill=_solid("F48FB1"), alignment=_CENTER, border=_THIN_BORDER),
+        'pr_rejsum_text': dict(alignment=Alignment(horizontal='center'), border=_THIN_BORDER),
+        'pr_rejsum_int': dict(alignment=Alignment(horizontal='center'), border=_THIN_BORDER, number_format='#,##0'),
+        'pr_rejsum_pct': dict(alignment=Alignment(horizontal='center'), border=_THIN_BORDER, number_format='0.00%'),
+        # Rejection Details
+        'pr_rejdet_title': dict(font=white_title, fill=_solid("D32F2F"), alignment=_CENTER),
+        'pr_rejdet_header': dict(font=Font(name='Calibri', size=11, bold=True, color="FFFFFF"),
+                                 fill=_solid("EF5350"), alignment=_CENTER, border=_THIN_BORDER),
+        'pr_rejdet_major': dict(font=Font(name='Calibri', size=10, bold=True), fill=_solid("FFCDD2"),
+                                alignment=Alignment(horizontal='center'), border=_THIN_BORDER),
+        'pr_rejdet_minor': dict(font=Font(name='Calibri', size=10, bold=True), fill=_solid("FFF9C4"),
+                                alignment=Alignment(horizontal='center'), border=_THIN_BORDER),
+    }
+
+    # Production Details data cells: plain / '#,##0' / '0.00%', with the light fill on even rows
+    data_font = Font(name='Calibri', size=10)
+    for kind, number_format in (('text', 'General'), ('int', '#,##0'), ('pct', '0.00%')):
+        specs[f'pr_production_{kind}'] = dict(font=data_font, alignment=_CENTER, border=_THIN_BORDER,
+                                              number_format=number_format)
+        specs[f'pr_production_{kind}_alt'] = dict(font=data_font, alignment=_CENTER, border=_THIN_BORDER,
+                                                  number_format=number_format, fill=_solid("FFF3E0"))
+
+    # Cell Inventory rows: one fill per row, per-column font / number format
+    for color in _INVENTORY_FILLS:
+        common = dict(fill=_solid(color), alignment=_CENTER, border=_THIN_BORDER)
+        specs[f'pr_inventory_label_{color}'] = dict(common, font=Font(name='Calibri', size=11, bold=True))
+        specs[f'pr_inventory_int_{color}'] = dict(common, number_format='#,##0')
+        specs[f'pr_inventory_pct_{color}'] = dict(common, number_format='0.00%')
+        specs[f'pr_inventory_status_{color}'] = dict(common, font=Font(name='Calibri', size=10))
+
+    for color in _KPI_COLORS:
+        specs[f'pr_kpi_name_{color}'] = dict(font=Font(name='Calibri', size=13, bold=True), fill=_solid(color),
+                                             alignment=_CENTER, border=_MEDIUM_BORDER)
+
+    for level, color in _STATUS_FILLS.items():
+        specs[f'pr_rejsum_status_{level}'] = dict(font=Font(name='Calibri', size=10, bold=True), fill=_solid(color),
+                                                  alignment=Alignment(horizontal='center'), border=_THIN_BORDER)
+
+    # Rejection Details: centred / left-aligned columns, light fill on even rows
+    for kind, alignment in (('center', Alignment(horizontal='center')), ('left', Alignment(horizontal='left'))):
+        specs[f'pr_rejdet_{kind}'] = dict(alignment=alignment, border=_THIN_BORDER)
+        specs[f'pr_rejdet_{kind}_alt'] = dict(alignment=alignment, border=_THIN_BORDER, fill=_solid("FFEBEE"))
+    return specs
+
+
+PRODUCTION_STYLE_SPECS = _production_style_specs()
+
+
+def add_production_styles(wb):
+    """Register the production report NamedStyles on a workbook (cells then reference them by name)"""
+    for name, attrs in PRODUCTION_STYLE_SPECS.items():
+        # NamedStyle's own default font is blank, cells without a font keep the workbook default
+        wb.add_named_style(NamedStyle(name=name, **{'font': DEFAULT_FONT, **attrs}))
+
+
+def _cell_factory(ws):
+    """
+    Write-only cell constructor for one sheet: cell(value, style_name)
+    
+    Each NamedStyle is resolved by name once, later cells copy its style array
+    instead of searching the workbook's style list again.
+    """
+    resolved = {}
+    
+    def cell(value, style):
+        c = WriteOnlyCell(ws, value=value)
+        array = resolved.get(style)
+        if array is None:
+            c.style = style
+            resolved[style] = c._style
+        else:
+            c._style = copy(array)
+        return c
+    
+    return cell
+
+
+def _set_widths(ws, widths):
+    # Write-only sheets emit <cols> before the first row, so widths go first
+    for col, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+
+def _merge(ws, coord):
+    # Write-only sheets keep merges as ranges and emit them when the sheet is closed
+    ws.merged_cells.add(coord)
+
+
 def generate_production_excel(company, production_data, rejections, start_date, end_date, 
-                              cells_received_qty=0, cells_received_mw=0, report_options=None):
+                              cells_received_qty=0, cells_received_mw=0, report_options=None, output_path=None):
     """
     Generate colorful Excel report with multiple sheets based on selected options
+    
+    The workbook is write-only: every sheet is written row by row in one pass,
+    with cells referencing the NamedStyles from add_production_styles.
+    
+    output_path: File path or file-like object to write (timestamped file in generated_pdfs if None)
     """
     if report_options is None:
         report_options = {
@@ -19,11 +164,9 @@ def generate_production_excel(company, production_data, rejections, start_date,
             'includeRejections': True
         }
     
-    wb = Workbook()
-    
-    # Remove default sheet
-    if 'Sheet' in wb.sheetnames:
-        wb.remove(wb['Sheet'])
+    # Write-only workbooks start without a default sheet
+    wb = Workbook(write_only=True)
+    add_production_styles(wb)
     
     # Sheet 1: Company Info & Summary (Always included)
     create_summary_sheet(wb, company, production_data, start_date, end_date, 
@@ -50,6 +193,10 @@ def generate_production_excel(company, production_data, rejections, start_date,
         create_rejection_details_sheet(wb, rejections)
     
     # Save file
+    if output_path is not None:
+        wb.save(output_path)
+        return output_path
+    
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"Production_Report_{company['name']}_{timestamp}.xlsx"
     
@@ -64,27 +211,37 @@ def generate_production_excel(company, production_data, rejections, start_date,
 def create_summary_sheet(wb, company, production_data, start_date, end_date, 
                         cells_received_qty, cells_received_mw):
     """Sheet 1: Company Info & Summary"""
-    ws = wb.create_sheet("Summary", 0)
-    
-    # Header styling
-    header_fill = PatternFill(start_color="1976D2", end_color="1976D2", fill_type="solid")
-    header_font = Font(name='Calibri', size=14, bold=True, color="FFFFFF")
+    ws = wb.create_sheet("Summary")
+    cell = _cell_factory(ws)
+    _set_widths(ws, [20, 18, 18, 20, 18, 18])
+    
+    def border_row():
+        return [cell(None, 'pr_border') for _ in range(6)]
+    
+    def section_row(title, style):
+        return [cell(title, style)] + [cell(None, 'pr_border') for _ in range(5)]
+    
+    def pair_row(values, label_style, value_style):
+        # Label | value (merged B:C) | label | value (merged E:F)
+        return [
+            cell(values[0], label_style),
+            cell(values[1], value_style),
+            cell(None, 'pr_border'),
+            cell(values[2], label_style),
+            cell(values[3], value_style),
+            cell(None, 'pr_border'),
+        ]
     
     # Title
-    ws.merge_cells('A1:F1')
-    ws['A1'] = "PRODUCTION REPORT"
-    ws['A1'].font = Font(name='Calibri', size=18, bold=True, color="FFFFFF")
-    ws['A1'].fill = PatternFill(start_color="0D47A1", end_color="0D47A1", fill_type="solid")
-    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
+    _merge(ws, 'A1:F1')
     ws.row_dimensions[1].height = 30
+    ws.append(section_row("PRODUCTION REPORT", 'pr_summary_title'))
+    ws.append(border_row())
     
     # Company Info Header
-    ws.merge_cells('A3:F3')
-    ws['A3'] = "COMPANY INFORMATION"
-    ws['A3'].font = header_font
-    ws['A3'].fill = header_fill
-    ws['A3'].alignment = Alignment(horizontal='center', vertical='center')
+    _merge(ws, 'A3:F3')
     ws.row_dimensions[3].height = 25
+    ws.append(section_row("COMPANY INFORMATION", 'pr_summary_header'))
     
     # Company Details
     info_data = [
@@ -93,37 +250,18 @@ def create_summary_sheet(wb, company, production_data, start_date, end_date,
         ['Contact:', company.get('contact', 'N/A'), 'Module Type:', company.get('module_type', 'N/A')],
     ]
     
-    label_fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-    label_font = Font(name='Calibri', size=11, bold=True)
-    value_font = Font(name='Calibri', size=11)
-    
     row = 4
     for info_row in info_data:
-        ws[f'A{row}'] = info_row[0]
-        ws[f'A{row}'].font = label_font
-        ws[f'A{row}'].fill = label_fill
-        
-        ws.merge_cells(f'B{row}:C{row}')
-        ws[f'B{row}'] = info_row[1]
-        ws[f'B{row}'].font = value_font
-        
-        ws[f'D{row}'] = info_row[2]
-        ws[f'D{row}'].font = label_font
-        ws[f'D{row}'].fill = label_fill
-        
-        ws.merge_cells(f'E{row}:F{row}')
-        ws[f'E{row}'] = info_row[3]
-        ws[f'E{row}'].font = value_font
-        
+        _merge(ws, f'B{row}:C{row}')
+        _merge(ws, f'E{row}:F{row}')
+        ws.append(pair_row(info_row, 'pr_summary_label', 'pr_summary_value'))
         row += 1
+    ws.append(border_row())
     
     # Production Summary Header
-    ws.merge_cells(f'A{row+1}:F{row+1}')
-    ws[f'A{row+1}'] = "PRODUCTION SUMMARY"
-    ws[f'A{row+1}'].font = header_font
-    ws[f'A{row+1}'].fill = header_fill
-    ws[f'A{row+1}'].alignment = Alignment(horizontal='center', vertical='center')
+    _merge(ws, f'A{row+1}:F{row+1}')
     ws.row_dimensions[row+1].height = 25
+    ws.append(section_row("PRODUCTION SUMMARY", 'pr_summary_header'))
     
     # Calculate totals
     total_day = sum(p.get('day_production', 0) for p in production_data)
@@ -138,72 +276,31 @@ def create_summary_sheet(wb, company, production_data, start_date, end_date,
         ['Production Days:', f"{len(production_data)} Days", 'Avg Daily:', f"{total_prod//len(production_data) if production_data else 0:,} Modules"],
     ]
     
-    green_fill = PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid")
-    
     for summary_row in summary_data:
-        ws[f'A{row}'] = summary_row[0]
-        ws[f'A{row}'].font = label_font
-        ws[f'A{row}'].fill = green_fill
-        
-        ws.merge_cells(f'B{row}:C{row}')
-        ws[f'B{row}'] = summary_row[1]
-        ws[f'B{row}'].font = Font(name='Calibri', size=12, bold=True)
-        ws[f'B{row}'].alignment = Alignment(horizontal='center')
-        
-        ws[f'D{row}'] = summary_row[2]
-        ws[f'D{row}'].font = label_font
-        ws[f'D{row}'].fill = green_fill
-        
-        ws.merge_cells(f'E{row}:F{row}')
-        ws[f'E{row}'] = summary_row[3]
-        ws[f'E{row}'].font = Font(name='Calibri', size=12, bold=True)
-        ws[f'E{row}'].alignment = Alignment(horizontal='center')
-        
+        _merge(ws, f'B{row}:C{row}')
+        _merge(ws, f'E{row}:F{row}')
+        ws.append(pair_row(summary_row, 'pr_summary_total_label', 'pr_summary_total_value'))
         row += 1
-    
-    # Set column widths
-    ws.column_dimensions['A'].width = 20
-    ws.column_dimensions['B'].width = 18
-    ws.column_dimensions['C'].width = 18
-    ws.column_dimensions['D'].width = 20
-    ws.column_dimensions['E'].width = 18
-    ws.column_dimensions['F'].width = 18
-    
-    # Add borders
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    for row_cells in ws.iter_rows(min_row=1, max_row=row, min_col=1, max_col=6):
-        for cell in row_cells:
-            cell.border = thin_border
+    ws.append(border_row())
 
 def create_production_sheet(wb, production_data):
     """Sheet 2: Daily Production Details"""
     ws = wb.create_sheet("Production Details")
+    cell = _cell_factory(ws)
+    _set_widths(ws, [12, 14, 12, 12, 15, 12, 12, 14, 12, 16])
     
     # Header
     headers = ['Date', 'Day of Week', 'Day Shift', 'Night Shift', 'Total Production', 
                'Cells Used', 'Cell Rej %', 'Cells Rejected', 'Module Rej %', 'Modules Rejected']
-    
-    header_fill = PatternFill(start_color="FF6F00", end_color="FF6F00", fill_type="solid")
-    header_font = Font(name='Calibri', size=11, bold=True, color="FFFFFF")
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-    
     ws.row_dimensions[1].height = 25
+    ws.append([cell(header, 'pr_production_header') for header in headers])
     
-    # Data rows
-    data_font = Font(name='Calibri', size=10)
-    light_fill = PatternFill(start_color="FFF3E0", end_color="FFF3E0", fill_type="solid")
+    # Per-column style kinds: text, production / rejection numbers, percentages
+    kinds = ['text', 'text', 'int', 'int', 'int', 'int', 'pct', 'int', 'pct', 'int']
+    plain_styles = [f'pr_production_{kind}' for kind in kinds]
+    alt_styles = [f'pr_production_{kind}_alt' for kind in kinds]
     
+    # Data rows (sheet row 2 is the first, the light fill goes on even rows)
     for idx, prod in enumerate(production_data, 2):
         day_prod = prod.get('day_production', 0)
         night_prod = prod.get('night_production', 0)
@@ -222,41 +319,14 @@ def create_production_sheet(wb, production_data):
             prod.get('module_rejection_percent', 0),
             prod.get('modules_rejected', 0)
         ]
-        
-        for col, value in enumerate(row_data, 1):
-            cell = ws.cell(row=idx, column=col, value=value)
-            cell.font = data_font
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            
-            if idx % 2 == 0:
-                cell.fill = light_fill
-            
-            # Number formatting
-            if col in [3, 4, 5, 6, 8, 10]:  # Production and rejection numbers
-                cell.number_format = '#,##0'
-            elif col in [7, 9]:  # Percentages
-                cell.number_format = '0.00%'
-    
-    # Set column widths
-    widths = [12, 14, 12, 12, 15, 12, 12, 14, 12, 16]
-    for col, width in enumerate(widths, 1):
-        ws.column_dimensions[get_column_letter(col)].width = width
-    
-    # Add borders
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    for row in ws.iter_rows(min_row=1, max_row=len(production_data)+1, min_col=1, max_col=10):
-        for cell in row:
-            cell.border = thin_border
+        styles = alt_styles if idx % 2 == 0 else plain_styles
+        ws.append([cell(value, style) for value, style in zip(row_data, styles)])
 
 def create_inventory_sheet(wb, production_data, cells_received_qty):
     """Sheet 3: Cell Inventory"""
     ws = wb.create_sheet("Cell Inventory")
+    cell = _cell_factory(ws)
+    _set_widths(ws, [20, 20, 15, 20])
     
     # Convert MW to cells if needed
     if cells_received_qty < 10000:
@@ -269,25 +339,15 @@ def create_inventory_sheet(wb, production_data, cells_received_qty):
     cells_remaining = cells_received_qty - cells_used - cells_rejected
     
     # Title
-    ws.merge_cells('A1:D1')
-    ws['A1'] = "CELL INVENTORY TRACKING"
-    ws['A1'].font = Font(name='Calibri', size=16, bold=True, color="FFFFFF")
-    ws['A1'].fill = PatternFill(start_color="4CAF50", end_color="4CAF50", fill_type="solid")
-    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
+    _merge(ws, 'A1:D1')
     ws.row_dimensions[1].height = 30
+    ws.append([cell("CELL INVENTORY TRACKING", 'pr_inventory_title')])
+    ws.append([])
     
     # Headers
-    header_fill = PatternFill(start_color="81C784", end_color="81C784", fill_type="solid")
-    header_font = Font(name='Calibri', size=12, bold=True, color="FFFFFF")
-    
     headers = ['Category', 'Quantity (Cells)', 'Percentage', 'Status']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=3, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-    
     ws.row_dimensions[3].height = 25
+    ws.append([cell(header, 'pr_inventory_header') for header in headers])
     
     # Data
     inventory_data = [
@@ -297,39 +357,19 @@ def create_inventory_sheet(wb, production_data, cells_received_qty):
         ['Cells Remaining', cells_remaining, (cells_remaining/cells_received_qty*100) if cells_received_qty > 0 else 0, '◉ Available'],
     ]
     
-    fills = [
-        PatternFill(start_color="E8F5E9", end_color="E8F5E9", fill_type="solid"),
-        PatternFill(start_color="FFF9C4", end_color="FFF9C4", fill_type="solid"),
-        PatternFill(start_color="FFCCBC", end_color="FFCCBC", fill_type="solid"),
-        PatternFill(start_color="C5E1A5", end_color="C5E1A5", fill_type="solid"),
-    ]
-    
-    for idx, (data, fill) in enumerate(zip(inventory_data, fills), 4):
-        ws.cell(row=idx, column=1, value=data[0]).font = Font(name='Calibri', size=11, bold=True)
-        ws.cell(row=idx, column=2, value=data[1]).number_format = '#,##0'
-        ws.cell(row=idx, column=3, value=data[2]/100).number_format = '0.00%'
-        ws.cell(row=idx, column=4, value=data[3]).font = Font(name='Calibri', size=10)
-        
-        for col in range(1, 5):
-            cell = ws.cell(row=idx, column=col)
-            cell.fill = fill
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-    
-    # Set column widths
-    ws.column_dimensions['A'].width = 20
-    ws.column_dimensions['B'].width = 20
-    ws.column_dimensions['C'].width = 15
-    ws.column_dimensions['D'].width = 20
+    for data, color in zip(inventory_data, _INVENTORY_FILLS):
+        ws.append([
+            cell(data[0], f'pr_inventory_label_{color}'),
+            cell(data[1], f'pr_inventory_int_{color}'),
+            cell(data[2]/100, f'pr_inventory_pct_{color}'),
+            cell(data[3], f'pr_inventory_status_{color}'),
+        ])
 
 def create_kpi_sheet(wb, production_data, cells_received_qty):
     """Sheet 4: KPI Metrics"""
     ws = wb.create_sheet("KPI Metrics")
+    cell = _cell_factory(ws)
+    _set_widths(ws, [15, 15, 18, 12, 18])
     
     # Calculate KPIs
     total_production = sum(p.get('day_production', 0) + p.get('night_production', 0) for p in production_data)
@@ -342,12 +382,10 @@ def create_kpi_sheet(wb, production_data, cells_received_qty):
     efficiency = ((total_production - total_modules_rejected) / total_production * 100) if total_production > 0 else 0
     
     # Title
-    ws.merge_cells('A1:E1')
-    ws['A1'] = "KEY PERFORMANCE INDICATORS (KPI)"
-    ws['A1'].font = Font(name='Calibri', size=16, bold=True, color="FFFFFF")
-    ws['A1'].fill = PatternFill(start_color="9C27B0", end_color="9C27B0", fill_type="solid")
-    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
+    _merge(ws, 'A1:E1')
     ws.row_dimensions[1].height = 30
+    ws.append([cell("KEY PERFORMANCE INDICATORS (KPI)", 'pr_kpi_title')])
+    ws.append([])
     
     # KPI Data
     kpis = [
@@ -360,197 +398,97 @@ def create_kpi_sheet(wb, production_data, cells_received_qty):
     
     row = 3
     for kpi in kpis:
-        # KPI Name
-        ws.merge_cells(f'A{row}:B{row}')
-        cell = ws[f'A{row}']
-        cell.value = kpi[0]
-        cell.font = Font(name='Calibri', size=13, bold=True)
-        cell.fill = PatternFill(start_color=kpi[3][1:], end_color=kpi[3][1:], fill_type="solid")
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Value
-        ws[f'C{row}'] = kpi[1]
-        ws[f'C{row}'].font = Font(name='Calibri', size=14, bold=True)
-        ws[f'C{row}'].alignment = Alignment(horizontal='center', vertical='center')
-        if kpi[2] == '%':
-            ws[f'C{row}'].number_format = '0.00"%"'
-        else:
-            ws[f'C{row}'].number_format = '#,##0.00'
-        
-        # Unit
-        ws[f'D{row}'] = kpi[2]
-        ws[f'D{row}'].font = Font(name='Calibri', size=11)
-        ws[f'D{row}'].alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Status
-        ws[f'E{row}'] = kpi[4]
-        ws[f'E{row}'].font = Font(name='Calibri', size=11)
-        ws[f'E{row}'].alignment = Alignment(horizontal='center', vertical='center')
-        
+        # KPI Name (merged A:B) | Value | Unit | Status, every other row
+        _merge(ws, f'A{row}:B{row}')
         ws.row_dimensions[row].height = 30
+        ws.append([
+            cell(kpi[0], f'pr_kpi_name_{kpi[3][1:]}'),
+            cell(None, 'pr_kpi_border'),
+            cell(kpi[1], 'pr_kpi_value_pct' if kpi[2] == '%' else 'pr_kpi_value'),
+            cell(kpi[2], 'pr_kpi_text'),
+            cell(kpi[4], 'pr_kpi_text'),
+        ])
+        ws.append([])
         row += 2
-    
-    # Set column widths
-    ws.column_dimensions['A'].width = 15
-    ws.column_dimensions['B'].width = 15
-    ws.column_dimensions['C'].width = 18
-    ws.column_dimensions['D'].width = 12
-    ws.column_dimensions['E'].width = 18
-    
-    # Add borders
-    thin_border = Border(
-        left=Side(style='medium'),
-        right=Side(style='medium'),
-        top=Side(style='medium'),
-        bottom=Side(style='medium')
-    )
-    
-    for r in range(3, row, 2):
-        for c in range(1, 6):
-            ws.cell(row=r, column=c).border = thin_border
 
 def create_rejection_summary_sheet(wb, production_data):
     """Sheet 5: Day-wise Rejection Summary"""
     ws = wb.create_sheet("Rejection Summary")
+    cell = _cell_factory(ws)
+    _set_widths(ws, [12, 14, 18, 15, 15])
     
     # Header
-    ws.merge_cells('A1:E1')
-    ws['A1'] = "DAY-WISE REJECTION SUMMARY"
-    ws['A1'].font = Font(name='Calibri', size=16, bold=True, color="FFFFFF")
-    ws['A1'].fill = PatternFill(start_color="E91E63", end_color="E91E63", fill_type="solid")
-    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
+    _merge(ws, 'A1:E1')
     ws.row_dimensions[1].height = 30
+    ws.append([cell("DAY-WISE REJECTION SUMMARY", 'pr_rejsum_title')])
+    ws.append([])
     
     # Column headers
     headers = ['Date', 'Day', 'Modules Rejected', 'Rejection %', 'Status']
-    header_fill = PatternFill(start_color="F48FB1", end_color="F48FB1", fill_type="solid")
-    header_font = Font(name='Calibri', size=11, bold=True, color="FFFFFF")
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=3, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-    
     ws.row_dimensions[3].height = 25
+    ws.append([cell(header, 'pr_rejsum_header') for header in headers])
     
     # Data
-    for idx, prod in enumerate(production_data, 4):
+    for prod in production_data:
         total = prod.get('day_production', 0) + prod.get('night_production', 0)
         rejected = prod.get('modules_rejected', 0)
         rej_pct = (rejected / total * 100) if total > 0 else 0
         
         # Status indicator
         if rej_pct < 0.5:
-            status = '✓ Low'
-            status_fill = PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid")
+            status, level = '✓ Low', 'low'
         elif rej_pct < 1:
-            status = '⚠ Medium'
-            status_fill = PatternFill(start_color="FFF9C4", end_color="FFF9C4", fill_type="solid")
+            status, level = '⚠ Medium', 'medium'
         elif rej_pct < 2:
-            status = '⚠ High'
-            status_fill = PatternFill(start_color="FFCCBC", end_color="FFCCBC", fill_type="solid")
+            status, level = '⚠ High', 'high'
         else:
-            status = '✗ Critical'
-            status_fill = PatternFill(start_color="FFCDD2", end_color="FFCDD2", fill_type="solid")
-        
-        ws.cell(row=idx, column=1, value=prod.get('date', '')).alignment = Alignment(horizontal='center')
-        ws.cell(row=idx, column=2, value=prod.get('day_of_week', '')).alignment = Alignment(horizontal='center')
-        ws.cell(row=idx, column=3, value=rejected).number_format = '#,##0'
-        ws.cell(row=idx, column=3).alignment = Alignment(horizontal='center')
-        ws.cell(row=idx, column=4, value=rej_pct/100).number_format = '0.00%'
-        ws.cell(row=idx, column=4).alignment = Alignment(horizontal='center')
-        ws.cell(row=idx, column=5, value=status).fill = status_fill
-        ws.cell(row=idx, column=5).alignment = Alignment(horizontal='center')
-        ws.cell(row=idx, column=5).font = Font(name='Calibri', size=10, bold=True)
-    
-    # Set column widths
-    ws.column_dimensions['A'].width = 12
-    ws.column_dimensions['B'].width = 14
-    ws.column_dimensions['C'].width = 18
-    ws.column_dimensions['D'].width = 15
-    ws.column_dimensions['E'].width = 15
-    
-    # Add borders
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    for row in ws.iter_rows(min_row=3, max_row=len(production_data)+3, min_col=1, max_col=5):
-        for cell in row:
-            cell.border = thin_border
+            status, level = '✗ Critical', 'critical'
+        
+        ws.append([
+            cell(prod.get('date', ''), 'pr_rejsum_text'),
+            cell(prod.get('day_of_week', ''), 'pr_rejsum_text'),
+            cell(rejected, 'pr_rejsum_int'),
+            cell(rej_pct/100, 'pr_rejsum_pct'),
+            cell(status, f'pr_rejsum_status_{level}'),
+        ])
 
 def create_rejection_details_sheet(wb, rejections):
-    """Sheet 6: Detailed Rejections"""
+    """
+    Sheet 6: Detailed Rejections
+    
+    Each rejection becomes one appended row of named-style cells, so rejections
+    can be a generator and is consumed in a single pass.
+    """
     ws = wb.create_sheet("Rejection Details")
+    cell = _cell_factory(ws)
+    _set_widths(ws, [8, 12, 25, 30, 15, 15, 25])
     
     # Header
-    ws.merge_cells('A1:G1')
-    ws['A1'] = "DETAILED REJECTION RECORDS"
-    ws['A1'].font = Font(name='Calibri', size=16, bold=True, color="FFFFFF")
-    ws['A1'].fill = PatternFill(start_color="D32F2F", end_color="D32F2F", fill_type="solid")
-    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
+    _merge(ws, 'A1:G1')
     ws.row_dimensions[1].height = 30
+    ws.append([cell("DETAILED REJECTION RECORDS", 'pr_rejdet_title')])
+    ws.append([])
     
     # Column headers
     headers = ['No', 'Date', 'Serial Number', 'Defect Reason', 'Stage', 'Defect Type', 'Remarks']
-    header_fill = PatternFill(start_color="EF5350", end_color="EF5350", fill_type="solid")
-    header_font = Font(name='Calibri', size=11, bold=True, color="FFFFFF")
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=3, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-    
     ws.row_dimensions[3].height = 25
+    ws.append([cell(header, 'pr_rejdet_header') for header in headers])
     
-    # Data
-    light_fill = PatternFill(start_color="FFEBEE", end_color="FFEBEE", fill_type="solid")
-    
+    # Data (sheet row 4 is the first, the light fill goes on even rows)
     for idx, rej in enumerate(rejections, 4):
+        center, left = ('pr_rejdet_center_alt', 'pr_rejdet_left_alt') if idx % 2 == 0 else ('pr_rejdet_center', 'pr_rejdet_left')
         defect_type = rej.get('defect_type', 'Minor')
-        type_fill = PatternFill(start_color="FFCDD2", end_color="FFCDD2", fill_type="solid") if defect_type == 'Major' else PatternFill(start_color="FFF9C4", end_color="FFF9C4", fill_type="solid")
-        
-        ws.cell(row=idx, column=1, value=idx-3).alignment = Alignment(horizontal='center')
-        ws.cell(row=idx, column=2, value=rej.get('date', '')).alignment = Alignment(horizontal='center')
-        ws.cell(row=idx, column=3, value=rej.get('serial', '')).alignment = Alignment(horizontal='left')
-        ws.cell(row=idx, column=4, value=rej.get('reason', '')).alignment = Alignment(horizontal='left')
-        ws.cell(row=idx, column=5, value=rej.get('stage', '')).alignment = Alignment(horizontal='center')
-        ws.cell(row=idx, column=6, value=defect_type).fill = type_fill
-        ws.cell(row=idx, column=6).alignment = Alignment(horizontal='center')
-        ws.cell(row=idx, column=6).font = Font(name='Calibri', size=10, bold=True)
-        ws.cell(row=idx, column=7, value=rej.get('remarks', '')).alignment = Alignment(horizontal='left')
-        
-        if idx % 2 == 0:
-            for col in [1, 2, 3, 4, 5, 7]:
-                ws.cell(row=idx, column=col).fill = light_fill
-    
-    # Set column widths
-    ws.column_dimensions['A'].width = 8
-    ws.column_dimensions['B'].width = 12
-    ws.column_dimensions['C'].width = 25
-    ws.column_dimensions['D'].width = 30
-    ws.column_dimensions['E'].width = 15
-    ws.column_dimensions['F'].width = 15
-    ws.column_dimensions['G'].width = 25
-    
-    # Add borders
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    for row in ws.iter_rows(min_row=3, max_row=len(rejections)+3, min_col=1, max_col=7):
-        for cell in row:
-            cell.border = thin_border
+        ws.append([
+            cell(idx-3, center),
+            cell(rej.get('date', ''), center),
+            cell(rej.get('serial', ''), left),
+            cell(rej.get('reason', ''), left),
+            cell(rej.get('stage', ''), center),
+            cell(defect_type, 'pr_rejdet_major' if defect_type == 'Major' else 'pr_rejdet_minor'),
+            cell(rej.get('remarks', ''), left),
+        ])
 
-def generate_ipqc_excel(ipqc_data, bom_data, metadata):
+def generate_ipqc_excel(ipqc_data, bom_data, metadata, output_path=None):
     """
     Generate IPQC report in Excel format - exactly same as PDF
     
@@ -558,6 +496,7 @@ def generate_ipqc_excel(ipqc_data, bom_data, metadata):
         ipqc_data: List of stages with checkpoints
         bom_data: Bill of Materials data
         metadata: Report metadata (date, shift, customer, etc.)
+        output_path: File path or file-like object to write (timestamped file in generated_pdfs if None)
     
     Returns:
         str: Path to generated Excel file
@@ -712,6 +651,10 @@ def generate_ipqc_excel(ipqc_data, bom_data, metadata):
     ws.column_dimensions['G'].width = 18     # Remarks
     
     # Save file
+    if output_path is not None:
+        wb.save(output_path)
+        return output_path
+    
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     customer_name = metadata.get('customer_id', 'Unknown').replace('/', '_')
     filename = f"IPQC_Report_{customer_name}_{timestamp}.xlsx"
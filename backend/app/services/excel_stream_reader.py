@@ -0,0 +1,132 @@
+"""
+Streaming Excel Reader
+Reads large XLSX uploads row by row (openpyxl read-only mode) in constant memory
+"""
+import os
+import tempfile
+import pandas as pd
+from openpyxl import load_workbook
+
+# Same heuristic the upload routes used on pandas output: if the first data
+# row contains one of these words it is the real header row
+HEADER_KEYWORDS = ('pmax', 'date', 'id')
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def spool_upload(file_storage, folder=None, suffix='.xlsx'):
+    """
+    Save an uploaded file to disk without reading it into memory
+
+    Args:
+        file_storage: werkzeug FileStorage from request.files
+        folder: Directory to spool into (system temp dir if None)
+
+    Returns:
+        str: Path of the spooled file (caller removes it)
+    """
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix='upload_', dir=folder)
+    with os.fdopen(fd, 'wb') as out:
+        file_storage.save(out)
+    return path
+
+
+def _is_empty_row(values):
+    return all(v is None or (isinstance(v, str) and v.strip() == '') for v in values)
+
+
+def _column_names(values):
+    """Header cells -> unique, stripped column names (pandas-style naming)"""
+    names = []
+    seen = {}
+    for idx, value in enumerate(values):
+        name = str(value).strip() if value is not None else f'Unnamed: {idx}'
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+class StreamingExcelReader:
+    """Iterate the first worksheet of an XLSX file as fixed-size DataFrame chunks"""
+
+    def __init__(self, path, header_keywords=HEADER_KEYWORDS):
+        self.path = path
+        self.workbook = load_workbook(path, read_only=True, data_only=True)
+        self.worksheet = self.workbook.worksheets[0]
+        self._rows = self.worksheet.iter_rows(values_only=True)
+        self._pending = None
+        self._consumed = 0
+        self.columns = self._detect_header(header_keywords)
+
+        # Worksheet dimension is only an upper bound (blank rows count too)
+        header_rows = self._consumed - (1 if self._pending is not None else 0)
+        self.estimated_rows = max((self.worksheet.max_row or 0) - header_rows, 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.workbook.close()
+
+    def _next_row(self):
+        """Next non-empty row as a tuple, or None at end of sheet"""
+        for values in self._rows:
+            self._consumed += 1
+            if not _is_empty_row(values):
+                return values
+        return None
+
+    def _detect_header(self, header_keywords):
+        header = self._next_row()
+        if header is None:
+            return []
+
+        first_row = self._next_row()
+        if first_row is not None:
+            first_row_str = ' '.join(str(v).lower() for v in first_row if v is not None)
+            if any(keyword in first_row_str for keyword in header_keywords):
+                # First data row is the real header
+                header = first_row
+            else:
+                self._pending = first_row
+
+        return _column_names(header)
+
+    def iter_rows(self):
+        """Yield data rows as tuples padded/truncated to the header width"""
+        width = len(self.columns)
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            yield tuple(pending[:width]) + (None,) * (width - len(pending))
+        while True:
+            values = self._next_row()
+            if values is None:
+                return
+            yield tuple(values[:width]) + (None,) * (width - len(values))
+
+    def iter_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yield DataFrames of at most chunk_size rows
+
+        The index continues across chunks (0, 1, 2, ...) so it can be used as
+        the row position in the sheet.
+        """
+        chunk = []
+        start = 0
+        for values in self.iter_rows():
+            chunk.append(values)
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame(chunk, columns=self.columns, index=range(start, start + len(chunk)))
+                start += len(chunk)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=self.columns, index=range(start, start + len(chunk)))
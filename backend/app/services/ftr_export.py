@@ -0,0 +1,177 @@
+"""
+FTR Excel Export
+Shared streaming XLSX writer for the FTR download endpoints
+"""
+import math
+import shutil
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+from openpyxl.utils import get_column_letter
+from sqlalchemy import select
+from app.models.master_data import MasterModule
+
+# Header -> master_modules column (SN is the running row number)
+FTR_EXPORT_COLUMNS = (
+    ('ID', MasterModule.serial_number),
+    ('Pmax', MasterModule.pmax),
+    ('Isc', MasterModule.isc),
+    ('Voc', MasterModule.voc),
+    ('Ipm', MasterModule.ipm),
+    ('Vpm', MasterModule.vpm),
+    ('FF', MasterModule.ff),
+    ('Rs', MasterModule.rs),
+    ('Eff', MasterModule.eff),
+    ('Binning', MasterModule.binning),
+)
+FTR_EXPORT_HEADERS = ['SN'] + [header for header, _ in FTR_EXPORT_COLUMNS]
+
+MAX_COLUMN_WIDTH = 20
+FETCH_BATCH_SIZE = 5000
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def query_ftr_rows(session, *criteria, limit=None, order_by=None):
+    """
+    Fetch only the exported columns as plain tuples, ordered by serial
+
+    Args:
+        session: SQLAlchemy session
+        *criteria: WHERE clauses on MasterModule
+        limit: Optional row limit
+        order_by: Sort column (serial_number by default)
+
+    Returns:
+        list: (serial_number, pmax, ..., binning) tuples
+    """
+    stmt = (
+        select(*[column for _, column in FTR_EXPORT_COLUMNS])
+        .where(*criteria)
+        .order_by(order_by if order_by is not None else MasterModule.serial_number)
+        .execution_options(yield_per=FETCH_BATCH_SIZE)
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return [tuple(row) for row in session.execute(stmt)]
+
+
+# Fixed package parts of a one-sheet workbook (style 1 = blue bold centred header)
+_XML_HEAD = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PACKAGE_PARTS = (
+    ('[Content_Types].xml',
+     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+     '<Default Extension="xml" ContentType="application/xml"/>'
+     '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+     '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+     '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+     '</Types>'),
+    ('_rels/.rels',
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+     '</Relationships>'),
+    ('xl/workbook.xml',
+     f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+     '<sheets><sheet name="FTR Data" sheetId="1" r:id="rId1"/></sheets>'
+     '</workbook>'),
+    ('xl/_rels/workbook.xml.rels',
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     f'<Relationship Id="rId1" Type="{_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+     f'<Relationship Id="rId2" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+     '</Relationships>'),
+    ('xl/styles.xml',
+     f'<styleSheet xmlns="{_MAIN_NS}">'
+     '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+     '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+     '<fills count="3"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill>'
+     '<fill><patternFill patternType="solid"><fgColor rgb="004472C4"/><bgColor rgb="004472C4"/></patternFill></fill></fills>'
+     '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+     '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+     '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+     '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1" applyAlignment="1">'
+     '<alignment horizontal="center" vertical="center"/></xf></cellXfs>'
+     '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+     '</styleSheet>'),
+)
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _cell_xml(ref, value, style=''):
+    """One <c> element - numbers as values, everything else as an inline string"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        return f'<c r="{ref}"{style}><v>{value!r}</v></c>'
+    return f'<c r="{ref}"{style} t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>'
+
+
+def build_ftr_workbook(rows, output):
+    """
+    Stream FTR rows into an XLSX written to output
+
+    Rows go to a temp file as sheet XML while the per-column max lengths are
+    collected in the same loop. The sheet part is then assembled as <cols>
+    (known only now) + the streamed rows, so no row is held or revisited.
+
+    Args:
+        rows: Iterable of tuples from query_ftr_rows
+        output: Binary file object the workbook is written to
+    """
+    letters = [get_column_letter(idx) for idx in range(1, len(FTR_EXPORT_HEADERS) + 1)]
+    widths = [len(header) for header in FTR_EXPORT_HEADERS]
+
+    with tempfile.TemporaryFile() as sheet_rows:
+        header = ''.join(_cell_xml(f'{letter}1', value, ' s="1"') for letter, value in zip(letters, FTR_EXPORT_HEADERS))
+        sheet_rows.write(f'<row r="1">{header}</row>'.encode('utf-8'))
+
+        for sn, values in enumerate(rows, 1):
+            row_num = sn + 1
+            cells = [_cell_xml(f'A{row_num}', sn)]
+            for idx, value in enumerate(values, 1):
+                if value is None:
+                    continue
+                length = len(str(value))
+                if length > widths[idx]:
+                    widths[idx] = length
+                cells.append(_cell_xml(f'{letters[idx]}{row_num}', value))
+            sheet_rows.write(f'<row r="{row_num}">{"".join(cells)}</row>'.encode('utf-8'))
+            if len(str(sn)) > widths[0]:
+                widths[0] = len(str(sn))
+
+        cols = ''.join(
+            f'<col min="{idx}" max="{idx}" width="{min(width + 2, MAX_COLUMN_WIDTH)}" customWidth="1"/>'
+            for idx, width in enumerate(widths, 1)
+        )
+
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for name, xml in _PACKAGE_PARTS:
+                zf.writestr(name, _XML_HEAD + xml)
+            with zf.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+                sheet.write(f'{_XML_HEAD}<worksheet xmlns="{_MAIN_NS}"><cols>{cols}</cols><sheetData>'.encode('utf-8'))
+                sheet_rows.seek(0)
+                shutil.copyfileobj(sheet_rows, sheet, COPY_CHUNK_SIZE)
+                sheet.write(b'</sheetData></worksheet>')
+
+
+def send_ftr_workbook(rows, filename):
+    """
+    Build the workbook in an anonymous temp file and stream it as a download
+
+    The file has no name on disk and is removed when the response closes it.
+    """
+    from flask import send_file
+
+    output = tempfile.TemporaryFile()
+    try:
+        build_ftr_workbook(rows, output)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    return send_file(
+        output,
+        mimetype=XLSX_MIMETYPE,
+        as_attachment=True,
+        download_name=filename
+    )
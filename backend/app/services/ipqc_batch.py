@@ -0,0 +1,224 @@
+"""
+IPQC Batch Generation
+Renders IPQC PDF / Excel packs on the render service's process pool - single forms
+as an in-memory ZIP, many (date, shift) packs streamed back as one ZIP
+"""
+import io
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from datetime import datetime
+from itertools import islice
+
+# Fields every spec must carry
+SPEC_FIELDS = ('date', 'shift')
+
+
+def validate_specs(specs, max_specs):
+    """
+    Check and normalize batch specs
+
+    Returns:
+        list: Specs with date, shift, serial_start, module_count (and optional po_number, line)
+
+    Raises:
+        ValueError: On an empty / oversized batch, a malformed spec or two specs
+            sharing a pack name (same date, shift and serial_start)
+    """
+    if not isinstance(specs, list) or not specs:
+        raise ValueError('specs must be a non-empty list')
+    if len(specs) > max_specs:
+        raise ValueError(f'At most {max_specs} specs per batch')
+
+    normalized = []
+    seen = {}
+    for idx, spec in enumerate(specs, 1):
+        if not isinstance(spec, dict):
+            raise ValueError(f'Spec {idx} must be an object')
+        missing = [name for name in SPEC_FIELDS if not spec.get(name)]
+        if missing:
+            raise ValueError(f"Spec {idx} is missing {', '.join(missing)}")
+        try:
+            datetime.strptime(str(spec['date']), '%Y-%m-%d')
+            normalized.append({
+                'date': str(spec['date']),
+                'shift': str(spec['shift']),
+                'serial_start': int(spec.get('serial_start', 1)),
+                'module_count': int(spec.get('module_count', 1)),
+                'po_number': spec.get('po_number'),
+                'line': spec.get('line'),
+            })
+        except (TypeError, ValueError):
+            raise ValueError(f'Spec {idx} has an invalid date (YYYY-MM-DD), serial_start or module_count')
+        # Pack names are the ZIP folder names, a repeat would write duplicate members
+        name = pack_name(normalized[-1])
+        if name in seen:
+            raise ValueError(f'Spec {idx} repeats spec {seen[name]} ({name})')
+        seen[name] = idx
+    return normalized
+
+
+def pack_name(spec):
+    """Folder name of one pack inside the batch ZIP"""
+    return f"{spec['date']}_Shift_{spec['shift']}_S{spec['serial_start']}"
+
+
+def render_ipqc_pack(spec, options):
+    """
+    Worker: generate one form and render its PDF + Excel in memory
+
+    Args:
+        spec: Normalized spec (validate_specs)
+        options: Batch-wide generate_form arguments (customer_id, serial_prefix, bom, seeded, ...)
+
+    Returns:
+        list: (arcname, bytes) for the files of this pack
+    """
+    from app.services.form_generator import IPQCFormGenerator, form_rng
+
+    name = pack_name(spec)
+    po_number = spec.get('po_number') or options.get('po_number') or f"PO-{spec['date'].replace('-', '')}"
+
+    ipqc_form = IPQCFormGenerator().generate_form(
+        date=spec['date'],
+        shift=spec['shift'],
+        customer_id=options['customer_id'],
+        po_number=po_number,
+        serial_prefix=options['serial_prefix'],
+        serial_start=spec['serial_start'],
+        module_count=spec['module_count'],
+        cell_manufacturer=options['cell_manufacturer'],
+        cell_efficiency=options['cell_efficiency'],
+        jb_cable_length=options['jb_cable_length'],
+        golden_module_number=options['golden_module_number'],
+        bom=options.get('bom'),
+        rng=form_rng(
+            options['customer_id'], spec['date'], spec['shift'], spec.get('line'), options.get('seeded', False),
+            serial_prefix=options['serial_prefix'], serial_start=spec['serial_start'], po_number=po_number
+        )
+    )
+    args = (ipqc_form.get('stages', []), ipqc_form.get('bom', {}), ipqc_form.get('metadata', {}))
+
+    return [
+        (f'{name}/IPQC_{name}.pdf', render_ipqc_pdf_bytes(*args)),
+        (f'{name}/IPQC_{name}.xlsx', render_ipqc_excel_bytes(*args)),
+    ]
+
+
+def render_ipqc_pdf_bytes(stages, bom, metadata):
+    """Worker: render the IPQC PDF into memory"""
+    from app.services.pdf_generator import IPQCPDFGenerator
+
+    buffer = io.BytesIO()
+    IPQCPDFGenerator(None).generate_ipqc_pdf(stages, bom, metadata, output=buffer)
+    return buffer.getvalue()
+
+
+def render_ipqc_excel_bytes(stages, bom, metadata):
+    """Worker: render the IPQC workbook into memory"""
+    from app.services.excel_generator import generate_ipqc_excel
+
+    buffer = io.BytesIO()
+    generate_ipqc_excel(stages, bom, metadata, output_path=buffer)
+    return buffer.getvalue()
+
+
+def render_complete_zip(ipqc_form, base_name, service):
+    """
+    Render PDF and Excel of one form concurrently on the pool and zip them in memory
+
+    Args:
+        ipqc_form: generate_form result
+        base_name: File name stem of both members
+        service: RenderService
+
+    Returns:
+        BytesIO: ZIP archive, positioned at 0
+
+    Raises:
+        RenderBusy / RenderTimeout: From the render service
+    """
+    args = (ipqc_form.get('stages', []), ipqc_form.get('bom', {}), ipqc_form.get('metadata', {}))
+    pdf_bytes, excel_bytes = service.run_all([
+        (render_ipqc_pdf_bytes, *args),
+        (render_ipqc_excel_bytes, *args),
+    ])
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f'{base_name}.pdf', pdf_bytes)
+        zf.writestr(f'{base_name}.xlsx', excel_bytes)
+    output.seek(0)
+    return output
+
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable sink for ZipFile - written bytes are drained after each member"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_batch_zip(specs, options, service):
+    """
+    Fan the packs out to the render service and yield ZIP bytes as packs finish
+
+    At most one pack per worker is in flight, so a large batch never fills the
+    admission queue ahead of interactive renders - it waits for free slots
+    instead of being refused. Members are added in completion order. A failed
+    or timed-out pack does not abort the stream (headers are already sent) -
+    failures are listed in ERRORS.txt.
+
+    Yields:
+        bytes: ZIP data
+    """
+    queued = iter(specs)
+    in_flight = {}
+    errors = []
+    sink = _ZipSink()
+
+    def fill():
+        for spec in islice(queued, service.max_workers - len(in_flight)):
+            in_flight[service.submit(render_ipqc_pack, spec, options, block=True)] = spec
+
+    try:
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zf:
+            fill()
+            while in_flight:
+                done, _ = wait(in_flight, timeout=service.timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    # Nothing finished within the job timeout - give up on the packs in flight
+                    for future, spec in in_flight.items():
+                        future.cancel()
+                        errors.append(f"{pack_name(spec)}: timed out after {service.timeout:g}s")
+                    in_flight.clear()
+                for future in done:
+                    spec = in_flight.pop(future)
+                    try:
+                        files = future.result()
+                    except Exception as e:
+                        errors.append(f"{pack_name(spec)}: {e}")
+                        continue
+                    for arcname, content in files:
+                        zf.writestr(arcname, content)
+                fill()
+                yield sink.drain()
+            if errors:
+                zf.writestr('ERRORS.txt', '\n'.join(errors) + '\n')
+        yield sink.drain()
+        print(f"✅ IPQC batch: {len(specs) - len(errors)}/{len(specs)} packs streamed")
+    finally:
+        # Client went away - drop packs that have not started yet
+        for future in in_flight:
+            future.cancel()
@@ -0,0 +1,413 @@
+"""
+IPQC Checkpoint Rules
+Ordered (predicate, generator) table for checkpoint monitoring results and remarks,
+compiled once per checkpoint into a dict lookup
+"""
+from collections import namedtuple
+from app.models.ipqc_data import IPQCTemplate
+
+# Per-form values the generators need - rng is the form's random.Random
+# (generators never touch the global random state)
+MonitoringContext = namedtuple('MonitoringContext', [
+    'serial_prefix', 'serial_start', 'cell_manufacturer', 'cell_efficiency',
+    'jb_cable_length', 'golden_module_number', 'rng',
+])
+
+
+# ========== Generator helpers ==========
+
+def random_in_range(rng, base, tolerance):
+    """Generate random value within base ± tolerance"""
+    return round(base + rng.uniform(-abs(tolerance), abs(tolerance)), 2)
+
+
+def generate_serial_numbers(ctx, count=5):
+    """Random full serials (prefix + 5-digit counter) from the 100 after serial_start"""
+    base_counter = ctx.serial_start if isinstance(ctx.serial_start, int) else 1
+    serial_range = list(range(base_counter, min(base_counter + 100, 99999)))
+    selected = ctx.rng.sample(serial_range, min(count, len(serial_range)))
+    selected.sort()
+    full_serials = [f"{ctx.serial_prefix}{str(num).zfill(5)}" for num in selected]
+    return "S.No: " + ", ".join(full_serials)
+
+
+def _ts_list(ctx, value):
+    """TS01A..TS04B readings for 6-8 tabber strings, value() gives each reading"""
+    ts_count = ctx.rng.randint(6, 8)
+    ts_values = []
+    for i in range(ts_count):
+        row = (i // 2) + 1
+        side = "A" if i % 2 == 0 else "B"
+        ts_values.append(f"TS0{row}{side}: {value()}")
+    return ", ".join(ts_values)
+
+
+def _fixed(value):
+    return lambda ctx: value
+
+
+def _choice(*values):
+    return lambda ctx: ctx.rng.choice(values)
+
+
+def _serials_suffix(suffix):
+    return lambda ctx: generate_serial_numbers(ctx, 5) + suffix
+
+
+# ========== Generators with more than one value ==========
+
+def _cell_gap(ctx):
+    return _ts_list(ctx, lambda: f"{round(ctx.rng.uniform(0.73, 0.81), 2)}mm")
+
+
+def _glass_dimension(ctx):
+    length = random_in_range(ctx.rng, 2376, 0.8)
+    width = random_in_range(ctx.rng, 1128, 0.8)
+    thickness = random_in_range(ctx.rng, 2.00, 0.04)
+    return f"{length}mm x {width}mm x {thickness}mm"
+
+
+def _eva_dimension(ctx):
+    eva_length = random_in_range(ctx.rng, 2378, 0.8)
+    eva_width = random_in_range(ctx.rng, 1125, 0.8)
+    eva_thick = random_in_range(ctx.rng, 0.696, 0.025)
+    return f"{eva_length}mm x {eva_width}mm x {eva_thick}mm"
+
+
+def _cell_size(ctx):
+    cell_l = random_in_range(ctx.rng, 182.53, 0.15)
+    cell_w = random_in_range(ctx.rng, 105.04, 0.15)
+    cell_t = random_in_range(ctx.rng, 0.18, 0.02)
+    return f"{cell_l}mm x {cell_w}mm x {cell_t}mm (L x W x T)"
+
+
+def _string_length(ctx):
+    return _ts_list(ctx, lambda: f"{random_in_range(ctx.rng, 1163, 0.8):.1f}mm")
+
+
+def _peel_cell(ctx):
+    test1 = random_in_range(ctx.rng, 21, 0.8)
+    test2 = random_in_range(ctx.rng, 21, 0.8)
+    test3 = random_in_range(ctx.rng, 21, 0.8)
+    return f"Test1: {test1}N | Test2: {test2}N | Test3: {test3}N"
+
+
+def _cell_edge_to_glass(ctx):
+    top = round(ctx.rng.uniform(19.5, 19.9), 2)
+    bottom = round(ctx.rng.uniform(18.6, 19.0), 2)
+    sides = round(ctx.rng.uniform(13.1, 13.3), 2)
+    return f"Top: {top}mm, Bottom: {bottom}mm, Sides: {sides}mm"
+
+
+def _creepage(ctx):
+    top = [round(ctx.rng.uniform(11.6, 11.9), 2) for _ in range(3)]
+    bottom = [round(ctx.rng.uniform(11.5, 11.8), 2) for _ in range(3)]
+    return f"Top: {top[0]}mm, {top[1]}mm, {top[2]}mm | Bottom: {bottom[0]}mm, {bottom[1]}mm, {bottom[2]}mm"
+
+
+def _holes(ctx):
+    holes = [round(ctx.rng.uniform(11.8, 12.2), 2) for _ in range(3)]
+    return f"3 holes: {holes[0]}mm, {holes[1]}mm, {holes[2]}mm"
+
+
+def _flash_test(ctx):
+    pmax = random_in_range(ctx.rng, 625, 2.5)
+    voc = random_in_range(ctx.rng, 44.8, 0.3)
+    isc = random_in_range(ctx.rng, 13.21, 0.15)
+    ff = random_in_range(ctx.rng, 78.4, 0.8)
+    return f"Pmax: {pmax}W | Voc: {voc}V | Isc: {isc}A | FF: {ff}%"
+
+
+def _dc_power_supply(ctx):
+    voltage = round(ctx.rng.uniform(48.5, 49.5), 2)
+    current = round(ctx.rng.uniform(5.2, 5.6), 3)
+    return f"{voltage}V, {current}A"
+
+
+def _hipot(ctx):
+    serials_list = []
+    for i in range(5):
+        base_counter = ctx.serial_start + ctx.rng.randint(1, 95)
+        serial = f"{ctx.serial_prefix}{str(base_counter).zfill(5)}"
+        dcw = round(ctx.rng.uniform(10, 35), 1)
+        ir_val = round(ctx.rng.uniform(50, 120), 1)
+        ground = round(ctx.rng.uniform(15, 45), 1)
+        serials_list.append(f"{serial}: DCW={dcw}µA, IR={ir_val}MΩ, GND={ground}mΩ")
+    return " | ".join(serials_list)
+
+
+def _pre_lam_el(ctx):
+    return generate_serial_numbers(ctx, 5)
+
+
+def _sample_visual(ctx):
+    return generate_serial_numbers(ctx, 5) + " - Found OK"
+
+
+def _sample_plain(ctx):
+    return generate_serial_numbers(ctx, 5)
+
+
+def _five(z):
+    return "5 pieces" in z or "5 pcs" in z
+
+
+# ========== Monitoring result rules ==========
+# (predicate(name, stage, acceptance, sample_size), generator(ctx)) - first match wins.
+# name / stage / acceptance are lower-cased, sample_size is as written in the template.
+MONITORING_RULES = [
+    # Priority checks - before any generic matches
+    (lambda n, s, a, z: "cell to cell gap" in n, _cell_gap),
+    (lambda n, s, a, z: "string to string gap" in n, lambda ctx: f"{round(ctx.rng.uniform(2.0, 3.5), 2)}mm"),
+
+    # Shop Floor Environment
+    (lambda n, s, a, z: "temperature" in n and "shop floor" in s, lambda ctx: f"{random_in_range(ctx.rng, 25, 2.0)}°C"),
+    (lambda n, s, a, z: "humidity" in n and "shop floor" in s, lambda ctx: f"{ctx.rng.randint(40, 58)}% RH"),
+
+    # Glass Dimension / Visual
+    (lambda n, s, a, z: "glass dimension" in n or ("length" in n and "glass" in s), _glass_dimension),
+    (lambda n, s, a, z: "appearance" in n and "visual" in n, _choice("No Scratches/Cracks", "Clear Surface", "No Defects Found")),
+    (lambda n, s, a, z: "crack" in n or "scratch" in n, _fixed("None Detected")),
+    (lambda n, s, a, z: "edge chip" in n, lambda ctx: f"{round(ctx.rng.uniform(0, 0.8), 1)}mm"),
+
+    # EVA/EPE
+    (lambda n, s, a, z: "eva/epe type" in n or "eva type" in n or "material" in n, _fixed("EPE304")),
+    (lambda n, s, a, z: "eva" in n and "dimension" in n, _eva_dimension),
+    (lambda n, s, a, z: "eva" in n and ("status" in n or "visual" in n), _choice("No Damage", "Clean Surface", "Uniform Embossing")),
+    (lambda n, s, a, z: "dust" in n and "eva" in s, _fixed("No Particles")),
+    (lambda n, s, a, z: "embossing" in n, _fixed("Uniform Pattern")),
+
+    # Soldering Temperature
+    (lambda n, s, a, z: "soldering temperature" in n or "solder temp" in n, lambda ctx: f"{random_in_range(ctx.rng, 400, 20)}°C"),
+
+    # Cell Details / Size / Visual
+    (lambda n, s, a, z: "cell manufacturer" in n or ("manufacturer" in n and "cell" in s), lambda ctx: ctx.cell_manufacturer),
+    (lambda n, s, a, z: "efficiency" in n and "cell" in s, lambda ctx: f"{ctx.cell_efficiency}%"),
+    (lambda n, s, a, z: "cell size" in n or ("cell" in s and "dimension" in n), _cell_size),
+    (lambda n, s, a, z: "cell condition" in n or ("cell" in s and "visual" in n), _choice("No Damage/Cracks", "EL Test Pass", "Clean - No Defects")),
+    (lambda n, s, a, z: "cleanliness" in n and "cell" in s, _fixed("Clean Surface")),
+    (lambda n, s, a, z: "dust" in n and "cell" in n, _fixed("No Dust")),
+    (lambda n, s, a, z: "microcrack" in n or "cell crack" in n, _fixed("EL Test: No Microcracks")),
+
+    # Stringing Area & Stringer Parameters
+    (lambda n, s, a, z: "clean area" in n or "cleanliness" in n, _choice("CLEAN - No Waste", "CLEAN Area", "Clean & Ready")),
+    (lambda n, s, a, z: "alignment" in n and "stringer" in s, _fixed("Camera Check")),
+    (lambda n, s, a, z: "ribbon lay" in n, _fixed("Straight - No Shift")),
+
+    # Cell Crosscut
+    (lambda n, s, a, z: "cell cross cutting" in n or "crosscut" in n, lambda ctx: f"{random_in_range(ctx.rng, 0, 0.08)}mm"),
+
+    # String Visual
+    (lambda n, s, a, z: "visual check after stringing" in n or ("string" in s and "visual" in n), lambda ctx: _ts_list(ctx, lambda: "OK")),
+    (lambda n, s, a, z: "ribbon alignment" in n, _fixed("Straight")),
+    (lambda n, s, a, z: "solder quality" in n or "soldering quality" in n, _fixed("OK, OK, OK")),
+
+    # String EL
+    (lambda n, s, a, z: "el image" in n or ("string" in s and "el" in n), lambda ctx: _ts_list(ctx, lambda: "OK")),
+    (lambda n, s, a, z: "microcrack" in n and "string" in s, _fixed("None Detected")),
+    (lambda n, s, a, z: "dark cell" in n, _fixed("None")),
+
+    # String Length
+    (lambda n, s, a, z: "string length" in n, _string_length),
+
+    # Peel Strength
+    (lambda n, s, a, z: "peel strength" in n and "cell" in n, _peel_cell),
+    (lambda n, s, a, z: "ribbon to busbar" in n or ("busbar" in n and "peel" in n), lambda ctx: f"{round(ctx.rng.uniform(2.5, 4.5), 2)}"),
+
+    # Cell edge to Glass edge distance / Creepage
+    (lambda n, s, a, z: "cell edge to glass edge" in n, _cell_edge_to_glass),
+    (lambda n, s, a, z: "creepage" in n or ("distance" in n and "creepage" in s), _creepage),
+
+    # Auto Bussing
+    (lambda n, s, a, z: "verification of process parameter" in n, _fixed("Verify")),
+    (lambda n, s, a, z: "auto bussing" in n, _choice("Auto Bussing", "Taping Proper", "No Shift")),
+    (lambda n, s, a, z: "taping" in n and "quality" in n, _fixed("Proper, Proper, Proper")),
+    (lambda n, s, a, z: "taping" in n, _fixed("Proper")),
+    (lambda n, s, a, z: "ribbon lay" in n and "bussing" in s, _fixed("No Shift")),
+
+    # Label/RFID Position
+    (lambda n, s, a, z: "rfid position" in n or ("rfid" in n and "position" in n), _fixed("Center, Center, Center")),
+    (lambda n, s, a, z: "re-label" in n or "relabel" in n, _serials_suffix(" - Found OK")),
+    (lambda n, s, a, z: "label" in n or "rfid" in n, lambda ctx: f"Tilt: {random_in_range(ctx.rng, 0, 0.8)}mm"),
+
+    # No. of Holes
+    (lambda n, s, a, z: "holes" in n and ("no." in n or "number" in n or "dimension" in n), _holes),
+
+    # Back Glass Dimension
+    (lambda n, s, a, z: "back glass" in n or ("glass" in n and "back" in s), _glass_dimension),
+
+    # Pre-Lam EL / Visual
+    (lambda n, s, a, z: "pre-lam" in n and "el" in n and _five(z), _pre_lam_el),
+    (lambda n, s, a, z: "pre-lam" in n and "el" in n, _fixed("EL Test: 5 pcs - No Defects")),
+    (lambda n, s, a, z: "pre-lam" in n and "visual" in n and _five(z), _pre_lam_el),
+    (lambda n, s, a, z: "pre-lam" in n and "visual" in n, _choice("No Bubble/Tilt", "Visual Pass", "Quality Good")),
+    (lambda n, s, a, z: "bubble" in n, _fixed("None Detected")),
+    (lambda n, s, a, z: "tilt" in n and "pre-lam" in s, _fixed("No Tilt")),
+
+    # Curing Time
+    (lambda n, s, a, z: "curing time" in n, lambda ctx: f">4 hr ({round(ctx.rng.uniform(4.5, 6.0), 1)} hr)"),
+
+    # Laminator Parameters
+    (lambda n, s, a, z: "lamination temperature" in n or ("laminator" in s and "temp" in n), lambda ctx: f"Temp: {random_in_range(ctx.rng, 149, 3)}°C"),
+    (lambda n, s, a, z: "vacuum" in n and "laminator" in s, lambda ctx: f"Vacuum: {ctx.rng.randint(98, 100)}%"),
+    (lambda n, s, a, z: "lamination time" in n, lambda ctx: f"Time: {ctx.rng.randint(11, 13)} min"),
+    (lambda n, s, a, z: "lamination pressure" in n, _fixed("Pressure: As per WI")),
+
+    # OLE Potting Visual Check
+    (lambda n, s, a, z: "ole" in s and "visual" in n, _serials_suffix(" - OK")),
+
+    # Diaphragm Cleaning
+    (lambda n, s, a, z: "diaphragm" in n or "cleaning" in n, _choice("CLEAN - No EVA Residue", "Clean Surface", "No Residue - CLEAN")),
+
+    # Buffing Corner Edge
+    (lambda n, s, a, z: "buffing" in n or ("corner edge" in n and "buffing" in s), _serials_suffix(" - OK")),
+
+    # Trimming
+    (lambda n, s, a, z: "trimming" in n or "trim" in n, lambda ctx: f"Even Trim: {random_in_range(ctx.rng, 0, 0.8)}mm deviation"),
+
+    # Soldering Current
+    (lambda n, s, a, z: "soldering current" in n, lambda ctx: f"{round(ctx.rng.uniform(18.5, 21.5), 1)}A"),
+
+    # Terminal busbar to edge of Cell
+    (lambda n, s, a, z: "terminal busbar to edge" in n or ("busbar to edge" in n and "cell" in n), lambda ctx: f"{round(ctx.rng.uniform(5.0, 7.0), 2)}mm"),
+
+    # JB Fixing
+    (lambda n, s, a, z: "jb fixing" in n or "junction box" in n, lambda ctx: f"JB Position: {random_in_range(ctx.rng, 0, 0.8)}mm shift"),
+
+    # Glue Weight / Anodizing Thickness
+    (lambda n, s, a, z: "glue weight" in n, _fixed("Refer Document GSPL/IPQC/QC/011")),
+    (lambda n, s, a, z: "anodizing thickness" in n, lambda ctx: f">15 micron ({round(ctx.rng.uniform(15.5, 18.0), 1)} micron)"),
+
+    # Potting Weight
+    (lambda n, s, a, z: "potting material weight" in n, lambda ctx: f"{random_in_range(ctx.rng, 21, 4)}g"),
+    (lambda n, s, a, z: "potting" in n and "weight" in n, lambda ctx: f"Potting Weight: {random_in_range(ctx.rng, 21, 5)}g"),
+
+    # Junction Box Position and Cable
+    (lambda n, s, a, z: "junction box" in n and ("connector" in n or "appearance" in n or "cable" in n), lambda ctx: f"Cable Length: {round(ctx.rng.uniform(1180, 1200), 1)}mm"),
+
+    # Cable Length
+    (lambda n, s, a, z: "cable length" in n, lambda ctx: f"{ctx.jb_cable_length}mm"),
+
+    # Flash Test
+    (lambda n, s, a, z: "flash test" in n or "sun simulator" in n, _flash_test),
+    (lambda n, s, a, z: "pmax" in n or "power" in n, lambda ctx: f"Pmax: {random_in_range(ctx.rng, 625, 2.5)}W"),
+    (lambda n, s, a, z: "voc" in n, lambda ctx: f"Voc: {random_in_range(ctx.rng, 44.8, 0.3)}V"),
+    (lambda n, s, a, z: "isc" in n and "calibration" in n, lambda ctx: f"Isc: {random_in_range(ctx.rng, 13.21, 0.15)}A, Golden Module: {ctx.golden_module_number}"),
+    (lambda n, s, a, z: "isc" in n, lambda ctx: f"Isc: {random_in_range(ctx.rng, 13.21, 0.15)}A"),
+    (lambda n, s, a, z: "verification of current" in n or "dc power supply" in n, _dc_power_supply),
+    (lambda n, s, a, z: "ff" in n or "fill factor" in n, lambda ctx: f"FF: {random_in_range(ctx.rng, 78.4, 0.8)}%"),
+    (lambda n, s, a, z: "i-v picture" in n or "i-v check" in n or ("silver reference" in n and "iv" in n), _fixed("EL - OK")),
+
+    # Hipot Test - DCW/IR/Ground Continuity
+    (lambda n, s, a, z: "dcw" in n or "ground continuity" in n or ("hipot" in s and "ir" in n), _hipot),
+
+    # Final Visual
+    (lambda n, s, a, z: "final visual" in n or "final inspection" in n, _choice("PASS", "Clear", "No Scratch/Dust/Bubble")),
+
+    # Dimension Measurements
+    (lambda n, s, a, z: "l*w and module profile" in n or ("module profile" in n and "l*w" in n), _fixed("2382mm x 1134mm x 30mm")),
+    (lambda n, s, a, z: "mounting hole" in n and ("x & y" in n or "h/l" in n), _fixed("1400mm x 1091mm")),
+    (lambda n, s, a, z: "diagonal difference" in n, lambda ctx: f"{round(ctx.rng.uniform(1.8, 2.2), 1)}mm"),
+    (lambda n, s, a, z: "corner gap" in n, lambda ctx: f"{round(ctx.rng.uniform(0.01, 0.03), 2)}mm"),
+    (lambda n, s, a, z: "wooden pallet dimension" in n, _fixed("2386mm x 1019mm x 146mm")),
+
+    # Generic - references to documents/specs
+    (lambda n, s, a, z: "refer process card" in a, _fixed("Refer Process Card")),
+    (lambda n, s, a, z: "module drawing" in a, _fixed("Refer Module Drawing")),
+    (lambda n, s, a, z: "gspl" in a and ("qc" in a or "ipqc" in a), _fixed("Refer Document GSPL/IPQC/QC/001")),
+
+    # Generic - visual inspection with sample size
+    (lambda n, s, a, z: z == "5 pieces" and ("visual" in n or "inspection" in n), _sample_visual),
+    (lambda n, s, a, z: z == "5 pieces", _sample_plain),
+
+    # Generic - temperature/humidity monitoring
+    (lambda n, s, a, z: "temp" in n, lambda ctx: f"Time: 08:00 - Temp: {random_in_range(ctx.rng, 25, 2.5)}°C"),
+    (lambda n, s, a, z: "humidity" in n, lambda ctx: f"Time: 08:00 - RH: {ctx.rng.randint(40, 58)}%"),
+
+    # Default for simple yes/no checks
+    (lambda n, s, a, z: a in ["ok", "pass", "yes", "acceptable"], _fixed("Pass")),
+]
+
+DEFAULT_MONITORING = _fixed("As per spec")
+
+
+# ========== Remark rules ==========
+# (predicate(name), choices) - first match wins
+REMARK_RULES = [
+    (lambda n: "temperature" in n, ("Stable", "Within Limit", "OK", "Controlled")),
+    (lambda n: "humidity" in n, ("Within Limit", "OK", "Acceptable", "Stable")),
+    (lambda n: "dimension" in n or "length" in n or "width" in n, ("Match PO", "As per spec", "OK", "Within tolerance", "—")),
+    (lambda n: "visual" in n or "appearance" in n, ("Clear", "Good", "Pass", "OK", "No defects")),
+    (lambda n: "el" in n, ("Pass", "OK", "No defects", "Clear")),
+    (lambda n: "type" in n or "material" in n, ("Verified", "OK", "Confirmed", "As per BOM")),
+    (lambda n: "clean" in n or "dust" in n, ("Clean", "OK", "Good", "No contamination")),
+    (lambda n: "peel" in n or "strength" in n, ("Pass", "OK", "Within spec", "Acceptable")),
+    # Gap measurements - NO "OK", only tolerance remarks
+    (lambda n: "gap" in n, ("Within tolerance", "As per spec", "Acceptable", "—")),
+    (lambda n: "flash" in n or "power" in n, ("Pass", "OK", "Within spec", "Acceptable")),
+]
+
+DEFAULT_REMARKS = ("OK", "Pass", "—", "Good", "Acceptable")
+
+
+# ========== Compilation ==========
+
+def _monitoring_key(checkpoint, stage_name):
+    return (
+        stage_name or '',
+        checkpoint.get("checkpoint", ""),
+        checkpoint.get("acceptance_criteria", ""),
+        checkpoint.get("sample_size", ""),
+    )
+
+
+def resolve_monitoring_rule(checkpoint, stage_name):
+    """Walk MONITORING_RULES for a checkpoint (uncached) and return its generator"""
+    stage, name, acceptance, sample_size = _monitoring_key(checkpoint, stage_name)
+    n, s, a = name.lower(), stage.lower(), acceptance.lower()
+    for predicate, generator in MONITORING_RULES:
+        if predicate(n, s, a, sample_size):
+            return generator
+    return DEFAULT_MONITORING
+
+
+def resolve_remark_choices(checkpoint):
+    """Walk REMARK_RULES for a checkpoint (uncached) and return its choices"""
+    name = checkpoint.get("checkpoint", "").lower()
+    for predicate, choices in REMARK_RULES:
+        if predicate(name):
+            return choices
+    return DEFAULT_REMARKS
+
+
+_monitoring_table = {}
+_remark_table = {}
+
+
+def compile_template(template):
+    """Resolve every checkpoint of a template into the dispatch tables"""
+    for stage in template:
+        for checkpoint in stage.get("checkpoints", []):
+            _monitoring_table[_monitoring_key(checkpoint, stage.get("stage"))] = resolve_monitoring_rule(checkpoint, stage.get("stage"))
+            _remark_table[checkpoint.get("checkpoint", "")] = resolve_remark_choices(checkpoint)
+
+
+def monitoring_generator(checkpoint, stage_name):
+    """Generator for a checkpoint - a dict hit for template checkpoints, resolved once otherwise"""
+    key = _monitoring_key(checkpoint, stage_name)
+    generator = _monitoring_table.get(key)
+    if generator is None:
+        generator = _monitoring_table[key] = resolve_monitoring_rule(checkpoint, stage_name)
+    return generator
+
+
+def remark_choices(checkpoint):
+    """Remark choices for a checkpoint - a dict hit for template checkpoints"""
+    name = checkpoint.get("checkpoint", "")
+    choices = _remark_table.get(name)
+    if choices is None:
+        choices = _remark_table[name] = resolve_remark_choices(checkpoint)
+    return choices
+
+
+compile_template(IPQCTemplate.get_template())
@@ -0,0 +1,214 @@
+"""
+Master Data Bulk Updates
+Set-based marking of uploaded serial lists (chunked IN batches, one UPDATE per chunk)
+"""
+import os
+import re
+import tempfile
+import time
+import uuid
+from openpyxl import Workbook
+from sqlalchemy import case, select, update
+from app.models.master_data import MasterModule
+from app.services.order_stats import adjust_order_stats
+
+# Serials per IN (...) batch - well below MySQL packet / SQLite variable limits
+DEFAULT_CHUNK_SIZE = 1000
+
+# Outcome of each serial in a delivered-FTR upload
+UPDATED = 'updated'
+ALREADY_REJECTED = 'already_rejected'
+ALREADY_DELIVERED = 'already_delivered'
+NOT_FOUND = 'not_found'
+DELIVERY_OUTCOMES = (UPDATED, ALREADY_REJECTED, ALREADY_DELIVERED, NOT_FOUND)
+
+CONFLICT_REPORT_FOLDER = os.path.join(tempfile.gettempdir(), 'delivered_reports')
+CONFLICT_REPORT_MAX_AGE = 24 * 3600
+_REPORT_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+def clean_serials(values):
+    """
+    Strip a serial column (pandas Series) and drop blanks, keeping sheet order
+
+    Returns:
+        Series: Serial strings, indexed like the sheet rows they came from
+    """
+    serials = values.map(str).str.strip().where(values.notna(), '')
+    return serials[serials != '']
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def mark_rejected(session, order_id, serials, reasons=None, default_reason='Rejected via upload',
+                  chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Mark uploaded serials of an order as rejected
+
+    Each chunk costs two round trips: a SELECT of the serials that exist and
+    one UPDATE setting is_rejected / rejection_reason via a CASE on serial.
+    The order's rejected counter is adjusted by the newly rejected modules.
+
+    Args:
+        session: SQLAlchemy session (caller commits)
+        order_id: MasterOrder id
+        serials: List of serial strings in sheet order (duplicates allowed)
+        reasons: Optional list of reasons parallel to serials (None = default_reason)
+        default_reason: Reason for rows without one
+        chunk_size: Serials per IN batch
+
+    Returns:
+        tuple: (rejected_count, not_found) - rejected_count counts sheet rows,
+            not_found lists missing serials in sheet order
+    """
+    if reasons is None:
+        reasons = [None] * len(serials)
+
+    # Last reason wins for duplicated serials, like the old row-by-row loop
+    reason_by_serial = {}
+    for serial, reason in zip(serials, reasons):
+        reason_by_serial[serial] = reason if reason else default_reason
+
+    found = set()
+    newly_rejected = 0
+    unique_serials = list(reason_by_serial)
+    for chunk in _chunks(unique_serials, chunk_size):
+        rows = session.execute(
+            select(MasterModule.serial_number, MasterModule.is_rejected).where(
+                MasterModule.order_id == order_id,
+                MasterModule.serial_number.in_(chunk)
+            )
+        ).all()
+        existing = {serial for serial, _ in rows}
+        if not existing:
+            continue
+        found.update(existing)
+        newly_rejected += sum(1 for _, is_rejected in rows if not is_rejected)
+
+        reason_case = case(
+            {serial: reason_by_serial[serial] for serial in existing},
+            value=MasterModule.serial_number,
+            else_=MasterModule.rejection_reason
+        )
+        session.execute(
+            update(MasterModule)
+            .where(MasterModule.order_id == order_id, MasterModule.serial_number.in_(list(existing)))
+            .values(is_rejected=True, rejection_reason=reason_case)
+            .execution_options(synchronize_session=False)
+        )
+
+    adjust_order_stats(session, order_id, rejected=newly_rejected)
+
+    rejected_count = sum(1 for serial in serials if serial in found)
+    not_found = [serial for serial in serials if serial not in found]
+    return rejected_count, not_found
+
+
+def mark_delivered(session, order_id, serials, delivered_date, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Mark uploaded serials of an order as delivered, classifying every serial
+
+    Per chunk one SELECT classifies the serials with a CASE (rejected modules
+    are skipped, delivered ones keep their original date) and one UPDATE marks
+    the rest. Duplicate serials in the upload are handled once. The order's
+    delivered counter is adjusted by the number of modules updated.
+
+    Args:
+        session: SQLAlchemy session (caller commits)
+        order_id: MasterOrder id
+        serials: List of serial strings in sheet order
+        delivered_date: Date stored in delivered_date
+        chunk_size: Serials per IN batch
+
+    Returns:
+        dict: Outcome (DELIVERY_OUTCOMES) -> list of serials in sheet order
+    """
+    outcome_case = case(
+        (MasterModule.is_rejected == True, ALREADY_REJECTED),
+        (MasterModule.is_delivered == True, ALREADY_DELIVERED),
+        else_=UPDATED
+    )
+    # A serial present twice in an order takes its "worst" outcome
+    priority = {ALREADY_REJECTED: 0, ALREADY_DELIVERED: 1, UPDATED: 2}
+
+    outcomes = {outcome: [] for outcome in DELIVERY_OUTCOMES}
+    newly_delivered = 0
+    unique_serials = list(dict.fromkeys(serials))
+
+    for chunk in _chunks(unique_serials, chunk_size):
+        rows = session.execute(
+            select(MasterModule.serial_number, outcome_case).where(
+                MasterModule.order_id == order_id,
+                MasterModule.serial_number.in_(chunk)
+            )
+        ).all()
+
+        classified = {}
+        for serial, outcome in rows:
+            if serial not in classified or priority[outcome] < priority[classified[serial]]:
+                classified[serial] = outcome
+
+        to_update = [serial for serial, outcome in classified.items() if outcome == UPDATED]
+        newly_delivered += sum(1 for serial, _ in rows if classified[serial] == UPDATED)
+        if to_update:
+            session.execute(
+                update(MasterModule)
+                .where(MasterModule.order_id == order_id, MasterModule.serial_number.in_(to_update))
+                .values(is_delivered=True, delivered_date=delivered_date)
+                .execution_options(synchronize_session=False)
+            )
+
+        for serial in chunk:
+            outcomes[classified.get(serial, NOT_FOUND)].append(serial)
+
+    adjust_order_stats(session, order_id, delivered=newly_delivered)
+    return outcomes
+
+
+def write_conflict_report(sections, folder=CONFLICT_REPORT_FOLDER):
+    """
+    Save full serial lists as a one-sheet-per-section XLSX (write-only mode)
+
+    Reports older than CONFLICT_REPORT_MAX_AGE are removed first.
+
+    Args:
+        sections: dict of sheet title -> list of serials (empty ones are skipped)
+
+    Returns:
+        str: Report id for conflict_report_path
+    """
+    os.makedirs(folder, exist_ok=True)
+    cutoff = time.time() - CONFLICT_REPORT_MAX_AGE
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+    report_id = uuid.uuid4().hex
+    wb = Workbook(write_only=True)
+    for title, serials in sections.items():
+        if not serials:
+            continue
+        ws = wb.create_sheet(title[:31])
+        ws.column_dimensions['A'].width = 30
+        ws.append(['Serial Number'])
+        for serial in serials:
+            ws.append([serial])
+    if not wb.worksheets:
+        wb.create_sheet('No Conflicts')
+    wb.save(os.path.join(folder, f'{report_id}.xlsx'))
+    return report_id
+
+
+def conflict_report_path(report_id, folder=CONFLICT_REPORT_FOLDER):
+    """Path of a saved report, or None for unknown / malformed ids"""
+    if not _REPORT_ID.match(report_id or ''):
+        return None
+    path = os.path.join(folder, f'{report_id}.xlsx')
+    return path if os.path.exists(path) else None
@@ -0,0 +1,291 @@
+"""
+Master Data Ingest Service
+Column-wise mapping of RFID FTR sheets into master_modules rows
+"""
+import itertools
+import pandas as pd
+from app.models.master_data import MasterOrder, MasterModule, MasterOrderStats
+from app.services.module_browser import invalidate_totals
+from app.services.order_stats import init_order_stats
+from app.services.serial_search import SERIAL_PATTERN, ngram_index_enabled, index_order_ngrams, remove_ngrams
+from app.services.excel_stream_reader import StreamingExcelReader
+
+# Excel column -> master_modules column (numeric FTR parameters)
+FTR_FLOAT_COLUMNS = {
+    'Pmax': 'pmax',
+    'Isc': 'isc',
+    'Voc': 'voc',
+    'Ipm': 'ipm',
+    'Vpm': 'vpm',
+    'FF': 'ff',
+    'Rs': 'rs',
+    'Rsh': 'rsh',
+    'Eff': 'eff',
+    'T_Object': 't_object',
+    'T_Target': 't_target',
+    'Irr_Target': 'irr_target',
+    'Sweep_Time': 'sweep_time',
+    'Irr_Monitor': 'irr_monitor',
+    'Isc_Monitor': 'isc_monitor',
+    'T_Monitor': 't_monitor',
+    'Cell_Temp': 'cell_temp',
+    'T_Ambient': 't_ambient',
+}
+
+# Excel column -> master_modules column (stored as text)
+FTR_STRING_COLUMNS = {
+    'Date': 'date',
+    'Class': 'class_grade',
+    'Binning': 'binning',
+}
+
+DEFAULT_BATCH_SIZE = 5000
+MAX_UPLOAD_ROWS = 500000
+
+
+class UploadRejected(ValueError):
+    """Raised when an uploaded workbook cannot be ingested (message is shown to the user)"""
+
+
+class RowLimitExceeded(UploadRejected):
+    """Raised when an upload has more rows than MAX_UPLOAD_ROWS"""
+
+
+def _float_column(df, excel_col, length):
+    """Coerce a whole column to float, missing/invalid cells become None"""
+    if excel_col not in df.columns:
+        return [None] * length
+    values = pd.to_numeric(df[excel_col], errors='coerce')
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def _string_column(df, excel_col, length):
+    """Convert a whole column to str, missing cells become None"""
+    if excel_col not in df.columns:
+        return [None] * length
+    values = df[excel_col]
+    return values.map(str).where(values.notna(), None).tolist()
+
+
+def build_module_rows(df, order_id, sequence_offset=0):
+    """
+    Map an FTR DataFrame to plain master_modules row dicts, column by column
+
+    Args:
+        df: DataFrame with normalized RFID FTR headers (ID, Date, Pmax, ...)
+        order_id: MasterOrder id the modules belong to
+        sequence_offset: Added to the DataFrame index to get sequence_number
+
+    Returns:
+        list: Row dicts ready for a Core insert
+    """
+    serials = df['ID'].map(str).str.strip().where(df['ID'].notna(), '')
+    df = df[serials != '']
+    serials = serials[serials != '']
+    length = len(df)
+
+    if length == 0:
+        return []
+
+    columns = {
+        'order_id': [order_id] * length,
+        'serial_number': serials.tolist(),
+        'serial_reversed': serials.str[::-1].tolist(),
+        'sequence_number': (df.index.to_numpy() + 1 + sequence_offset).tolist(),
+        'is_rejected': [False] * length,
+    }
+    for excel_col, db_col in FTR_STRING_COLUMNS.items():
+        columns[db_col] = _string_column(df, excel_col, length)
+    for excel_col, db_col in FTR_FLOAT_COLUMNS.items():
+        columns[db_col] = _float_column(df, excel_col, length)
+
+    # Stem / numeric counter for index range scans (see serial_search.parse_serial)
+    parts = serials.str.extract(SERIAL_PATTERN)
+    has_counter = parts[1].notna()
+    columns['serial_stem'] = parts[0].where(has_counter, serials).tolist()
+    columns['serial_counter'] = [int(v) if isinstance(v, str) else None for v in parts[1].tolist()]
+
+    keys = list(columns.keys())
+    return [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+
+def insert_module_rows(session, rows, batch_size=DEFAULT_BATCH_SIZE, progress_callback=None):
+    """
+    Insert master_modules rows with executemany batches, committing each batch
+
+    Args:
+        session: SQLAlchemy session
+        rows: List of row dicts from build_module_rows
+        batch_size: Rows per INSERT batch / commit
+        progress_callback: Optional callable(inserted_count)
+
+    Returns:
+        int: Number of rows inserted
+    """
+    insert_stmt = MasterModule.__table__.insert()
+    inserted = 0
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        session.execute(insert_stmt, batch)
+        session.commit()
+        inserted += len(batch)
+        if progress_callback:
+            progress_callback(inserted)
+
+    return inserted
+
+
+def ingest_dataframe(session, df, order_id, batch_size=DEFAULT_BATCH_SIZE, progress_callback=None):
+    """
+    Map and insert a full FTR DataFrame into master_modules
+
+    Returns:
+        int: Number of modules inserted
+    """
+    rows = build_module_rows(df, order_id)
+    return insert_module_rows(session, rows, batch_size, progress_callback)
+
+
+def ingest_chunks(session, chunks, order_id, progress_callback=None, max_rows=MAX_UPLOAD_ROWS):
+    """
+    Map and insert a stream of FTR DataFrame chunks, one commit per chunk
+
+    Serial trigrams are indexed with each chunk when SERIAL_NGRAM_INDEX is on.
+
+    Args:
+        session: SQLAlchemy session
+        chunks: Iterable of DataFrames (e.g. StreamingExcelReader.iter_chunks())
+        order_id: MasterOrder id the modules belong to
+        progress_callback: Optional callable(inserted_count)
+        max_rows: Abort with RowLimitExceeded once more sheet rows than this are seen
+
+    Returns:
+        int: Number of modules inserted
+    """
+    insert_stmt = MasterModule.__table__.insert()
+    index_ngrams = ngram_index_enabled()
+    inserted = 0
+
+    for chunk in chunks:
+        if max_rows and chunk.index[-1] + 1 > max_rows:
+            raise RowLimitExceeded(f'Excel file has more than {max_rows:,} rows. Maximum {max_rows:,} rows allowed.')
+
+        rows = build_module_rows(chunk, order_id)
+        if rows:
+            session.execute(insert_stmt, rows)
+            if index_ngrams:
+                index_order_ngrams(session, order_id, rows[0]['sequence_number'], rows[-1]['sequence_number'])
+            session.commit()
+            inserted += len(rows)
+        if progress_callback:
+            progress_callback(inserted)
+
+    return inserted
+
+
+def ingest_master_upload(session, path, company_name, order_number, progress_callback=None,
+                         max_rows=MAX_UPLOAD_ROWS):
+    """
+    Stream a spooled RFID FTR workbook into a new MasterOrder
+
+    Args:
+        session: SQLAlchemy session
+        path: Path of the spooled .xlsx file
+        company_name: Company for the new order
+        order_number: Unique order number
+        progress_callback: Optional callable(current, total, message, order_id).
+            Anything it raises aborts the upload and removes the partial order.
+        max_rows: Row limit passed to ingest_chunks
+
+    Returns:
+        dict: Order summary (id, counts, serial_prefix)
+    """
+    with StreamingExcelReader(path) as reader:
+        if not reader.columns:
+            raise UploadRejected('Excel file is empty')
+
+        # Check if ID column exists
+        if 'ID' not in reader.columns:
+            raise UploadRejected('Missing required column: ID (Serial Number)')
+
+        # Validate max rows up front when the sheet dimension allows it
+        if max_rows and reader.estimated_rows > max_rows:
+            raise UploadRejected(f'Excel file has {reader.estimated_rows} rows. Maximum {max_rows:,} rows allowed.')
+
+        # Extract serial prefix from first serial, buffering chunks until one is found
+        chunks = reader.iter_chunks()
+        buffered = []
+        first_serial = None
+        for chunk in chunks:
+            buffered.append(chunk)
+            serials = chunk['ID'].dropna().map(str).str.strip()
+            serials = serials[serials != '']
+            if len(serials):
+                first_serial = serials.iloc[0]
+                break
+
+        if first_serial is None:
+            raise UploadRejected('No serial numbers found in ID column')
+
+        # Assuming format like GS04890TG3002500001
+        serial_prefix = ''.join([c for c in first_serial if not c.isdigit()])
+
+        # Checked again here: the job may have waited in the queue
+        if session.query(MasterOrder).filter_by(order_number=order_number).first():
+            raise UploadRejected('Order number already exists')
+
+        # Create master order (total corrected once all rows are streamed)
+        order = MasterOrder(
+            company_name=company_name,
+            order_number=order_number,
+            total_modules=reader.estimated_rows,
+            serial_prefix=serial_prefix,
+            rejection_percentage=0.0  # All FTR data
+        )
+        session.add(order)
+        session.flush()
+        order_id = order.id
+        init_order_stats(session, order_id)
+        total_rows = reader.estimated_rows
+
+        def on_chunk_inserted(inserted):
+            print(f"Processed {inserted}/{total_rows} rows...")
+            if progress_callback:
+                progress_callback(inserted, total_rows, f'Processing rows... {inserted:,} / {total_rows:,}', order_id)
+
+        try:
+            if progress_callback:
+                progress_callback(0, total_rows, 'Starting processing...', order_id)
+            inserted = ingest_chunks(
+                session,
+                itertools.chain(buffered, chunks),
+                order_id,
+                progress_callback=on_chunk_inserted,
+                max_rows=max_rows
+            )
+        except Exception:
+            # Batches are committed as they go, so remove what was already written
+            session.rollback()
+            session.query(MasterModule).filter_by(order_id=order_id).delete()
+            remove_ngrams(session, order_id)
+            session.query(MasterOrderStats).filter_by(order_id=order_id).delete()
+            session.query(MasterOrder).filter_by(id=order_id).delete()
+            session.commit()
+            invalidate_totals(order_id)
+            raise
+
+        order.total_modules = inserted
+        session.commit()
+        # The viewer may have cached partial totals while chunks were committed
+        invalidate_totals(order_id)
+
+    return {
+        'id': order_id,
+        'company_name': company_name,
+        'order_number': order_number,
+        'total_modules': inserted,
+        'ftr_count': inserted,
+        'rejection_count': 0,
+        'serial_prefix': serial_prefix
+    }
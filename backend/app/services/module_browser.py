@@ -0,0 +1,121 @@
+"""
+Module Browser
+Keyset pagination over master_modules on (order_id, sequence_number) with column projection
+"""
+import threading
+import time
+from sqlalchemy import func, select
+from app.models.master_data import MasterModule
+
+# Fields the viewer may request (id and sequence_number are always returned)
+MODULE_FIELDS = (
+    'serial_number', 'date', 'pmax', 'isc', 'voc', 'ipm', 'vpm', 'ff', 'rs', 'rsh', 'eff',
+    't_object', 't_target', 'irr_target', 'class_grade', 'sweep_time', 'irr_monitor',
+    'isc_monitor', 't_monitor', 'cell_temp', 't_ambient', 'binning',
+)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+# Totals are cached per (order, filter) - the count is exact when taken,
+# approximate while cached
+TOTAL_CACHE_TTL = 60
+
+_total_cache = {}
+_total_cache_lock = threading.Lock()
+
+
+def parse_fields(value):
+    """
+    Comma-separated field list -> validated list (all fields if empty)
+
+    Raises:
+        ValueError: On unknown field names
+    """
+    if not value:
+        return list(MODULE_FIELDS)
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in MODULE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def fetch_page(session, order_id, fields, limit=DEFAULT_PAGE_SIZE, after=None, before=None, offset=0, criteria=()):
+    """
+    One page of modules by keyset on sequence_number
+
+    Uses idx_order_sequence, so every page costs the same as the first one.
+
+    Args:
+        session: SQLAlchemy session
+        order_id: MasterOrder id
+        fields: Projected field names (from parse_fields)
+        limit: Page size
+        after: Return modules with sequence_number > after (next page)
+        before: Return modules with sequence_number < before (previous page)
+        offset: Legacy OFFSET, only used without a cursor
+        criteria: Extra WHERE clauses (e.g. search)
+
+    Returns:
+        dict: modules, next_cursor, prev_cursor, has_more
+    """
+    columns = [MasterModule.id, MasterModule.sequence_number] + [getattr(MasterModule, name) for name in fields]
+    stmt = select(*columns).where(MasterModule.order_id == order_id, *criteria)
+
+    backwards = before is not None and after is None
+    if backwards:
+        stmt = stmt.where(MasterModule.sequence_number < before).order_by(MasterModule.sequence_number.desc())
+    else:
+        if after is not None:
+            stmt = stmt.where(MasterModule.sequence_number > after)
+        stmt = stmt.order_by(MasterModule.sequence_number)
+        if offset:
+            stmt = stmt.offset(offset)
+
+    # One extra row tells us whether another page exists
+    rows = session.execute(stmt.limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    keys = ['id', 'sequence_number'] + list(fields)
+    modules = [dict(zip(keys, row)) for row in rows]
+
+    return {
+        'modules': modules,
+        'next_cursor': modules[-1]['sequence_number'] if modules and (has_more or backwards) else None,
+        'prev_cursor': modules[0]['sequence_number'] if modules and (after is not None or offset or (backwards and has_more)) else None,
+        'has_more': has_more
+    }
+
+
+def cached_total(session, order_id, criteria=(), cache_key=None):
+    """
+    Row count for an order + filter, cached for TOTAL_CACHE_TTL seconds
+
+    Returns:
+        tuple: (total, cached) - cached is True when served from the cache
+    """
+    key = (order_id, cache_key)
+    now = time.monotonic()
+    with _total_cache_lock:
+        entry = _total_cache.get(key)
+        if entry and entry[1] > now:
+            return entry[0], True
+
+    total = session.execute(
+        select(func.count()).select_from(MasterModule).where(MasterModule.order_id == order_id, *criteria)
+    ).scalar()
+
+    with _total_cache_lock:
+        _total_cache[key] = (total, now + TOTAL_CACHE_TTL)
+    return total, False
+
+
+def invalidate_totals(order_id):
+    """Drop cached totals of an order after modules were added or removed"""
+    with _total_cache_lock:
+        for key in [key for key in _total_cache if key[0] == order_id]:
+            del _total_cache[key]
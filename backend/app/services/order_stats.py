@@ -0,0 +1,174 @@
+"""
+Master Order Counters
+Materialized produced / rejected / delivered counts per order (master_order_stats)
+"""
+from datetime import datetime
+from sqlalchemy import case, func, select, update
+from app.models.master_data import MasterModule, MasterOrderStats
+
+
+def _flag_sum(column):
+    return func.coalesce(func.sum(case((column == True, 1), else_=0)), 0)
+
+
+def count_modules(session, order_ids=None):
+    """
+    Count produced / rejected / delivered modules with one grouped query
+
+    Args:
+        session: SQLAlchemy session
+        order_ids: Orders to count (all orders if None)
+
+    Returns:
+        dict: order_id -> {'produced', 'rejected', 'delivered'}
+    """
+    stmt = select(
+        MasterModule.order_id,
+        _flag_sum(MasterModule.is_produced),
+        _flag_sum(MasterModule.is_rejected),
+        _flag_sum(MasterModule.is_delivered)
+    ).group_by(MasterModule.order_id)
+    if order_ids is not None:
+        stmt = stmt.where(MasterModule.order_id.in_(list(order_ids)))
+
+    return {
+        order_id: {'produced': int(produced), 'rejected': int(rejected), 'delivered': int(delivered)}
+        for order_id, produced, rejected, delivered in session.execute(stmt)
+    }
+
+
+COUNTER_COLUMNS = ('produced_count', 'rejected_count', 'delivered_count', 'updated_at')
+
+
+def _stats_insert(bind, overwrite):
+    """
+    INSERT into master_order_stats that never fails on an existing row
+
+    overwrite=True replaces the counters of an existing row (the cursor
+    allocated_sequence is kept), overwrite=False leaves it untouched.
+    """
+    table = MasterOrderStats.__table__
+    dialect = bind.dialect.name
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table)
+        if overwrite:
+            return stmt.on_duplicate_key_update({name: stmt.inserted[name] for name in COUNTER_COLUMNS})
+        return stmt.prefix_with('IGNORE')
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table)
+        if overwrite:
+            return stmt.on_conflict_do_update(
+                index_elements=['order_id'],
+                set_={name: stmt.excluded[name] for name in COUNTER_COLUMNS}
+            )
+        return stmt.on_conflict_do_nothing(index_elements=['order_id'])
+    return table.insert()
+
+
+def _write_order_stats(session, order_ids, overwrite):
+    counts = count_modules(session, order_ids)
+    now = datetime.utcnow()
+    rows = []
+    for order_id in order_ids:
+        c = counts.get(order_id, {'produced': 0, 'rejected': 0, 'delivered': 0})
+        rows.append({
+            'order_id': order_id,
+            'produced_count': c['produced'],
+            'rejected_count': c['rejected'],
+            'delivered_count': c['delivered'],
+            'updated_at': now
+        })
+    if rows:
+        session.execute(_stats_insert(session.get_bind(), overwrite), rows)
+
+
+def _load_order_stats(session, order_ids):
+    return {
+        row.order_id: row
+        for row in session.execute(
+            select(MasterOrderStats)
+            .where(MasterOrderStats.order_id.in_(order_ids))
+            .execution_options(populate_existing=True)
+        ).scalars()
+    }
+
+
+def recompute_order_stats(session, order_ids):
+    """
+    Rebuild the counter rows of the given orders from master_modules
+
+    Upserts in the caller's transaction, so a concurrent rebuild of the same
+    order cannot fail on the primary key.
+
+    Returns:
+        dict: order_id -> MasterOrderStats
+    """
+    order_ids = list(order_ids)
+    _write_order_stats(session, order_ids, overwrite=True)
+    return _load_order_stats(session, order_ids)
+
+
+def ensure_order_stats(session, order_ids):
+    """
+    Create the missing counter rows of the given orders (caller commits)
+
+    Rows another transaction created first are left alone (INSERT IGNORE /
+    ON CONFLICT DO NOTHING), so concurrent first reads never collide.
+    """
+    order_ids = list(order_ids)
+    existing = set(session.execute(
+        select(MasterOrderStats.order_id).where(MasterOrderStats.order_id.in_(order_ids))
+    ).scalars())
+    missing = [order_id for order_id in order_ids if order_id not in existing]
+    if missing:
+        _write_order_stats(session, missing, overwrite=False)
+    return missing
+
+
+def init_order_stats(session, order_id):
+    """Zero counters for a freshly uploaded order"""
+    session.add(MasterOrderStats(order_id=order_id, produced_count=0, rejected_count=0, delivered_count=0))
+
+
+def adjust_order_stats(session, order_id, produced=0, rejected=0, delivered=0):
+    """
+    Apply counter deltas in one UPDATE (rebuilds the row if it is missing)
+
+    Call after the module rows were changed in the same transaction.
+    """
+    if not (produced or rejected or delivered):
+        return
+    result = session.execute(
+        update(MasterOrderStats)
+        .where(MasterOrderStats.order_id == order_id)
+        .values(
+            produced_count=MasterOrderStats.produced_count + produced,
+            rejected_count=MasterOrderStats.rejected_count + rejected,
+            delivered_count=MasterOrderStats.delivered_count + delivered,
+            updated_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        recompute_order_stats(session, [order_id])
+
+
+def get_order_stats(session, order_ids):
+    """
+    Counter rows for the given orders, building any that are missing
+
+    Missing rows are inserted but not committed - the caller commits.
+
+    Returns:
+        dict: order_id -> MasterOrderStats
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return {}
+    ensure_order_stats(session, order_ids)
+    return _load_order_stats(session, order_ids)
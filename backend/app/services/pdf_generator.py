@@ -2,13 +2,11 @@
 PDF Generation Service for IPQC Reports
 """
 from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib import colors
 from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
 from datetime import datetime
 import os
+from app.services.pdf_styles import STYLES, IPQC_TABLE_STYLES, stages_table_style
 
 
 class IPQCPDFGenerator:
@@ -16,35 +14,12 @@ class IPQCPDFGenerator:
     
     def __init__(self, output_folder):
         self.output_folder = output_folder
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
+        self.styles = STYLES
+        self.header_style = STYLES['CustomHeader']
+        self.subheader_style = STYLES['CustomSubHeader']
+        self.cell_style = STYLES['CellStyle']
     
-    def _setup_custom_styles(self):
-        """Setup custom paragraph styles"""
-        self.header_style = ParagraphStyle(
-            'CustomHeader',
-            parent=self.styles['Heading1'],
-            fontSize=16,
-            textColor=colors.HexColor('#1a237e'),
-            spaceAfter=10,
-            alignment=TA_CENTER
-        )
-        
-        self.subheader_style = ParagraphStyle(
-            'CustomSubHeader',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            alignment=TA_CENTER
-        )
-        
-        self.cell_style = ParagraphStyle(
-            'CellStyle',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            leading=10
-        )
-    
-    def generate_ipqc_pdf(self, ipqc_data, bom_data, metadata):
+    def generate_ipqc_pdf(self, ipqc_data, bom_data, metadata, filename=None, output=None):
         """
         Generate complete IPQC PDF
         
@@ -52,14 +27,20 @@ class IPQCPDFGenerator:
             ipqc_data: List of stages with checkpoints and monitoring results
             bom_data: Customer BOM data
             metadata: Dict with date, shift, po_number, doc_number, etc.
+            filename: Output file name (timestamped name if None)
+            output: File-like object to render into instead of a file
         
         Returns:
-            str: Path to generated PDF file
+            str: Path to generated PDF file (output itself when given)
         """
-        # Generate filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"IPQC_{metadata.get('customer_name', 'Report')}_{timestamp}.pdf"
-        filepath = os.path.join(self.output_folder, filename)
+        if output is not None:
+            filepath = output
+        else:
+            # Generate filename
+            if not filename:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"IPQC_{metadata.get('customer_name', 'Report')}_{timestamp}.pdf"
+            filepath = os.path.join(self.output_folder, filename)
         
         # Create PDF document
         doc = SimpleDocTemplate(
@@ -108,12 +89,7 @@ class IPQCPDFGenerator:
         ]
         
         header_table = Table(header_data, colWidths=[60*mm, 140*mm, 70*mm])
-        header_table.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (0, 0), (0, 0), 'CENTER'),
-            ('ALIGN', (1, 0), (1, 0), 'CENTER'),
-        ]))
+        header_table.setStyle(IPQC_TABLE_STYLES['header'])
         
         story.append(header_table)
         
@@ -128,10 +104,7 @@ class IPQCPDFGenerator:
         ]
         
         info_table = Table(info_data, colWidths=[60*mm, 60*mm, 60*mm, 90*mm])
-        info_table.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        info_table.setStyle(IPQC_TABLE_STYLES['info'])
         
         story.append(info_table)
         
@@ -194,36 +167,8 @@ class IPQCPDFGenerator:
         # Create table with column widths matching header tables (total 270mm)
         table = Table(table_data, colWidths=[15*mm, 35*mm, 45*mm, 35*mm, 50*mm, 55*mm, 35*mm])
         
-        # Apply styling
-        table.setStyle(TableStyle([
-            # Header row
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a237e')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            
-            # All cells
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('LEFTPADDING', (0, 0), (-1, -1), 3),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 3),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-        ]))
-        
-        # Add row spanning for stage cells
-        row_idx = 1
-        for stage in stages:
-            num_checkpoints = len(stage.get('checkpoints', []))
-            if num_checkpoints > 1:
-                table.setStyle(TableStyle([
-                    ('SPAN', (0, row_idx), (0, row_idx + num_checkpoints - 1)),
-                    ('SPAN', (1, row_idx), (1, row_idx + num_checkpoints - 1)),
-                ]))
-            row_idx += num_checkpoints
+        # Static styling plus Sr.No / Stage row spans (shared per stage layout)
+        table.setStyle(stages_table_style(stages))
         
         return table
 
@@ -0,0 +1,339 @@
+"""
+Shared PDF Styles
+Paragraph styles and static table-style fragments used by every PDF generator,
+built once at import and shared read-only across requests
+"""
+from functools import lru_cache
+from types import MappingProxyType
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import TableStyle
+
+from app.models.ipqc_data import IPQCTemplate
+
+
+def _build_styles():
+    """Sample stylesheet plus the custom styles of all generators, keyed by name"""
+    sample = getSampleStyleSheet()
+    styles = {name: sample[name] for name in list(sample.byName) + list(sample.byAlias)}
+
+    custom = [
+        # IPQC check sheet
+        ParagraphStyle(
+            'CustomHeader',
+            parent=sample['Heading1'],
+            fontSize=16,
+            textColor=colors.HexColor('#1a237e'),
+            spaceAfter=10,
+            alignment=TA_CENTER
+        ),
+        ParagraphStyle(
+            'CustomSubHeader',
+            parent=sample['Normal'],
+            fontSize=10,
+            alignment=TA_CENTER
+        ),
+        ParagraphStyle(
+            'CellStyle',
+            parent=sample['Normal'],
+            fontSize=8,
+            leading=10
+        ),
+
+        # Production report
+        ParagraphStyle(
+            name='CustomTitle',
+            parent=sample['Heading1'],
+            fontSize=26,
+            textColor=colors.HexColor('#1a237e'),
+            spaceAfter=6,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        ParagraphStyle(
+            name='CustomSubtitle',
+            parent=sample['Normal'],
+            fontSize=13,
+            textColor=colors.HexColor('#5c6bc0'),
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        ParagraphStyle(
+            name='SectionHeader',
+            parent=sample['Heading2'],
+            fontSize=14,
+            textColor=colors.HexColor('#1a237e'),
+            spaceAfter=12,
+            spaceBefore=15,
+            fontName='Helvetica-Bold',
+            borderPadding=8,
+            backColor=colors.HexColor('#e3f2fd'),
+            leftIndent=10,
+            rightIndent=10
+        ),
+        ParagraphStyle(
+            name='SummaryBox',
+            parent=sample['Normal'],
+            fontSize=11,
+            textColor=colors.HexColor('#1a237e'),
+            spaceAfter=8,
+            spaceBefore=8,
+            fontName='Helvetica',
+            leftIndent=15,
+            backColor=colors.HexColor('#e3f2fd'),
+            borderPadding=8
+        ),
+        ParagraphStyle(
+            name='DaySummary',
+            parent=sample['Normal'],
+            fontSize=10,
+            textColor=colors.HexColor('#424242'),
+            spaceAfter=4,
+            fontName='Helvetica',
+            leftIndent=20,
+            bulletIndent=10
+        ),
+        ParagraphStyle(
+            'RemarksStyle',
+            parent=sample['Normal'],
+            fontSize=10,
+            textColor=colors.HexColor('#424242'),
+            leftIndent=15,
+            rightIndent=15,
+            spaceBefore=5,
+            spaceAfter=5
+        ),
+
+        # Peel test report
+        ParagraphStyle('ChartPlaceholder', parent=sample['Normal'], alignment=TA_CENTER, fontSize=9),
+        ParagraphStyle('Note', parent=sample['Normal'], fontSize=9),
+    ]
+    for style in custom:
+        styles[style.name] = style
+    return MappingProxyType(styles)
+
+
+# Paragraph styles by name - shared, never mutate (derive with ParagraphStyle(parent=...))
+STYLES = _build_styles()
+
+
+def _table_styles(commands_by_name):
+    return MappingProxyType({name: TableStyle(commands) for name, commands in commands_by_name.items()})
+
+
+# ========== IPQC check sheet ==========
+
+IPQC_TABLE_STYLES = _table_styles({
+    'header': [
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (0, 0), (0, 0), 'CENTER'),
+        ('ALIGN', (1, 0), (1, 0), 'CENTER'),
+    ],
+    'info': [
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ],
+})
+
+STAGES_TABLE_COMMANDS = (
+    # Header row
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a237e')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+
+    # All cells
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('LEFTPADDING', (0, 0), (-1, -1), 3),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 3),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+)
+
+
+@lru_cache(maxsize=32)
+def _stages_table_style(checkpoint_counts):
+    commands = list(STAGES_TABLE_COMMANDS)
+    row_idx = 1
+    for num_checkpoints in checkpoint_counts:
+        if num_checkpoints > 1:
+            commands.append(('SPAN', (0, row_idx), (0, row_idx + num_checkpoints - 1)))
+            commands.append(('SPAN', (1, row_idx), (1, row_idx + num_checkpoints - 1)))
+        row_idx += num_checkpoints
+    return TableStyle(commands)
+
+
+def stages_table_style(stages):
+    """
+    Stages table style - static commands plus the Sr.No / Stage row spans
+
+    Spans depend only on the checkpoint count of each stage, so every form of
+    the same template shares one style (built here at import for IPQCTemplate).
+    """
+    return _stages_table_style(tuple(len(stage.get('checkpoints', [])) for stage in stages))
+
+
+stages_table_style(IPQCTemplate.STAGES)
+
+
+# ========== Production report ==========
+
+PRODUCTION_TABLE_STYLES = _table_styles({
+    'info': [
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#90caf9')),
+        ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#e3f2fd')),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1a237e')),
+        ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#1a237e')),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#64b5f6')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ],
+    'production': [
+        # Header row - Enhanced
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#64b5f6')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1a237e')),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+        ('TOPPADDING', (0, 0), (-1, 0), 6),
+        ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
+
+        # Data rows
+        ('ALIGN', (0, 1), (0, -2), 'CENTER'),
+        ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -2), 8),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -2), [colors.HexColor('#ffffff'), colors.HexColor('#e3f2fd')]),
+        ('GRID', (0, 0), (-1, -2), 1, colors.HexColor('#bbdefb')),
+
+        # Highlight rejection columns
+        ('BACKGROUND', (5, 1), (5, -2), colors.HexColor('#fff9c4')),
+        ('BACKGROUND', (7, 1), (7, -2), colors.HexColor('#ffccbc')),
+        ('BACKGROUND', (8, 1), (8, -2), colors.HexColor('#ffcdd2')),
+
+        # Total row - Bold and highlighted
+        ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#90caf9')),
+        ('TEXTCOLOR', (0, -1), (-1, -1), colors.HexColor('#1a237e')),
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, -1), (-1, -1), 10),
+        ('GRID', (0, -1), (-1, -1), 2, colors.HexColor('#64b5f6')),
+
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ],
+    'inventory': [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#81c784')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1b5e20')),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('FONTSIZE', (0, 1), (-1, 1), 11),
+        ('BACKGROUND', (0, 1), (0, 1), colors.HexColor('#e3f2fd')),
+        ('BACKGROUND', (1, 1), (1, 1), colors.HexColor('#fff9c4')),
+        ('BACKGROUND', (2, 1), (2, 1), colors.HexColor('#ffccbc')),
+        ('BACKGROUND', (3, 1), (3, 1), colors.HexColor('#c8e6c9')),
+        ('TEXTCOLOR', (0, 1), (-1, 1), colors.HexColor('#1a237e')),
+        ('GRID', (0, 0), (-1, -1), 1.5, colors.HexColor('#81c784')),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ],
+    'kpi': [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#7e57c2')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('FONTSIZE', (0, 1), (-1, 1), 12),
+        ('BACKGROUND', (0, 1), (0, 1), colors.HexColor('#c8e6c9')),
+        ('BACKGROUND', (1, 1), (1, 1), colors.HexColor('#bbdefb')),
+        ('BACKGROUND', (2, 1), (2, 1), colors.HexColor('#fff9c4')),
+        ('BACKGROUND', (3, 1), (3, 1), colors.HexColor('#ffccbc')),
+        ('BACKGROUND', (4, 1), (4, 1), colors.HexColor('#c5e1a5')),
+        ('TEXTCOLOR', (0, 1), (-1, 1), colors.HexColor('#1a237e')),
+        ('GRID', (0, 0), (-1, -1), 1.5, colors.HexColor('#7e57c2')),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ],
+    'day_summary': [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ef5350')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 1.5, colors.HexColor('#ef5350')),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#ffebee'), colors.HexColor('#ffffff')]),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ],
+    'footer': [
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#757575')),
+        ('TOPPADDING', (0, 0), (-1, -1), 3),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+        ('LINEABOVE', (0, 0), (-1, 0), 1, colors.HexColor('#e0e0e0')),
+    ],
+})
+
+
+# ========== Peel test report ==========
+
+PEEL_TEST_TABLE_STYLES = _table_styles({
+    'doc_info': [
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ],
+    'header': [
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+        ('ALIGN', (1, 0), (1, 0), 'CENTER'),
+    ],
+    'title': [
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ],
+    'data': [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D9D9D9')),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 8),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+        ('TOPPADDING', (0, 0), (-1, -1), 3),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 3),
+    ],
+})
@@ -9,10 +9,16 @@ from openpyxl.drawing.image import Image as OpenpyxlImage
 from datetime import datetime
 import os
 import random
+from app.services.seeding import document_rng
 
 
-def create_sheet_data(ws, stringer_name, side_type, date):
-    """Create data for one sheet"""
+def peel_excel_rng(line_number, date, seeded=False):
+    """RNG for one line's day workbook - seeded from (date, line) it is reproducible"""
+    return document_rng(seeded, 'peel_excel', date.strftime('%Y-%m-%d'), 'Day', line_number)
+
+
+def create_sheet_data(ws, stringer_name, side_type, date, rng=random):
+    """Create data for one sheet (values drawn from rng)"""
     # Styles
     header_font = Font(name='Arial', size=11, bold=True)
     normal_font = Font(name='Arial', size=9)
@@ -166,7 +172,7 @@ def create_sheet_data(ws, stringer_name, side_type, date):
         
         for interval in range(7):
             col_letter = chr(66 + interval)
-            value = round(random.uniform(2.0, 4.0), 3)
+            value = round(rng.uniform(2.0, 4.0), 3)
             cell = ws[f'{col_letter}{row_num}']
             cell.value = value
             cell.number_format = '0.000'
@@ -184,9 +190,9 @@ def create_sheet_data(ws, stringer_name, side_type, date):
     verify_names = ['Aman', 'Taj']
     approve_names = ['Aman', 'Taj']
     
-    test_by = random.choice(test_names)
-    verify_by = random.choice(verify_names)
-    approve_by = random.choice(approve_names)
+    test_by = rng.choice(test_names)
+    verify_by = rng.choice(verify_names)
+    approve_by = rng.choice(approve_names)
     
     # Test Performed By
     ws.merge_cells(f'A{sign_row}:B{sign_row}')
@@ -225,7 +231,7 @@ def create_sheet_data(ws, stringer_name, side_type, date):
     
     ws.row_dimensions[sign_row].height = 25
 
-def generate_peel_test_excel(line_number, date=None, output_folder='generated_pdfs'):
+def generate_peel_test_excel(line_number, date=None, output_folder='generated_pdfs', rng=None):
     """
     Generate Excel report for 1 line with 12 sheets (3 stringers × 2 sides × 2 positions)
     
@@ -233,6 +239,7 @@ def generate_peel_test_excel(line_number, date=None, output_folder='generated_pd
         line_number: Line number (1, 2, or 3)
         date: Report date (datetime object or string)
         output_folder: Output directory path
+        rng: random.Random for the sample values and names (peel_excel_rng); a fresh unseeded one if None
     
     Returns:
         str: Path to generated Excel file
@@ -242,6 +249,9 @@ def generate_peel_test_excel(line_number, date=None, output_folder='generated_pd
     elif isinstance(date, str):
         date = datetime.strptime(date, '%Y-%m-%d')
     
+    if rng is None:
+        rng = random.Random()
+    
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
     
@@ -261,7 +271,7 @@ def generate_peel_test_excel(line_number, date=None, output_folder='generated_pd
                 stringer_name = f'{stringer_num}{side_suffix}'
                 sheet_name = f'{stringer_name}-{position}'
                 ws = wb.create_sheet(title=sheet_name)
-                create_sheet_data(ws, stringer_name, position, date)
+                create_sheet_data(ws, stringer_name, position, date, rng)
     
     # Save file
     filename = f'PeelTest_Line{line_number}_Day_{date.strftime("%Y%m%d")}.xlsx'
@@ -3,15 +3,19 @@ Peel Test Report Generator
 Automatically generates peel test reports for 3 stringers, 2 times per day
 """
 
-from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import mm, inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.units import mm
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
 from datetime import datetime
 import os
 import random
+from app.services.pdf_styles import STYLES, PEEL_TEST_TABLE_STYLES
+from app.services.seeding import document_rng
+
+
+def peel_report_rng(stringer_name, shift_name, date, seeded=False):
+    """RNG for one stringer/shift report - seeded from (date, shift, stringer) it is reproducible"""
+    return document_rng(seeded, 'peel_pdf', date.strftime('%Y-%m-%d'), shift_name, stringer_name)
 
 
 class PeelTestReportGenerator:
@@ -27,22 +31,24 @@ class PeelTestReportGenerator:
         if not os.path.exists(self.output_folder):
             os.makedirs(self.output_folder)
     
-    def generate_sample_data(self):
+    def generate_sample_data(self, rng=random):
         """Generate realistic sample data for 16 samples across 7 intervals"""
         data = []
         for i in range(16):
             row = [i + 1]  # Sample number
             for interval in range(7):
                 # Generate realistic values between 2.0 and 4.0
-                value = round(random.uniform(2.0, 4.0), 3)
+                value = round(rng.uniform(2.0, 4.0), 3)
                 row.append(value)
             data.append(row)
         return data
     
-    def generate_report(self, stringer_name, shift_name, date=None):
-        """Generate a single peel test report PDF"""
+    def generate_report(self, stringer_name, shift_name, date=None, rng=None):
+        """Generate a single peel test report PDF (values from rng - peel_report_rng, fresh unseeded if None)"""
         if date is None:
             date = datetime.now()
+        if rng is None:
+            rng = random.Random()
         
         # Create filename
         filename = f"PeelTest_{stringer_name.replace(' ', '_')}_{shift_name}_{date.strftime('%Y%m%d_%H%M')}.pdf"
@@ -62,7 +68,7 @@ class PeelTestReportGenerator:
         elements = []
         
         # Styles
-        styles = getSampleStyleSheet()
+        styles = STYLES
         
         # Header table (Company name and document details)
         header_left = Paragraph('<b>☐GAUTAM</b><br/><font size=9>Gautam Solar Private Limited</font>', styles['Normal'])
@@ -72,33 +78,17 @@ class PeelTestReportGenerator:
             ['Issue Date', '01/11/2024'],
             ['Rev. No. & Date', '0']
         ], colWidths=[35*mm, 35*mm])
-        doc_info_table.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        doc_info_table.setStyle(PEEL_TEST_TABLE_STYLES['doc_info'])
         
         header_table = Table([[header_left, doc_info_table]], colWidths=[120*mm, 70*mm])
-        header_table.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (1, 0), (1, 0), 'CENTER'),
-        ]))
+        header_table.setStyle(PEEL_TEST_TABLE_STYLES['header'])
         elements.append(header_table)
         
         # Title row
         title_table = Table([
             ['Type of Document:- Peel Test Report\nRibbon to Cell', 'Page\n\nPage 1 of 1']
         ], colWidths=[140*mm, 50*mm])
-        title_table.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ]))
+        title_table.setStyle(PEEL_TEST_TABLE_STYLES['title'])
         elements.append(title_table)
         elements.append(Spacer(1, 10*mm))
         
@@ -115,13 +105,13 @@ class PeelTestReportGenerator:
         # Graph/Chart placeholder
         chart_para = Paragraph(
             '<i><font color="gray">[Graph/Chart Area - Sample measurements visualization]</font></i>',
-            ParagraphStyle('ChartPlaceholder', parent=styles['Normal'], alignment=TA_CENTER, fontSize=9)
+            styles['ChartPlaceholder']
         )
         elements.append(chart_para)
         elements.append(Spacer(1, 20*mm))
         
         # Generate sample data
-        sample_data = self.generate_sample_data()
+        sample_data = self.generate_sample_data(rng)
         
         # Create main data table
         headers = [
@@ -138,25 +128,14 @@ class PeelTestReportGenerator:
         
         # Create table
         data_table = Table(table_data, colWidths=[15*mm] + [24*mm] * 7)
-        data_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D9D9D9')),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 8),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 3),
-        ]))
+        data_table.setStyle(PEEL_TEST_TABLE_STYLES['data'])
         elements.append(data_table)
         
         # Add note
         elements.append(Spacer(1, 10*mm))
         note_para = Paragraph(
             '<i>Note: Standard specification for peel strength ≥ 1.5 N/mm</i>',
-            ParagraphStyle('Note', parent=styles['Normal'], fontSize=9)
+            styles['Note']
         )
         elements.append(note_para)
         
@@ -164,7 +143,7 @@ class PeelTestReportGenerator:
         doc.build(elements)
         return filepath
     
-    def generate_daily_reports(self, date=None):
+    def generate_daily_reports(self, date=None, seeded=False):
         """Generate all reports for a day (3 stringers × 2 shifts = 6 reports)"""
         if date is None:
             date = datetime.now()
@@ -173,7 +152,8 @@ class PeelTestReportGenerator:
         for stringer in self.stringers:
             for shift in self.shifts:
                 report_time = date.replace(hour=9 if shift == 'Morning' else 17, minute=0)
-                filepath = self.generate_report(stringer, shift, report_time)
+                rng = peel_report_rng(stringer, shift, report_time, seeded)
+                filepath = self.generate_report(stringer, shift, report_time, rng)
                 generated_files.append(filepath)
                 print(f"✓ Generated: {os.path.basename(filepath)}")
         return generated_files
@@ -188,6 +168,7 @@ def generate_peel_test_pdf(data):
             - date: Report date
             - stringer: Stringer name (Stringer 1/2/3)
             - shift: Shift name (Morning/Evening)
+            - seeded: Reproducible values for (date, shift, stringer) (default False)
     
     Returns:
         str: Path to generated PDF file
@@ -201,6 +182,7 @@ def generate_peel_test_pdf(data):
     if isinstance(report_date, str):
         report_date = datetime.strptime(report_date, '%Y-%m-%d')
     
-    filepath = generator.generate_report(stringer_name, shift_name, report_date)
+    rng = peel_report_rng(stringer_name, shift_name, report_date, data.get('seeded', False))
+    filepath = generator.generate_report(stringer_name, shift_name, report_date, rng)
     
     return filepath
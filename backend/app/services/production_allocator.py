@@ -0,0 +1,135 @@
+"""
+Daily Production Allocator
+Books the next contiguous sequence_number range of an order for one shift/line
+"""
+from sqlalchemy import case, func, select, update
+from app.models.master_data import MasterModule, MasterOrderStats, DailyProduction
+from app.services.order_stats import ensure_order_stats, adjust_order_stats
+
+
+class AllocationError(ValueError):
+    """Raised when an order does not have enough unproduced modules"""
+
+
+def _lock_cursor(session, order_id):
+    """
+    Counter row of the order, locked FOR UPDATE so bookings of one order run one at a time
+
+    A missing row is inserted in the caller's transaction (insert-ignore, no
+    commit), so two concurrent first bookings both end up locking the same row.
+    """
+    ensure_order_stats(session, [order_id])
+    return session.execute(
+        select(MasterOrderStats)
+        .where(MasterOrderStats.order_id == order_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).scalar_one()
+
+
+def allocate_daily_production(session, order_id, production_date, shift, line_number, modules_count):
+    """
+    Mark the next modules_count unproduced modules of an order as produced
+
+    The order's allocation cursor (MasterOrderStats.allocated_sequence) is
+    locked, the end of the range is found with one indexed OFFSET lookup
+    after the cursor, FTR / rejection counts come from one aggregate, and a
+    single range UPDATE flips the modules. Round trips do not depend on
+    modules_count and concurrent bookings can never overlap.
+
+    Args:
+        session: SQLAlchemy session (caller commits)
+        order_id: MasterOrder id
+        production_date: date
+        shift: Shift code (A, B, C)
+        line_number: Production line
+        modules_count: Modules to book
+
+    Returns:
+        dict: modules_produced, ftr_count, rejection_count, rejection_serials,
+            first_sequence, last_sequence
+
+    Raises:
+        AllocationError: When fewer than modules_count modules are available
+    """
+    if modules_count < 1:
+        raise AllocationError('modules_count must be at least 1')
+
+    stats = _lock_cursor(session, order_id)
+
+    cursor = stats.allocated_sequence
+    if cursor is None:
+        # First booking since the cursor was introduced: continue after the last produced module
+        cursor = session.execute(
+            select(func.coalesce(func.max(MasterModule.sequence_number), 0)).where(
+                MasterModule.order_id == order_id,
+                MasterModule.is_produced == True
+            )
+        ).scalar()
+
+    unproduced = [
+        MasterModule.order_id == order_id,
+        MasterModule.sequence_number > cursor,
+        MasterModule.is_produced == False
+    ]
+
+    end_sequence = session.execute(
+        select(MasterModule.sequence_number)
+        .where(*unproduced)
+        .order_by(MasterModule.sequence_number)
+        .offset(modules_count - 1)
+        .limit(1)
+    ).scalar()
+
+    if end_sequence is None:
+        available = session.execute(select(func.count()).select_from(MasterModule).where(*unproduced)).scalar()
+        raise AllocationError(f'Only {available} modules available, requested {modules_count}')
+
+    booked = unproduced + [MasterModule.sequence_number <= end_sequence]
+
+    produced, rejection_count = session.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((MasterModule.is_rejected == True, 1), else_=0)), 0)
+        ).where(*booked)
+    ).one()
+    rejection_serials = session.execute(
+        select(MasterModule.serial_number)
+        .where(*booked, MasterModule.is_rejected == True)
+        .order_by(MasterModule.sequence_number)
+    ).scalars().all()
+
+    session.execute(
+        update(MasterModule)
+        .where(*booked)
+        .values(
+            is_produced=True,
+            production_date=production_date,
+            production_shift=shift,
+            line_number=line_number
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    stats.allocated_sequence = end_sequence
+    ftr_count = produced - rejection_count
+
+    session.add(DailyProduction(
+        order_id=order_id,
+        production_date=production_date,
+        shift=shift,
+        line_number=line_number,
+        modules_produced=produced,
+        ftr_count=ftr_count,
+        rejection_count=rejection_count
+    ))
+    adjust_order_stats(session, order_id, produced=produced)
+
+    return {
+        'modules_produced': produced,
+        'ftr_count': ftr_count,
+        'rejection_count': rejection_count,
+        'rejection_serials': rejection_serials,
+        'first_sequence': cursor + 1,
+        'last_sequence': end_sequence
+    }
@@ -1,81 +1,16 @@
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, PageBreak
 from reportlab.lib.units import mm
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from io import BytesIO
 from datetime import datetime
+from app.services.pdf_styles import STYLES, PRODUCTION_TABLE_STYLES
+from app.services.rejection_details import RejectionDetailsTable, index_rejections_by_date, rejection_detail_rows
 
 class ProductionPDFGenerator:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._create_custom_styles()
+        self.styles = STYLES
     
-    def _create_custom_styles(self):
-        # Title style
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=26,
-            textColor=colors.HexColor('#1a237e'),
-            spaceAfter=6,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Subtitle style
-        self.styles.add(ParagraphStyle(
-            name='CustomSubtitle',
-            parent=self.styles['Normal'],
-            fontSize=13,
-            textColor=colors.HexColor('#5c6bc0'),
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Section header style
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#1a237e'),
-            spaceAfter=12,
-            spaceBefore=15,
-            fontName='Helvetica-Bold',
-            borderPadding=8,
-            backColor=colors.HexColor('#e3f2fd'),
-            leftIndent=10,
-            rightIndent=10
-        ))
-        
-        # Summary box style
-        self.styles.add(ParagraphStyle(
-            name='SummaryBox',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            textColor=colors.HexColor('#1a237e'),
-            spaceAfter=8,
-            spaceBefore=8,
-            fontName='Helvetica',
-            leftIndent=15,
-            backColor=colors.HexColor('#e3f2fd'),
-            borderPadding=8
-        ))
-        
-        # Day summary style
-        self.styles.add(ParagraphStyle(
-            name='DaySummary',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#424242'),
-            spaceAfter=4,
-            fontName='Helvetica',
-            leftIndent=20,
-            bulletIndent=10
-        ))
-
     def generate_production_report(self, report_data, filename):
         """Generate production report PDF"""
         buffer = BytesIO()
@@ -104,22 +39,7 @@ class ProductionPDFGenerator:
         ]
         
         info_table = Table(info_data, colWidths=[60*mm, 120*mm])
-        info_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#90caf9')),
-            ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#e3f2fd')),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1a237e')),
-            ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#1a237e')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#64b5f6')),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 6),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 4),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ]))
+        info_table.setStyle(PRODUCTION_TABLE_STYLES['info'])
         story.append(info_table)
         story.append(Spacer(1, 8))
         
@@ -148,12 +68,9 @@ class ProductionPDFGenerator:
         start_date = report_data.get('start_date', '')
         end_date = report_data.get('end_date', '')
         
-        # Filter rejections by date range
-        filtered_rejections = []
-        for module in rejected_modules_list:
-            rej_date = module.get('rejection_date', '') or module.get('rejectionDate', '')
-            if start_date <= rej_date <= end_date:
-                filtered_rejections.append(module)
+        # Filter rejections by date range and index them by date (one pass)
+        rejections_by_date = index_rejections_by_date(rejected_modules_list, start_date, end_date)
+        total_rejections = sum(len(modules) for modules in rejections_by_date.values())
         
         # Cell inventory calculations - Always calculate for internal use
         cells_received_qty = report_data.get('cells_received_qty', 0)
@@ -219,8 +136,8 @@ class ProductionPDFGenerator:
                 module_rej_percent = record.get('module_rejection_percent', 0)
                 modules_rejected_today = int((daily_total * module_rej_percent) / 100)
                 
-                # Count actual rejected modules from filtered list for this date
-                actual_rejected = len([m for m in filtered_rejections if m.get('rejectionDate') == date_str or m.get('rejection_date') == date_str])
+                # Count actual rejected modules from the date index
+                actual_rejected = len(rejections_by_date.get(date_str, ()))
                 
                 # Use actual count if available, otherwise use calculated
                 if actual_rejected > 0:
@@ -272,41 +189,7 @@ class ProductionPDFGenerator:
                     str(int(total_modules_rejected))
                 ])
                 prod_table = Table(prod_data, colWidths=[40*mm, 25*mm, 25*mm, 30*mm, 25*mm, 30*mm])
-            prod_table.setStyle(TableStyle([
-                # Header row - Enhanced
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#64b5f6')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1a237e')),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-                ('TOPPADDING', (0, 0), (-1, 0), 6),
-                ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
-                
-                # Data rows
-                ('ALIGN', (0, 1), (0, -2), 'CENTER'),
-                ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -2), 8),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -2), [colors.HexColor('#ffffff'), colors.HexColor('#e3f2fd')]),
-                ('GRID', (0, 0), (-1, -2), 1, colors.HexColor('#bbdefb')),
-                
-                # Highlight rejection columns
-                ('BACKGROUND', (5, 1), (5, -2), colors.HexColor('#fff9c4')),
-                ('BACKGROUND', (7, 1), (7, -2), colors.HexColor('#ffccbc')),
-                ('BACKGROUND', (8, 1), (8, -2), colors.HexColor('#ffcdd2')),
-                
-                # Total row - Bold and highlighted
-                ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#90caf9')),
-                ('TEXTCOLOR', (0, -1), (-1, -1), colors.HexColor('#1a237e')),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, -1), (-1, -1), 10),
-                ('GRID', (0, -1), (-1, -1), 2, colors.HexColor('#64b5f6')),
-                
-                ('TOPPADDING', (0, 0), (-1, -1), 4),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ]))
+            prod_table.setStyle(PRODUCTION_TABLE_STYLES['production'])
             story.append(prod_table)
         
         story.append(Spacer(1, 10))
@@ -329,24 +212,7 @@ class ProductionPDFGenerator:
         ]
         
         inventory_table = Table(inventory_data, colWidths=[46*mm] * 4)
-        inventory_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#81c784')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1b5e20')),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('FONTSIZE', (0, 1), (-1, 1), 11),
-            ('BACKGROUND', (0, 1), (0, 1), colors.HexColor('#e3f2fd')),
-            ('BACKGROUND', (1, 1), (1, 1), colors.HexColor('#fff9c4')),
-            ('BACKGROUND', (2, 1), (2, 1), colors.HexColor('#ffccbc')),
-            ('BACKGROUND', (3, 1), (3, 1), colors.HexColor('#c8e6c9')),
-            ('TEXTCOLOR', (0, 1), (-1, 1), colors.HexColor('#1a237e')),
-            ('GRID', (0, 0), (-1, -1), 1.5, colors.HexColor('#81c784')),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        inventory_table.setStyle(PRODUCTION_TABLE_STYLES['inventory'])
         if report_options.get('includeCellInventory', True):
             story.append(inventory_table)
         story.append(Spacer(1, 10))
@@ -385,44 +251,17 @@ class ProductionPDFGenerator:
         ]
         
         summary_table = Table(summary_data, colWidths=[37*mm] * 5)
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#7e57c2')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('FONTSIZE', (0, 1), (-1, 1), 12),
-            ('BACKGROUND', (0, 1), (0, 1), colors.HexColor('#c8e6c9')),
-            ('BACKGROUND', (1, 1), (1, 1), colors.HexColor('#bbdefb')),
-            ('BACKGROUND', (2, 1), (2, 1), colors.HexColor('#fff9c4')),
-            ('BACKGROUND', (3, 1), (3, 1), colors.HexColor('#ffccbc')),
-            ('BACKGROUND', (4, 1), (4, 1), colors.HexColor('#c5e1a5')),
-            ('TEXTCOLOR', (0, 1), (-1, 1), colors.HexColor('#1a237e')),
-            ('GRID', (0, 0), (-1, -1), 1.5, colors.HexColor('#7e57c2')),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        summary_table.setStyle(PRODUCTION_TABLE_STYLES['kpi'])
         if report_options.get('includeKPIMetrics', True):
             story.append(summary_table)
         
         # Rejected Modules Section - START FROM NEW PAGE
-        if filtered_rejections and report_options.get('includeRejections', True):
+        if total_rejections and report_options.get('includeRejections', True):
             story.append(PageBreak())
             story.append(Paragraph("🔍 REJECTION ANALYSIS", self.styles['SectionHeader']))
             story.append(Spacer(1, 4))
             
-            # Group rejections by date
-            rejections_by_date = {}
-            for module in filtered_rejections:
-                date = module.get('rejection_date', 'Unknown')
-                if date not in rejections_by_date:
-                    rejections_by_date[date] = []
-                rejections_by_date[date].append(module)
-            
             # Enhanced summary with visual appeal
-            total_rejections = len(filtered_rejections)
             total_dates = len(rejections_by_date)
             summary_text = f"<b><font size=12 color='#d32f2f'>⚠️ Total Rejected in Period: {total_rejections} modules</font></b> | <b><font size=11 color='#1a237e'>Across {total_dates} days</font></b>"
             story.append(Paragraph(summary_text, self.styles['SummaryBox']))
@@ -456,20 +295,7 @@ class ProductionPDFGenerator:
                 day_summary_data.append([date, f"{count} modules", status])
             
             day_summary_table = Table(day_summary_data, colWidths=[45*mm, 45*mm, 45*mm])
-            day_summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ef5350')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('GRID', (0, 0), (-1, -1), 1.5, colors.HexColor('#ef5350')),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#ffebee'), colors.HexColor('#ffffff')]),
-                ('TOPPADDING', (0, 0), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ]))
+            day_summary_table.setStyle(PRODUCTION_TABLE_STYLES['day_summary'])
             if report_options.get('includeDayWiseSummary', True):
                 story.append(day_summary_table)
                 story.append(Spacer(1, 15))
@@ -482,124 +308,10 @@ class ProductionPDFGenerator:
             story.append(Paragraph("<b>📋 Complete Rejection Details (Date & Serial Number wise):</b>", self.styles['Normal']))
             story.append(Spacer(1, 8))
             
-            # Create 3-column layout for rejection details - Maximum space efficiency
-            serial_no = 1
-            all_rejections = []
-            
-            # Process rejections date by date
-            for date in sorted_dates:
-                modules = rejections_by_date[date]
-                modules_sorted = sorted(modules, key=lambda x: x.get('serial_number', ''))
-                
-                for module in modules_sorted:
-                    all_rejections.append({
-                        'no': serial_no,
-                        'date': date,
-                        'serial': module.get('serial_number', ''),
-                        'reason': module.get('reason', 'Quality Issue'),
-                        'stage': module.get('stage', 'N/A')
-                    })
-                    serial_no += 1
-            
-            # Break into pages - max 15 rows per column (45 total in 3 columns)
-            # This ensures tables fit within page height (498 points)
-            rows_per_page = 15
-            
-            for page_start in range(0, len(all_rejections), rows_per_page * 3):
-                if page_start > 0:
-                    story.append(PageBreak())
-                    story.append(Paragraph("<b>📋 Rejection Details (Continued):</b>", self.styles['Normal']))
-                    story.append(Spacer(1, 6))
-                
-                page_end = min(page_start + rows_per_page * 3, len(all_rejections))
-                page_rejections = all_rejections[page_start:page_end]
-                
-                # Split current page data into 3 columns
-                third = len(page_rejections) // 3
-                col1_page = page_rejections[:third]
-                col2_page = page_rejections[third:third*2]
-                col3_page = page_rejections[third*2:]
-                
-                # Create 3 side-by-side tables for current page
-                col1_data = [['No', 'Date', 'Serial', 'Reason']]
-                for rej in col1_page:
-                    # Truncate only if really necessary
-                    serial_short = rej['serial'][:18] + '..' if len(rej['serial']) > 18 else rej['serial']
-                    reason_short = rej['reason'][:22] + '..' if len(rej['reason']) > 22 else rej['reason']
-                    col1_data.append([
-                        str(rej['no']),
-                        rej['date'],
-                        serial_short,
-                        reason_short
-                    ])
-                
-                col2_data = [['No', 'Date', 'Serial', 'Reason']]
-                for rej in col2_page:
-                    serial_short = rej['serial'][:18] + '..' if len(rej['serial']) > 18 else rej['serial']
-                    reason_short = rej['reason'][:22] + '..' if len(rej['reason']) > 22 else rej['reason']
-                    col2_data.append([
-                        str(rej['no']),
-                        rej['date'],
-                        serial_short,
-                        reason_short
-                    ])
-                
-                col3_data = [['No', 'Date', 'Serial', 'Reason']]
-                for rej in col3_page:
-                    serial_short = rej['serial'][:18] + '..' if len(rej['serial']) > 18 else rej['serial']
-                    reason_short = rej['reason'][:22] + '..' if len(rej['reason']) > 22 else rej['reason']
-                    col3_data.append([
-                        str(rej['no']),
-                        rej['date'],
-                        serial_short,
-                        reason_short
-                    ])
-                
-                # Create 3 tables with wider column widths for better readability
-                col1_table = Table(col1_data, colWidths=[7*mm, 20*mm, 30*mm, 30*mm])
-                col2_table = Table(col2_data, colWidths=[7*mm, 20*mm, 30*mm, 30*mm])
-                col3_table = Table(col3_data, colWidths=[7*mm, 20*mm, 30*mm, 30*mm])
-                
-                # Style for individual column tables with new color scheme
-                table_style_common = TableStyle([
-                    # Header styling - Orange and White combination
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ff6f00')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 8),
-                    ('TOPPADDING', (0, 0), (-1, 0), 6),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-                    
-                    # Data styling
-                    ('ALIGN', (0, 1), (1, -1), 'CENTER'),
-                    ('ALIGN', (2, 1), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 7),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#ffb74d')),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#fff3e0'), colors.HexColor('#ffffff')]),
-                    ('TOPPADDING', (0, 1), (-1, -1), 4),
-                    ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 3),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 3),
-                ])
-                
-                col1_table.setStyle(table_style_common)
-                col2_table.setStyle(table_style_common)
-                col3_table.setStyle(table_style_common)
-                
-                # Combine 3 tables side by side with proper spacing
-                combined_data = [[col1_table, col2_table, col3_table]]
-                reject_table = Table(combined_data, colWidths=[87*mm, 87*mm, 87*mm])
-                reject_table.setStyle(TableStyle([
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 2),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 2),
-                ]))
-                
-                story.append(reject_table)
-                story.append(Spacer(1, 10))
+            # 3-column layout for rejection details - one flowable that splits per page
+            # and repeats the column headers, instead of nested tables per column per page
+            story.append(RejectionDetailsTable(rejection_detail_rows(rejections_by_date)))
+            story.append(Spacer(1, 10))
         
         # Remarks Section
         remarks = report_data.get('remarks', '')
@@ -607,17 +319,7 @@ class ProductionPDFGenerator:
             story.append(Spacer(1, 18))
             story.append(Paragraph("📝 REMARKS & NOTES", self.styles['SectionHeader']))
             story.append(Spacer(1, 8))
-            remarks_style = ParagraphStyle(
-                'RemarksStyle',
-                parent=self.styles['Normal'],
-                fontSize=10,
-                textColor=colors.HexColor('#424242'),
-                leftIndent=15,
-                rightIndent=15,
-                spaceBefore=5,
-                spaceAfter=5
-            )
-            story.append(Paragraph(remarks, remarks_style))
+            story.append(Paragraph(remarks, self.styles['RemarksStyle']))
         
         # Footer Section
         story.append(Spacer(1, 20))
@@ -628,16 +330,7 @@ class ProductionPDFGenerator:
         ]
         
         footer_table = Table(footer_data, colWidths=[50*mm, 130*mm])
-        footer_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#757575')),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-            ('LINEABOVE', (0, 0), (-1, 0), 1, colors.HexColor('#e0e0e0')),
-        ]))
+        footer_table.setStyle(PRODUCTION_TABLE_STYLES['footer'])
         story.append(footer_table)
         
         # Build PDF
@@ -0,0 +1,246 @@
+"""
+Production Report Data
+Builds the PDF / Excel report inputs from the database for one company and date range
+"""
+from datetime import datetime
+from sqlalchemy import func, select
+from app.models.database import Company, ProductionRecord, RejectedModule
+
+FETCH_BATCH_SIZE = 2000
+
+DEFAULT_REPORT_OPTIONS = {
+    'includeProductionDetails': True,
+    'includeCellInventory': True,
+    'includeKPIMetrics': True,
+    'includeDayWiseSummary': True,
+    'includeRejections': True
+}
+
+
+def parse_report_date(value, name):
+    """
+    'YYYY-MM-DD' -> date
+
+    Raises:
+        ValueError: On a missing or malformed date
+    """
+    if not value:
+        raise ValueError(f'{name} is required')
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'{name} must be YYYY-MM-DD')
+
+
+def _production_stmt(company_id, start, end):
+    return (
+        select(
+            ProductionRecord.date,
+            ProductionRecord.day_production,
+            ProductionRecord.night_production,
+            ProductionRecord.pdi,
+            ProductionRecord.cell_rejection_percent,
+            ProductionRecord.module_rejection_percent
+        )
+        .where(
+            ProductionRecord.company_id == company_id,
+            ProductionRecord.date.between(start, end)
+        )
+        .order_by(ProductionRecord.date)
+    )
+
+
+def _rejection_stmt(company_id, start, end):
+    return (
+        select(
+            RejectedModule.rejection_date,
+            RejectedModule.serial_number,
+            RejectedModule.reason,
+            RejectedModule.stage,
+            RejectedModule.defect_type
+        )
+        .where(
+            RejectedModule.company_id == company_id,
+            RejectedModule.rejection_date.between(start, end)
+        )
+        .order_by(RejectedModule.rejection_date, RejectedModule.serial_number)
+        .execution_options(yield_per=FETCH_BATCH_SIZE)
+    )
+
+
+def iter_production_records(session, company_id, start, end):
+    """Production rows in the range as the PDF generator's production_records dicts"""
+    for row in session.execute(_production_stmt(company_id, start, end)):
+        yield {
+            'date': row.date.isoformat(),
+            'day_production': row.day_production or 0,
+            'night_production': row.night_production or 0,
+            'cell_rejection_percent': row.cell_rejection_percent or 0,
+            'module_rejection_percent': row.module_rejection_percent or 0,
+            'pdi': row.pdi or ''
+        }
+
+
+def iter_rejected_modules(session, company_id, start, end):
+    """Rejections in the range ordered by date then serial, streamed in batches"""
+    for row in session.execute(_rejection_stmt(company_id, start, end)):
+        yield {
+            'serial_number': row.serial_number,
+            'rejection_date': row.rejection_date.isoformat(),
+            'reason': row.reason,
+            'stage': row.stage,
+            'defect_type': row.defect_type or 'Minor'
+        }
+
+
+def iter_excel_production_data(records, cells_per_module):
+    """PDF production_records -> Excel production_data rows (percentages as fractions)"""
+    for record in records:
+        daily_total = record['day_production'] + record['night_production']
+        yield {
+            'date': record['date'],
+            'day_of_week': datetime.strptime(record['date'], '%Y-%m-%d').strftime('%A'),
+            'day_production': record['day_production'],
+            'night_production': record['night_production'],
+            'cell_rejection_percent': record['cell_rejection_percent'] / 100,
+            'module_rejection_percent': record['module_rejection_percent'] / 100,
+            'cells_rejected': round(daily_total * cells_per_module * record['cell_rejection_percent'] / 100),
+            'modules_rejected': round(daily_total * record['module_rejection_percent'] / 100)
+        }
+
+
+def iter_excel_rejections(rejected_modules):
+    """PDF rejected_modules -> Excel rejection detail rows"""
+    for no, rej in enumerate(rejected_modules, 1):
+        yield {
+            'no': no,
+            'date': rej['rejection_date'],
+            'serial': rej['serial_number'],
+            'reason': rej['reason'],
+            'stage': rej['stage'],
+            'defect_type': rej['defect_type'],
+            'remarks': ''
+        }
+
+
+def rejection_fingerprint(session, company_id, start, end):
+    """
+    Version of the range's rejections for render cache keys, without reading the rows
+
+    Rejections are only inserted (ids grow) or deleted, never edited, so
+    (count, max id, id sum) changes whenever the set does.
+
+    Returns:
+        list: [count, max_id, id_sum]
+    """
+    count, max_id, id_sum = session.execute(
+        select(func.count(), func.max(RejectedModule.id), func.sum(RejectedModule.id)).where(
+            RejectedModule.company_id == company_id,
+            RejectedModule.rejection_date.between(start, end)
+        )
+    ).one()
+    return [count, max_id or 0, int(id_sum or 0)]
+
+
+def calculate_cell_stock(session, company):
+    """
+    Cells received minus cells used and rejected over all production records
+
+    One aggregate query instead of summing every record client-side.
+    """
+    cells_per_module = company.cells_per_module or 132
+    daily_total = func.coalesce(ProductionRecord.day_production, 0) + func.coalesce(ProductionRecord.night_production, 0)
+    produced, rejected_weighted = session.execute(
+        select(
+            func.coalesce(func.sum(daily_total), 0),
+            func.coalesce(func.sum(daily_total * func.coalesce(ProductionRecord.cell_rejection_percent, 0)), 0)
+        ).where(ProductionRecord.company_id == company.id)
+    ).one()
+
+    cells_used = float(produced) * cells_per_module
+    cells_rejected = float(rejected_weighted) * cells_per_module / 100
+    return round((company.cells_received_qty or 0) - cells_used - cells_rejected)
+
+
+def build_pdf_report_data(session, company, start, end, report_options=None, remarks=''):
+    """
+    report_data for ProductionPDFGenerator.generate_production_report
+
+    rejected_modules is a generator over the range query, consumed once by the
+    generator while it filters the rows.
+
+    Args:
+        session: SQLAlchemy session
+        company: Company
+        start: Start date (inclusive)
+        end: End date (inclusive)
+        report_options: Section toggles (all sections if None)
+        remarks: Free-text remarks
+
+    Returns:
+        dict: report_data
+    """
+    production_records = list(iter_production_records(session, company.id, start, end))
+    total_production = sum(r['day_production'] + r['night_production'] for r in production_records)
+    total_rejected = session.execute(
+        select(func.count()).select_from(RejectedModule).where(
+            RejectedModule.company_id == company.id,
+            RejectedModule.rejection_date.between(start, end)
+        )
+    ).scalar()
+
+    return {
+        'company_name': company.company_name,
+        'module_wattage': company.module_wattage,
+        'module_type': company.module_type,
+        'cells_per_module': company.cells_per_module or 132,
+        'cells_received_qty': company.cells_received_qty or 0,
+        'cells_received_mw': company.cells_received_mw or 0,
+        'start_date': start.isoformat(),
+        'end_date': end.isoformat(),
+        'production_records': production_records,
+        'cell_stock': calculate_cell_stock(session, company),
+        'total_mw': f"{total_production * float(company.module_wattage or 0) / 1000000:.2f}",
+        'total_rejected_modules': total_rejected,
+        'rejected_modules': iter_rejected_modules(session, company.id, start, end),
+        'remarks': remarks or '',
+        'report_options': report_options or dict(DEFAULT_REPORT_OPTIONS)
+    }
+
+
+def build_excel_report_args(session, company, start, end, report_options=None):
+    """
+    Positional arguments for generate_production_excel
+
+    production_data is a list (the summary sheets walk it several times),
+    rejections is a generator over the range query.
+
+    Returns:
+        tuple: (company, production_data, rejections, start_date, end_date,
+                cells_received_qty, cells_received_mw, report_options)
+    """
+    cells_per_module = company.cells_per_module or 132
+    records = iter_production_records(session, company.id, start, end)
+    company_info = {
+        'name': company.company_name,
+        'address': 'N/A',
+        'contact': 'N/A',
+        'module_wattage': company.module_wattage,
+        'module_type': company.module_type,
+        'cells_per_module': cells_per_module
+    }
+    return (
+        company_info,
+        list(iter_excel_production_data(records, cells_per_module)),
+        iter_excel_rejections(iter_rejected_modules(session, company.id, start, end)),
+        start.isoformat(),
+        end.isoformat(),
+        company.cells_received_qty or 0,
+        company.cells_received_mw or 0,
+        report_options or dict(DEFAULT_REPORT_OPTIONS)
+    )
+
+
+def load_report_company(session, company_id):
+    """Company row for a report, None if it does not exist"""
+    return session.get(Company, company_id)
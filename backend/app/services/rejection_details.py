@@ -0,0 +1,191 @@
+"""
+Rejection Details Flowable
+Date-indexed rejections and the 3-column rejection detail grid of the production
+report, drawn straight on the canvas as one splittable flowable
+"""
+from math import ceil
+
+from reportlab.lib import colors
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Flowable
+
+# One column block: No | Date | Serial | Reason
+BLOCK_COL_WIDTHS = (7 * mm, 20 * mm, 30 * mm, 30 * mm)
+BLOCK_WIDTH = sum(BLOCK_COL_WIDTHS)
+BLOCK_GAP = 2 * mm
+BLOCKS = 3
+
+HEADER_HEIGHT = 21.6   # 8pt bold + 6pt padding top and bottom
+ROW_HEIGHT = 16.4      # 7pt + 4pt padding top and bottom
+CONTINUED_HEIGHT = 18  # 'Continued' heading line + spacing on later pages
+MIN_ROWS_PER_COLUMN = 3
+
+HEADERS = ('No', 'Date', 'Serial', 'Reason')
+HEADER_FILL = colors.HexColor('#ff6f00')
+STRIPE_FILL = colors.HexColor('#fff3e0')
+GRID_COLOR = colors.HexColor('#ffb74d')
+HEADING_COLOR = colors.black
+CONTINUED_TEXT = "📋 Rejection Details (Continued):"
+
+
+def rejection_date(module):
+    """Rejection date of a rejected_modules entry (snake or camel case)"""
+    return module.get('rejection_date', '') or module.get('rejectionDate', '')
+
+
+def index_rejections_by_date(rejected_modules, start_date, end_date):
+    """
+    Group the rejections inside [start_date, end_date] by date in one pass
+
+    Args:
+        rejected_modules: Iterable of rejected module dicts (may be a generator)
+        start_date: 'YYYY-MM-DD' (inclusive)
+        end_date: 'YYYY-MM-DD' (inclusive)
+
+    Returns:
+        dict: date -> list of modules, in input order
+    """
+    by_date = {}
+    for module in rejected_modules:
+        date = rejection_date(module)
+        if start_date <= date <= end_date:
+            by_date.setdefault(date, []).append(module)
+    return by_date
+
+
+def _shorten(text, limit):
+    return text[:limit] + '..' if len(text) > limit else text
+
+
+def rejection_detail_rows(rejections_by_date):
+    """
+    Numbered detail rows, date-wise and serial-wise
+
+    Returns:
+        list: (no, date, serial, reason) strings, truncated to the column widths
+    """
+    rows = []
+    for date in sorted(rejections_by_date):
+        for module in sorted(rejections_by_date[date], key=lambda m: m.get('serial_number', '')):
+            rows.append((
+                str(len(rows) + 1),
+                date,
+                _shorten(module.get('serial_number', ''), 18),
+                _shorten(module.get('reason', 'Quality Issue'), 22),
+            ))
+    return rows
+
+
+class RejectionDetailsTable(Flowable):
+    """
+    Rejection rows laid out in 3 side-by-side column blocks per page
+
+    split() cuts the rows at what fits in the frame, so a long list becomes one
+    part per page without building a Table per block. Parts after the first
+    repeat the 'Continued' heading and the column headers. Rows are shared,
+    each part only keeps its [start, end) slice bounds.
+    """
+
+    def __init__(self, rows, start=0, end=None, continued=False):
+        super().__init__()
+        self.rows = rows
+        self.start = start
+        self.end = len(rows) if end is None else end
+        self.continued = continued
+
+    @property
+    def _heading_height(self):
+        return CONTINUED_HEIGHT if self.continued else 0
+
+    @property
+    def _rows_per_column(self):
+        return ceil((self.end - self.start) / BLOCKS)
+
+    def wrap(self, availWidth, availHeight):
+        self.width = availWidth
+        self.height = self._heading_height + HEADER_HEIGHT + self._rows_per_column * ROW_HEIGHT
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        rows_per_column = int((availHeight - self._heading_height - HEADER_HEIGHT) // ROW_HEIGHT)
+        if rows_per_column < MIN_ROWS_PER_COLUMN:
+            # Not worth a part at the bottom of this frame - start on the next one
+            return []
+        page_end = self.start + rows_per_column * BLOCKS
+        if page_end >= self.end:
+            return [self]
+        return [
+            RejectionDetailsTable(self.rows, self.start, page_end, self.continued),
+            RejectionDetailsTable(self.rows, page_end, self.end, continued=True),
+        ]
+
+    def draw(self):
+        canv = self.canv
+        top = self.height
+        if self.continued:
+            canv.setFillColor(HEADING_COLOR)
+            canv.setFont('Helvetica-Bold', 10)
+            canv.drawString(0, top - 10, CONTINUED_TEXT)
+            top -= CONTINUED_HEIGHT
+
+        left = (self.width - BLOCKS * BLOCK_WIDTH - (BLOCKS - 1) * BLOCK_GAP) / 2
+        per_column = self._rows_per_column
+        for block in range(BLOCKS):
+            first = self.start + block * per_column
+            last = min(first + per_column, self.end)
+            if first < last:
+                self._draw_block(left + block * (BLOCK_WIDTH + BLOCK_GAP), top, first, last)
+
+    def _draw_block(self, x, top, first, last):
+        """One column block (header + rows[first:last]) with its top-left corner at (x, top)"""
+        canv = self.canv
+        count = last - first
+        bottom = top - HEADER_HEIGHT - count * ROW_HEIGHT
+        col_x = [x]
+        for width in BLOCK_COL_WIDTHS:
+            col_x.append(col_x[-1] + width)
+
+        # Backgrounds: header, then striped rows starting with the tinted one
+        canv.setFillColor(HEADER_FILL)
+        canv.rect(x, top - HEADER_HEIGHT, BLOCK_WIDTH, HEADER_HEIGHT, stroke=0, fill=1)
+        canv.setFillColor(STRIPE_FILL)
+        for i in range(0, count, 2):
+            canv.rect(x, top - HEADER_HEIGHT - (i + 1) * ROW_HEIGHT, BLOCK_WIDTH, ROW_HEIGHT, stroke=0, fill=1)
+
+        # Header text
+        canv.setFillColor(colors.white)
+        canv.setFont('Helvetica-Bold', 8)
+        baseline = top - HEADER_HEIGHT / 2 - 8 * 0.35
+        for idx, header in enumerate(HEADERS):
+            canv.drawCentredString((col_x[idx] + col_x[idx + 1]) / 2, baseline, header)
+
+        # Rows in one text object: No and Date centred, Serial and Reason left aligned
+        canv.setFillColor(colors.black)
+        text = canv.beginText()
+        text.setFont('Helvetica', 7)
+        no_x = (col_x[0] + col_x[1]) / 2
+        date_x = (col_x[1] + col_x[2]) / 2
+        serial_x = col_x[2] + 3
+        reason_x = col_x[3] + 3
+        baseline = top - HEADER_HEIGHT - ROW_HEIGHT / 2 - 7 * 0.35
+        for no, date, serial, reason in self.rows[first:last]:
+            for text_x, value in ((no_x - stringWidth(no, 'Helvetica', 7) / 2, no),
+                                  (date_x - stringWidth(date, 'Helvetica', 7) / 2, date),
+                                  (serial_x, serial),
+                                  (reason_x, reason)):
+                text.setTextOrigin(text_x, baseline)
+                text.textOut(value)
+            baseline -= ROW_HEIGHT
+        canv.drawText(text)
+
+        # Grid
+        canv.setStrokeColor(GRID_COLOR)
+        canv.setLineWidth(0.5)
+        lines = [(x, top, x + BLOCK_WIDTH, top)]
+        y = top - HEADER_HEIGHT
+        for _ in range(count + 1):
+            lines.append((x, y, x + BLOCK_WIDTH, y))
+            y -= ROW_HEIGHT
+        lines.extend((cx, top, cx, bottom) for cx in col_x)
+        canv.lines(lines)
@@ -0,0 +1,150 @@
+"""
+Company Rejection Store
+Duplicate-safe inserts into rejected_modules backed by the (company_id, serial_number) unique key
+"""
+import pandas as pd
+from app.models.database import RejectedModule
+
+INSERT_CHUNK_SIZE = 5000
+
+
+def insert_ignore(table, bind):
+    """
+    INSERT that skips rows hitting a unique key
+
+    INSERT IGNORE on MySQL, INSERT OR IGNORE on SQLite.
+    """
+    stmt = table.insert()
+    dialect = bind.dialect.name
+    if dialect == 'mysql':
+        return stmt.prefix_with('IGNORE')
+    if dialect == 'sqlite':
+        return stmt.prefix_with('OR IGNORE')
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert(table).on_conflict_do_nothing()
+    return stmt
+
+
+def insert_rejections(session, rows, chunk_size=INSERT_CHUNK_SIZE):
+    """
+    Insert rejected_modules rows, skipping serials the company already has
+
+    The database decides what is a duplicate (uq_company_serial), so existing
+    serials are never loaded into Python. Duplicates within rows are skipped too.
+    Rows go out as one executemany per chunk (multi-row VALUES on PyMySQL).
+
+    Args:
+        session: SQLAlchemy session (caller commits)
+        rows: List of column dicts (company_id, serial_number, rejection_date, ...)
+        chunk_size: Rows per executemany
+
+    Returns:
+        tuple: (added, skipped)
+    """
+    if not rows:
+        return 0, 0
+    stmt = insert_ignore(RejectedModule.__table__, session.get_bind())
+    added = 0
+    for start in range(0, len(rows), chunk_size):
+        result = session.execute(stmt, rows[start:start + chunk_size])
+        added += max(result.rowcount, 0)
+    return added, len(rows) - added
+
+
+# Upload JSON keys -> (column, default); a tuple of keys takes the first non-empty one
+UPLOAD_FIELDS = (
+    ('serialNumber', 'serial_number', ''),
+    ('rejectionDate', 'rejection_date', None),
+    ('reason', 'reason', ''),
+    ('stage', 'stage', 'Visual Inspection'),
+    ('defectType', 'defect_type', 'Minor'),
+)
+
+# Same columns under the snake_case keys of /api/rejections/bulk
+SNAKE_UPLOAD_FIELDS = (
+    ('serial_number', 'serial_number', ''),
+    ('rejection_date', 'rejection_date', None),
+    (('rejection_reason', 'reason'), 'reason', ''),
+    ('stage', 'stage', 'Not Specified'),
+    ('defect_type', 'defect_type', 'Minor'),
+)
+
+
+def _field_keys(key):
+    return key if isinstance(key, tuple) else (key,)
+
+
+def _field_values(frame, key):
+    keys = _field_keys(key)
+    values = frame[keys[0]]
+    for fallback in keys[1:]:
+        values = values.where(values.notna() & (values != ''), frame[fallback])
+    return values
+
+
+def parse_rejection_chunk(company_id, items, fields=UPLOAD_FIELDS):
+    """
+    Upload dicts -> insert rows, with dates parsed in one vectorized call
+
+    Rows without a serial or with an unparseable date are dropped.
+
+    Args:
+        company_id: Company id
+        items: Upload dicts
+        fields: (key, column, default) per column - serial and date first
+
+    Returns:
+        tuple: (rows, invalid_count)
+    """
+    # object dtype: numeric serials stay '12345' even when some rows lack one (no float upcast)
+    frame = pd.DataFrame(items, columns=[k for key, _, _ in fields for k in _field_keys(key)], dtype=object)
+    serials = _field_values(frame, fields[0][0]).fillna('').astype(str).str.strip()
+    dates = pd.to_datetime(_field_values(frame, fields[1][0]).astype(str).str[:10], format='%Y-%m-%d', errors='coerce')
+    valid = (serials != '') & dates.notna()
+
+    columns = {
+        'serial_number': serials[valid],
+        'rejection_date': dates[valid].dt.date,
+    }
+    for key, column, default in fields[2:]:
+        columns[column] = _field_values(frame, key)[valid].fillna(default).astype(str)
+
+    names = list(columns)
+    rows = [
+        dict(zip(names, values), company_id=company_id)
+        for values in zip(*(columns[name].tolist() for name in names))
+    ]
+    return rows, int((~valid).sum())
+
+
+def ingest_rejections(session, company_id, items, chunk_size=INSERT_CHUNK_SIZE, fields=UPLOAD_FIELDS):
+    """
+    Chunked upload ingest - each chunk is parsed, inserted and committed on its own
+
+    Locks are held for one chunk at a time and only one chunk of insert rows
+    exists in memory. Rows committed before a failure stay committed.
+
+    Args:
+        session: SQLAlchemy session
+        company_id: Company id
+        items: Upload dicts (serialNumber, rejectionDate, reason, stage, defectType)
+        chunk_size: Rows per chunk / transaction
+        fields: Upload key mapping (UPLOAD_FIELDS or SNAKE_UPLOAD_FIELDS)
+
+    Yields:
+        dict: Running totals after each chunk (processed, total, added, skipped, invalid)
+    """
+    total = len(items)
+    progress = {'processed': 0, 'total': total, 'added': 0, 'skipped': 0, 'invalid': 0}
+    for start in range(0, total, chunk_size):
+        chunk = items[start:start + chunk_size]
+        rows, invalid = parse_rejection_chunk(company_id, chunk, fields)
+        added, skipped = insert_rejections(session, rows, chunk_size)
+        session.commit()
+
+        progress['processed'] += len(chunk)
+        progress['added'] += added
+        progress['skipped'] += skipped
+        progress['invalid'] += invalid
+        yield dict(progress)
@@ -0,0 +1,247 @@
+"""
+Report Render Cache
+Content-addressed cache of rendered PDF / Excel / ZIP bytes on local disk,
+keyed on a canonical hash of the render inputs, with LRU size-bounded eviction
+"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 2000
+
+# Stored file suffix (temp files being written use .tmp)
+ENTRY_SUFFIX = '.bin'
+
+# Bump when rendered output changes for a reason renderer_version() cannot see
+# (logo / image assets, fonts, ...)
+RENDERER_VERSION = 1
+
+# Modules whose source shapes the rendered bytes
+RENDERER_MODULES = (
+    'excel_generator.py',
+    'ipqc_batch.py',
+    'pdf_generator.py',
+    'pdf_styles.py',
+    'production_pdf_generator.py',
+    'rejection_details.py',
+    'render_service.py',
+)
+RENDER_LIBRARIES = ('reportlab', 'openpyxl')
+
+_renderer_version = None
+
+
+def _canonical(value):
+    """JSON fallback for dates and other non-JSON values in render inputs"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+def renderer_version():
+    """
+    Version of the rendering code, part of every cache key
+
+    Hash of RENDERER_VERSION, the renderer module sources and the ReportLab /
+    openpyxl versions, so a deploy that changes how reports look never serves
+    entries rendered by the previous code (the cache survives restarts).
+    """
+    global _renderer_version
+    if _renderer_version is None:
+        from importlib.metadata import PackageNotFoundError, version
+
+        digest = hashlib.sha256(str(RENDERER_VERSION).encode('utf-8'))
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in RENDERER_MODULES:
+            with open(os.path.join(here, name), 'rb') as f:
+                digest.update(name.encode('utf-8') + b'\0' + f.read())
+        for library in RENDER_LIBRARIES:
+            try:
+                digest.update(f'{library}=={version(library)}'.encode('utf-8'))
+            except PackageNotFoundError:
+                pass
+        _renderer_version = digest.hexdigest()[:16]
+    return _renderer_version
+
+
+def cache_key(kind, *inputs):
+    """
+    Canonical hash of a render (includes renderer_version())
+
+    Args:
+        kind: Renderer name (e.g. 'production_pdf'), so equal inputs of different outputs never collide
+        inputs: JSON-like render inputs (payload, report options, ...) - dict key order does not matter
+
+    Returns:
+        str: sha256 hex digest
+    """
+    payload = json.dumps([renderer_version(), kind, inputs], sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=_canonical)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """
+    Rendered reports in one folder, one file per key
+
+    Recency lives in an in-process OrderedDict (seeded from file mtimes on start,
+    hits touch the mtime) so eviction is O(1) and a restart keeps the LRU order.
+    Entries are written to a temp file and renamed, so readers never see a
+    partial file. max_bytes=0 disables the cache (every call renders).
+    """
+
+    def __init__(self, folder, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size, oldest first
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.enabled:
+            os.makedirs(folder, exist_ok=True)
+            self._load()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0 and self.max_entries > 0
+
+    def _path(self, key):
+        return os.path.join(self.folder, key + ENTRY_SUFFIX)
+
+    def _load(self):
+        """Index existing entries oldest-first and drop leftover temp files"""
+        found = []
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            if name.endswith('.tmp'):
+                os.remove(path)
+            elif name.endswith(ENTRY_SUFFIX):
+                stat = os.stat(path)
+                found.append((stat.st_mtime, name[:-len(ENTRY_SUFFIX)], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._bytes += size
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until both bounds hold (lock held)"""
+        while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def get(self, key):
+        """Cached bytes for key, or None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # Removed behind our back (another process evicted it / folder cleaned)
+            with self._lock:
+                self._bytes -= self._entries.pop(key, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """Store bytes under key (replacing an existing entry) and evict down to the bounds"""
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        tmp_path = os.path.join(self.folder, f'{key}.{uuid.uuid4().hex}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+        with self._lock:
+            self._bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+    def render(self, key, renderer):
+        """
+        Cached bytes for key, rendering and storing them on a miss
+
+        Args:
+            key: cache_key(...) of the render inputs
+            renderer: Callable returning the rendered bytes
+
+        Returns:
+            bytes: Rendered output
+        """
+        data = self.get(key)
+        if data is None:
+            data = renderer()
+            self.put(key, data)
+        return data
+
+    def clear(self):
+        """Remove every entry (metrics are kept)"""
+        with self._lock:
+            for key in self._entries:
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Hit / miss / size metrics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries,
+                'renderer_version': renderer_version(),
+            }
+
+
+_cache_lock = threading.Lock()
+
+
+def get_render_cache(app):
+    """Render cache of this app (created on first use from RENDER_CACHE_* config)"""
+    cache = app.extensions.get('render_cache')
+    if cache is None:
+        with _cache_lock:
+            cache = app.extensions.get('render_cache')
+            if cache is None:
+                folder = app.config.get('RENDER_CACHE_FOLDER') or os.path.join(app.root_path, '..', 'render_cache')
+                cache = RenderCache(
+                    folder,
+                    max_bytes=app.config.get('RENDER_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES),
+                    max_entries=app.config.get('RENDER_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)
+                )
+                app.extensions['render_cache'] = cache
+    return cache
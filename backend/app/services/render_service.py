@@ -0,0 +1,286 @@
+"""
+Report Rendering Service
+Runs the PDF / Excel generators on a bounded process pool so ReportLab and openpyxl
+work uses spare cores instead of holding the GIL on request threads, with per-job
+timeouts and admission control (too many queued renders -> 503 instead of a pile-up)
+"""
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+DEFAULT_TIMEOUT = 120  # seconds
+PENDING_PER_WORKER = 4  # default admission bound: queued + running jobs per worker
+
+
+def _mp_context():
+    """
+    forkserver where available, else spawn - never fork
+
+    The pool is created while Waitress request threads are running; a forked
+    worker would inherit their held locks and the open SQLAlchemy connections.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class RenderUnavailable(Exception):
+    """A render could not be served - status is the HTTP status to answer with"""
+    status = 503
+
+
+class RenderBusy(RenderUnavailable):
+    """Admission refused: the pool already has max_pending jobs"""
+    status = 503
+
+
+class RenderTimeout(RenderUnavailable):
+    """The job did not finish within its timeout"""
+    status = 504
+
+
+class RenderService:
+    """
+    Bounded ProcessPoolExecutor with admission control
+
+    At most max_pending jobs are admitted (queued + running). submit() refuses
+    further jobs with RenderBusy, or waits for a free slot with block=True
+    (streamed batches). A slot is released when its job actually finishes, so
+    a job abandoned after a timeout still counts until its worker is free.
+    A pool broken by a dead worker (killed, out of memory) is replaced on the
+    next submit. Workers are started with forkserver / spawn (see _mp_context).
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, timeout=DEFAULT_TIMEOUT):
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.max_pending = max_pending or self.max_workers * PENDING_PER_WORKER
+        self.timeout = timeout
+        self._slots = threading.Condition()
+        self._pending = 0
+        self._pool = None
+        self.submitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _get_pool(self):
+        with self._slots:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_mp_context())
+            return self._pool
+
+    def start(self):
+        """Create the pool and start its workers now (server startup) instead of on the first render"""
+        pool = self._get_pool()
+        for future in [pool.submit(os.getpid) for _ in range(self.max_workers)]:
+            future.result()
+
+    def _reset_pool(self, pool):
+        with self._slots:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, future):
+        with self._slots:
+            self._pending -= 1
+            self._slots.notify()
+
+    def submit(self, fn, *args, block=False):
+        """
+        Admit fn(*args) and queue it on the pool
+
+        fn and args are pickled to a worker process, so fn must be a module-level
+        function and args plain data (no generators, sessions or ORM objects).
+
+        Returns:
+            Future: Result of fn(*args)
+
+        Raises:
+            RenderBusy: No free slot and block is False
+        """
+        with self._slots:
+            if self._pending >= self.max_pending:
+                if not block:
+                    self.rejected += 1
+                    raise RenderBusy(f'Report rendering is busy ({self._pending} jobs queued), retry shortly')
+                while self._pending >= self.max_pending:
+                    self._slots.wait()
+            self._pending += 1
+            self.submitted += 1
+
+        try:
+            pool = self._get_pool()
+            try:
+                future = pool.submit(fn, *args)
+            except BrokenProcessPool:
+                self._reset_pool(pool)
+                future = self._get_pool().submit(fn, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def result(self, future, timeout=None):
+        """
+        Wait for a submitted job
+
+        Raises:
+            RenderTimeout: Not finished within timeout (the service default if None)
+        """
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            with self._slots:
+                self.timed_out += 1
+            raise RenderTimeout(f'Report rendering did not finish within {timeout:g}s')
+
+    def run(self, fn, *args, timeout=None):
+        """fn(*args) on the pool, waiting at most timeout seconds for the result"""
+        return self.result(self.submit(fn, *args), timeout)
+
+    def run_all(self, calls, timeout=None):
+        """
+        Run several (fn, *args) calls concurrently, all admitted or none
+
+        Returns:
+            list: Results in call order
+
+        Raises:
+            ValueError: More calls than max_pending (could never be admitted)
+            RenderBusy / RenderTimeout: The timeout covers the whole group
+        """
+        calls = list(calls)
+        if len(calls) > self.max_pending:
+            raise ValueError(f'At most {self.max_pending} renders per request')
+        futures = []
+        try:
+            for fn, *args in calls:
+                futures.append(self.submit(fn, *args))
+            deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+            return [self.result(future, max(0, deadline - time.monotonic())) for future in futures]
+        finally:
+            # Drops jobs that have not started when admission or a wait failed
+            for future in futures:
+                future.cancel()
+
+    def stats(self):
+        """Pool size, admission and timeout counters"""
+        with self._slots:
+            return {
+                'workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'pending': self._pending,
+                'timeout': self.timeout,
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+            }
+
+
+_service_lock = threading.Lock()
+
+
+def get_render_service(app):
+    """Render service of this app (created on first use from RENDER_* config)"""
+    service = app.extensions.get('render_service')
+    if service is None:
+        with _service_lock:
+            service = app.extensions.get('render_service')
+            if service is None:
+                service = RenderService(
+                    max_workers=app.config.get('RENDER_WORKERS'),
+                    max_pending=app.config.get('RENDER_MAX_PENDING'),
+                    timeout=app.config.get('RENDER_TIMEOUT', DEFAULT_TIMEOUT)
+                )
+                app.extensions['render_service'] = service
+    return service
+
+
+def render_unavailable_response(error):
+    """JSON error response for RenderBusy (503 + Retry-After) / RenderTimeout (504)"""
+    from flask import jsonify
+
+    response = jsonify({'error': str(error)})
+    response.status_code = error.status
+    if isinstance(error, RenderBusy):
+        response.headers['Retry-After'] = '5'
+    return response
+
+
+# ========== Workers (run in the pool processes) ==========
+
+_worker_engines = {}
+
+
+def iter_source_rejections(source):
+    """
+    Rejections of a report range, queried inside the worker process
+
+    The rows stream from the database in batches, so the full rejection set is
+    held by neither the request thread nor the worker.
+
+    Args:
+        source: {'database_uri', 'company_id', 'start', 'end'} (dates inclusive)
+
+    Yields:
+        dict: rejected_modules entries (production_report_data.iter_rejected_modules)
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.services.production_report_data import iter_rejected_modules
+
+    engine = _worker_engines.get(source['database_uri'])
+    if engine is None:
+        engine = _worker_engines[source['database_uri']] = create_engine(source['database_uri'], pool_pre_ping=True)
+    with Session(engine) as session:
+        yield from iter_rejected_modules(session, source['company_id'], source['start'], source['end'])
+
+
+def render_production_pdf_bytes(report_data, rejection_source=None):
+    """
+    Worker: production report PDF
+
+    rejected_modules is either a list in report_data or, with rejection_source,
+    queried here (generators do not pickle).
+    """
+    from app.services.production_pdf_generator import ProductionPDFGenerator
+
+    if rejection_source:
+        report_data = dict(report_data, rejected_modules=iter_source_rejections(rejection_source))
+    return ProductionPDFGenerator().generate_production_report(report_data, 'production_report.pdf').getvalue()
+
+
+def render_production_excel_bytes(args, rejection_source=None):
+    """
+    Worker: production report workbook from generate_production_excel's positional arguments
+
+    With rejection_source the rejections (args[2]) are queried here.
+    """
+    from app.services.excel_generator import generate_production_excel
+    from app.services.production_report_data import iter_excel_rejections
+
+    if rejection_source:
+        args = args[:2] + (iter_excel_rejections(iter_source_rejections(rejection_source)),) + args[3:]
+    buffer = io.BytesIO()
+    generate_production_excel(*args, output_path=buffer)
+    return buffer.getvalue()
+
+
+def render_peel_test_pdf(data):
+    """Worker: peel test PDF written to generated_pdfs, returns its absolute path"""
+    from app.services.peel_test_pdf_generator import generate_peel_test_pdf
+
+    return os.path.abspath(generate_peel_test_pdf(data))
+
+
+def render_peel_test_excel(line_number, date, output_folder, rng):
+    """Worker: peel test workbook of one line written to output_folder, returns its path"""
+    from app.services.peel_test_excel_generator import generate_peel_test_excel
+
+    return generate_peel_test_excel(line_number, date, output_folder, rng)
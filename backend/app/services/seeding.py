@@ -0,0 +1,33 @@
+"""
+Seeded Generation
+Per-document random.Random instances for the report generators - reproducible when
+seeded from the document key (customer, date, shift, line), and never shared between threads
+"""
+import hashlib
+import random
+
+
+def seeded_rng(*key):
+    """
+    random.Random seeded from key parts - the same key always gives the same sequence
+
+    The seed is a sha256 of the parts, so it does not depend on PYTHONHASHSEED
+    or the process.
+    """
+    material = '|'.join('' if part is None else str(part) for part in key)
+    return random.Random(int.from_bytes(hashlib.sha256(material.encode('utf-8')).digest()[:8], 'big'))
+
+
+def document_rng(seeded, *key):
+    """seeded_rng(*key) in seeded mode, otherwise an independently (OS-)seeded random.Random"""
+    return seeded_rng(*key) if seeded else random.Random()
+
+
+def seeded_mode(data, config):
+    """Request 'seeded' flag, defaulting to the SEEDED_GENERATION setting"""
+    value = data.get('seeded')
+    if value is None:
+        return config.get('SEEDED_GENERATION', False)
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(value)
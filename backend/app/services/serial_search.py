@@ -0,0 +1,183 @@
+"""
+Serial Number Search
+Index-backed prefix / suffix / substring matching of master_modules serials
+"""
+import re
+from flask import current_app, has_app_context
+from sqlalchemy import delete, exists, func, or_, select
+from app.models.master_data import MasterModule, MasterSerialNgram
+
+NGRAM_SIZE = 3
+
+MATCH_MODES = ('auto', 'prefix', 'suffix', 'contains')
+
+LIKE_ESCAPE = '/'
+
+# Stem + trailing counter digits (max 18 so the counter fits a BIGINT)
+SERIAL_PATTERN = r'^(.*?)(\d{1,18})$'
+_SERIAL_RE = re.compile(SERIAL_PATTERN)
+
+
+def reverse_serial(serial):
+    return serial[::-1] if serial else serial
+
+
+def parse_serial(serial):
+    """
+    Split a serial into (stem, counter), e.g. GS04890TG3002500001 -> ('GS04890TG', 3002500001)
+
+    The stem keeps any digits before the counter, unlike MasterOrder.serial_prefix
+    (which strips every digit).
+
+    Returns:
+        tuple: (stem, counter), counter is None when the serial has no trailing digits
+    """
+    match = _SERIAL_RE.match((serial or '').strip())
+    if not match:
+        return serial, None
+    return match.group(1), int(match.group(2))
+
+
+def serial_ngrams(serial):
+    """Distinct upper-cased trigrams of a serial"""
+    serial = (serial or '').upper()
+    return {serial[i:i + NGRAM_SIZE] for i in range(len(serial) - NGRAM_SIZE + 1)}
+
+
+def ngram_index_enabled():
+    return has_app_context() and bool(current_app.config.get('SERIAL_NGRAM_INDEX'))
+
+
+def _escape_like(value):
+    """Escape LIKE wildcards ('/' avoids backslash quoting differences between MySQL and SQLite)"""
+    return value.replace('/', '//').replace('%', '/%').replace('_', '/_')
+
+
+def index_module_ngrams(session, order_id, modules):
+    """
+    Add trigram rows for modules
+
+    Args:
+        session: SQLAlchemy session (caller commits)
+        order_id: MasterOrder id
+        modules: Iterable of (module_id, serial_number)
+    """
+    rows = [
+        {'order_id': order_id, 'gram': gram, 'module_id': module_id}
+        for module_id, serial in modules
+        for gram in serial_ngrams(serial)
+    ]
+    if rows:
+        session.execute(MasterSerialNgram.__table__.insert(), rows)
+
+
+def index_order_ngrams(session, order_id, first_sequence, last_sequence):
+    """Trigram rows for modules of an order inserted within a sequence range"""
+    modules = session.execute(
+        select(MasterModule.id, MasterModule.serial_number).where(
+            MasterModule.order_id == order_id,
+            MasterModule.sequence_number.between(first_sequence, last_sequence)
+        )
+    ).all()
+    index_module_ngrams(session, order_id, modules)
+
+
+def remove_ngrams(session, order_id, module_ids=None):
+    """Delete trigram rows of an order (or only of the given modules), no-op when the index is off"""
+    if not ngram_index_enabled():
+        return
+    stmt = delete(MasterSerialNgram).where(MasterSerialNgram.order_id == order_id)
+    if module_ids is not None:
+        stmt = stmt.where(MasterSerialNgram.module_id.in_(list(module_ids)))
+    session.execute(stmt)
+
+
+def resolve_match_mode(match='auto'):
+    """
+    Resolve the requested match mode
+
+    auto keeps substring semantics (trigram candidates when the index is
+    enabled, otherwise the plain LIKE scan). The anchored prefix / suffix
+    modes only run when the caller asks for them.
+    """
+    if match != 'auto':
+        return match
+    return 'contains'
+
+
+def search_criteria(order_id, search, match='auto'):
+    """
+    WHERE clauses for a serial search within one order
+
+    prefix  -> serial_number LIKE 'term%'            (idx_order_serial)
+    suffix  -> serial_reversed LIKE 'mret%'          (idx_order_serial_reversed)
+    contains -> trigram candidates + LIKE '%term%'   (master_serial_ngrams)
+
+    Orders without trigram rows (ingested before SERIAL_NGRAM_INDEX was turned
+    on and not rebuilt with add_serial_search_fields.py --ngrams) fall back to
+    the plain LIKE scan instead of matching nothing.
+
+    Args:
+        order_id: MasterOrder id
+        search: Search term
+        match: One of MATCH_MODES
+
+    Returns:
+        tuple: (criteria list, match mode used)
+
+    Raises:
+        ValueError: On an unknown match mode
+    """
+    if match not in MATCH_MODES:
+        raise ValueError(f"match must be one of: {', '.join(MATCH_MODES)}")
+
+    mode = resolve_match_mode(match)
+    escaped = _escape_like(search)
+
+    if mode == 'prefix':
+        return [MasterModule.serial_number.like(f'{escaped}%', escape=LIKE_ESCAPE)], mode
+
+    if mode == 'suffix':
+        return [MasterModule.serial_reversed.like(f'{_escape_like(reverse_serial(search))}%', escape=LIKE_ESCAPE)], mode
+
+    criteria = [MasterModule.serial_number.like(f'%{escaped}%', escape=LIKE_ESCAPE)]
+    grams = serial_ngrams(search)
+    if ngram_index_enabled() and grams:
+        # Modules having every trigram of the term; LIKE above removes false positives
+        candidates = (
+            select(MasterSerialNgram.module_id)
+            .where(MasterSerialNgram.order_id == order_id, MasterSerialNgram.gram.in_(sorted(grams)))
+            .group_by(MasterSerialNgram.module_id)
+            .having(func.count(MasterSerialNgram.gram) == len(grams))
+        )
+        # The uncorrelated EXISTS is evaluated once per query
+        order_indexed = exists().where(MasterSerialNgram.order_id == order_id)
+        criteria.append(or_(~order_indexed, MasterModule.id.in_(candidates)))
+    return criteria, mode
+
+
+def serial_range_criteria(start_serial, end_serial=None):
+    """
+    WHERE clauses + ORDER BY for "serials from start (to end)" within an order
+
+    When the serials parse to the same stem the comparison runs on the
+    numeric serial_counter (idx_order_available_counter range scan, and no
+    string-ordering surprises when the counter gains a digit). Otherwise it
+    falls back to comparing serial_number strings.
+
+    Returns:
+        tuple: (criteria list, order_by column)
+    """
+    start_stem, start_counter = parse_serial(start_serial)
+    end_stem, end_counter = parse_serial(end_serial) if end_serial else (start_stem, None)
+
+    if start_counter is not None and end_stem == start_stem and (end_serial is None or end_counter is not None):
+        criteria = [MasterModule.serial_stem == start_stem, MasterModule.serial_counter >= start_counter]
+        if end_serial:
+            criteria.append(MasterModule.serial_counter <= end_counter)
+        return criteria, MasterModule.serial_counter
+
+    criteria = [MasterModule.serial_number >= start_serial]
+    if end_serial:
+        criteria.append(MasterModule.serial_number <= end_serial)
+    return criteria, MasterModule.serial_number
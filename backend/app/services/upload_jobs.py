@@ -0,0 +1,269 @@
+"""
+Upload Job Queue
+Runs long uploads on a worker pool and tracks their progress in a local SQLite table
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+# Finished jobs older than this are pruned when a new job is created
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+
+DEFAULT_JOBS_DB = os.path.join(tempfile.gettempdir(), 'pdi_upload_jobs.sqlite3')
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when a cancel was requested"""
+
+
+class JobFailed(Exception):
+    """Raised by a job for an expected failure (message is shown to the user)"""
+
+
+class UploadJobStore:
+    """
+    Job table in a local SQLite file
+
+    SQLite is used so every server thread and process (waitress, passenger)
+    sees the same progress and cancel flags without extra infrastructure.
+    """
+
+    def __init__(self, path=DEFAULT_JOBS_DB):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS upload_jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    message TEXT,
+                    processed INTEGER NOT NULL DEFAULT 0,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    order_id INTEGER,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    updated_at REAL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_upload_jobs_order ON upload_jobs (order_id)')
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection, committed on success and always closed"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, kind, message='Queued'):
+        """Insert a new queued job and return its id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'DELETE FROM upload_jobs WHERE finished_at IS NOT NULL AND finished_at < ?',
+                (now - JOB_RETENTION_SECONDS,)
+            )
+            conn.execute(
+                'INSERT INTO upload_jobs (id, kind, state, message, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, kind, QUEUED, message, now, now)
+            )
+        return job_id
+
+    def update(self, job_id, **fields):
+        """Set columns on a job (result is JSON encoded)"""
+        if 'result' in fields and fields['result'] is not None:
+            fields['result'] = json.dumps(fields['result'])
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        with self._connect() as conn:
+            conn.execute(
+                f'UPDATE upload_jobs SET {assignments} WHERE id = ?',
+                (*fields.values(), job_id)
+            )
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM upload_jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._to_dict(row)
+
+    def latest_for_order(self, order_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT * FROM upload_jobs WHERE order_id = ? ORDER BY created_at DESC LIMIT 1',
+                (order_id,)
+            ).fetchone()
+        return self._to_dict(row)
+
+    def request_cancel(self, job_id):
+        """
+        Flag a job for cancellation
+
+        The job stops at its next progress checkpoint (a queued job at its
+        first one).
+
+        Returns:
+            bool: False if the job does not exist or already finished
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f'UPDATE upload_jobs SET cancel_requested = 1, updated_at = ? '
+                f'WHERE id = ? AND state NOT IN ({",".join("?" * len(FINISHED_STATES))})',
+                (now, job_id, *FINISHED_STATES)
+            )
+            return cursor.rowcount > 0
+
+    def is_cancel_requested(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute('SELECT cancel_requested FROM upload_jobs WHERE id = ?', (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        return job
+
+
+def job_status(job):
+    """
+    Public progress payload for a job: percent, throughput and ETA
+
+    Keeps the current/total/status/percent keys of the old progress file.
+    """
+    processed = job['processed'] or 0
+    total = job['total'] or 0
+    state = job['state']
+    end = job['finished_at'] or time.time()
+    elapsed = end - job['started_at'] if job['started_at'] else 0.0
+
+    rows_per_sec = processed / elapsed if elapsed > 0 else 0.0
+    eta_seconds = None
+    if state == RUNNING and rows_per_sec > 0 and total > processed:
+        eta_seconds = round((total - processed) / rows_per_sec, 1)
+
+    if state == COMPLETED:
+        percent = 100
+    else:
+        percent = min(int(processed / total * 100), 99) if total > 0 else 0
+
+    return {
+        'job_id': job['id'],
+        'state': state,
+        'status': job['message'] or state,
+        'current': processed,
+        'total': total,
+        'percent': percent,
+        'rows_per_sec': round(rows_per_sec, 1),
+        'elapsed_seconds': round(elapsed, 1),
+        'eta_seconds': eta_seconds,
+        'order_id': job['order_id'],
+        'cancel_requested': job['cancel_requested'],
+        'result': job['result'],
+        'error': job['error']
+    }
+
+
+class JobProgress:
+    """
+    Progress reporter handed to a job function
+
+    Calling it records progress and raises JobCancelled once a cancel was
+    requested, so jobs stop at their next checkpoint.
+    """
+
+    def __init__(self, store, job_id):
+        self.store = store
+        self.job_id = job_id
+
+    def __call__(self, processed, total=None, message=None, order_id=None):
+        fields = {'processed': processed}
+        if total is not None:
+            fields['total'] = total
+        if message is not None:
+            fields['message'] = message
+        if order_id is not None:
+            fields['order_id'] = order_id
+        self.store.update(self.job_id, **fields)
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        if self.store.is_cancel_requested(self.job_id):
+            raise JobCancelled('Upload cancelled')
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(max_workers=2):
+    """Process-wide worker pool (created on first use)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='upload-job')
+        return _executor
+
+
+def run_job(app, store, job_id, fn, *args, **kwargs):
+    """
+    Run fn(progress, *args, **kwargs) inside an app context and record the outcome
+
+    fn returns a JSON-serializable result dict. Its session is removed afterwards
+    so worker threads never leak connections.
+    """
+    from app.models.database import db
+
+    store.update(job_id, state=RUNNING, started_at=time.time(), message='Starting processing...')
+    progress = JobProgress(store, job_id)
+
+    with app.app_context():
+        try:
+            result = fn(progress, *args, **kwargs)
+            store.update(job_id, state=COMPLETED, message='Complete!', result=result, finished_at=time.time())
+        except JobCancelled as e:
+            store.update(job_id, state=CANCELLED, message=str(e), finished_at=time.time())
+        except JobFailed as e:
+            store.update(job_id, state=FAILED, message=str(e), error=str(e), finished_at=time.time())
+        except Exception as e:
+            print(f"❌ Upload job {job_id} failed: {e}")
+            traceback.print_exc()
+            store.update(job_id, state=FAILED, message='Failed', error=str(e), finished_at=time.time())
+        finally:
+            db.session.remove()
+
+    return store.get(job_id)
+
+
+def submit_job(app, store, job_id, fn, *args, max_workers=2, **kwargs):
+    """Queue run_job on the worker pool and return immediately"""
+    return get_executor(max_workers).submit(run_job, app, store, job_id, fn, *args, **kwargs)
@@ -0,0 +1,132 @@
+"""
+Benchmark master data ingest: legacy per-row ORM path vs columnar Core insert
+Run: python benchmark_master_ingest.py --rows 100000 [--database-url mysql+pymysql://...]
+
+Uses an in-memory SQLite database by default so it can run anywhere.
+Point --database-url at a scratch MySQL database for production-like numbers.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+
+from app.models.database import db
+from app.models.master_data import MasterOrder, MasterModule
+from app.services.master_ingest import ingest_dataframe, FTR_FLOAT_COLUMNS
+
+
+def make_ftr_dataframe(rows):
+    """Build a synthetic RFID FTR sheet with realistic column types"""
+    rng = np.random.default_rng(42)
+    data = {
+        'Date': pd.Timestamp('2025-11-28') + pd.to_timedelta(rng.integers(0, 86400, rows), unit='s'),
+        'ID': [f'GS04890TG30025{i:05d}' for i in range(1, rows + 1)],
+    }
+    for excel_col in FTR_FLOAT_COLUMNS:
+        data[excel_col] = rng.normal(100, 5, rows).round(3)
+    data['Class'] = rng.choice(['A', 'B'], rows)
+    data['Binning'] = rng.choice(['625W', '630W', '635W'], rows)
+    df = pd.DataFrame(data)
+    # Sprinkle blanks the way real RFID exports have them
+    df.loc[df.sample(frac=0.01, random_state=1).index, 'Rsh'] = np.nan
+    return df
+
+
+def legacy_ingest(session, df, order_id, batch_size=5000):
+    """Previous upload_excel_data loop: one ORM object per row via iterrows"""
+    modules_batch = []
+    for idx, row in df.iterrows():
+        serial = str(row['ID']).strip() if pd.notna(row['ID']) else ''
+        if not serial:
+            continue
+        module = MasterModule(
+            order_id=order_id,
+            serial_number=serial,
+            sequence_number=idx + 1,
+            is_rejected=False,
+            date=str(row.get('Date', '')) if pd.notna(row.get('Date')) else None,
+            pmax=float(row['Pmax']) if pd.notna(row.get('Pmax')) else None,
+            isc=float(row['Isc']) if pd.notna(row.get('Isc')) else None,
+            voc=float(row['Voc']) if pd.notna(row.get('Voc')) else None,
+            ipm=float(row['Ipm']) if pd.notna(row.get('Ipm')) else None,
+            vpm=float(row['Vpm']) if pd.notna(row.get('Vpm')) else None,
+            ff=float(row['FF']) if pd.notna(row.get('FF')) else None,
+            rs=float(row['Rs']) if pd.notna(row.get('Rs')) else None,
+            rsh=float(row['Rsh']) if pd.notna(row.get('Rsh')) else None,
+            eff=float(row['Eff']) if pd.notna(row.get('Eff')) else None,
+            t_object=float(row['T_Object']) if pd.notna(row.get('T_Object')) else None,
+            t_target=float(row['T_Target']) if pd.notna(row.get('T_Target')) else None,
+            irr_target=float(row['Irr_Target']) if pd.notna(row.get('Irr_Target')) else None,
+            class_grade=str(row.get('Class', '')) if pd.notna(row.get('Class')) else None,
+            sweep_time=float(row['Sweep_Time']) if pd.notna(row.get('Sweep_Time')) else None,
+            irr_monitor=float(row['Irr_Monitor']) if pd.notna(row.get('Irr_Monitor')) else None,
+            isc_monitor=float(row['Isc_Monitor']) if pd.notna(row.get('Isc_Monitor')) else None,
+            t_monitor=float(row['T_Monitor']) if pd.notna(row.get('T_Monitor')) else None,
+            cell_temp=float(row['Cell_Temp']) if pd.notna(row.get('Cell_Temp')) else None,
+            t_ambient=float(row['T_Ambient']) if pd.notna(row.get('T_Ambient')) else None,
+            binning=str(row.get('Binning', '')) if pd.notna(row.get('Binning')) else None
+        )
+        modules_batch.append(module)
+        if len(modules_batch) >= batch_size:
+            db.session.bulk_save_objects(modules_batch)
+            db.session.commit()
+            modules_batch = []
+    if modules_batch:
+        db.session.bulk_save_objects(modules_batch)
+    db.session.commit()
+    return len(df)
+
+
+def run_case(name, ingest_fn, df):
+    order = MasterOrder(
+        company_name='Benchmark',
+        order_number=f'BENCH-{name}-{time.time_ns()}',
+        total_modules=len(df),
+        serial_prefix='GSTG',
+        rejection_percentage=0.0
+    )
+    db.session.add(order)
+    db.session.commit()
+
+    start = time.perf_counter()
+    ingest_fn(db.session, df, order.id)
+    elapsed = time.perf_counter() - start
+
+    inserted = MasterModule.query.filter_by(order_id=order.id).count()
+    MasterModule.query.filter_by(order_id=order.id).delete()
+    db.session.delete(order)
+    db.session.commit()
+
+    print(f"{name:<10} {inserted:>9,} rows  {elapsed:8.2f}s  {inserted / elapsed:>10,.0f} rows/sec")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--database-url', default='sqlite://')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = args.database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        df = make_ftr_dataframe(args.rows)
+
+        print("=" * 60)
+        print(f"Master ingest benchmark - {args.rows:,} rows on {db.engine.dialect.name}")
+        print("=" * 60)
+        legacy = run_case('legacy', legacy_ingest, df)
+        columnar = run_case('columnar', ingest_dataframe, df)
+        print("-" * 60)
+        print(f"Speedup: {legacy / columnar:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark the production report Excel: per-cell styled workbook vs write-only NamedStyle engine
+Run: python benchmark_production_excel.py --rejections 50000
+
+"before" is excel_generator.py as it was before the write-only engine, loaded from
+git (--baseline REV, default: the parent of the commit that introduced it).
+"after" is the current module. Both render the same report into memory.
+"""
+
+import argparse
+import io
+import os
+import random
+import subprocess
+import time
+import types
+
+import openpyxl
+
+from app.services import excel_generator
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODULE_PATH = 'app/services/excel_generator.py'
+
+
+def git(*args):
+    return subprocess.run(['git', *args], cwd=HERE, check=True, capture_output=True, text=True).stdout
+
+
+def default_baseline():
+    """Parent of the commit that switched the production report to Workbook(write_only=True)"""
+    commits = git('log', '--format=%H', '-S', 'Workbook(write_only=True)', '--', MODULE_PATH).split()
+    if not commits:
+        raise SystemExit('❌ No write-only engine commit found - pass --baseline')
+    return f'{commits[-1]}^'
+
+
+def load_baseline(rev):
+    """excel_generator module at git revision rev"""
+    module = types.ModuleType('excel_generator_baseline')
+    module.__file__ = excel_generator.__file__
+    exec(compile(git('show', f'{rev}:./{MODULE_PATH}'), f'{rev}:{MODULE_PATH}', 'exec'), module.__dict__)
+    return module
+
+
+def sample_report(days, rejections, seed=1):
+    """generate_production_excel arguments for a month of production and `rejections` rejections"""
+    rng = random.Random(seed)
+    production_data = []
+    for day in range(days):
+        day_prod, night_prod = rng.randint(200, 600), rng.randint(200, 600)
+        production_data.append({
+            'date': f'2025-01-{day % 28 + 1:02d}',
+            'day_of_week': 'Monday',
+            'day_production': day_prod,
+            'night_production': night_prod,
+            'cell_rejection_percent': rng.uniform(0, 0.02),
+            'module_rejection_percent': rng.uniform(0, 0.03),
+            'cells_rejected': rng.randint(0, 200),
+            'modules_rejected': rng.randint(0, 30),
+        })
+    rows = [{
+        'no': no,
+        'date': f'2025-01-{no % 28 + 1:02d}',
+        'serial': f'GS04875KG{no:010d}',
+        'reason': rng.choice(['Cell crack', 'Ribbon misalignment', 'EL dark cell', 'Bubble']),
+        'stage': rng.choice(['Stringer', 'Lay-up', 'EL', 'Laminator', 'Final QC']),
+        'defect_type': rng.choice(['Major', 'Minor']),
+        'remarks': '',
+    } for no in range(1, rejections + 1)]
+    company = {'name': 'Benchmark', 'address': 'N/A', 'contact': 'N/A',
+               'module_wattage': 545, 'module_type': 'Mono PERC', 'cells_per_module': 132}
+    return company, production_data, rows
+
+
+def time_render(module, company, production_data, rejections):
+    """(seconds, bytes) of one report rendered into memory"""
+    buffer = io.BytesIO()
+    start = time.perf_counter()
+    module.generate_production_excel(company, production_data, iter(rejections), '2025-01-01', '2025-01-31',
+                                     cells_received_qty=5, output_path=buffer)
+    return time.perf_counter() - start, len(buffer.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rejections', type=int, default=50000)
+    parser.add_argument('--days', type=int, default=31)
+    parser.add_argument('--baseline', help='git revision of the old engine')
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline or default_baseline())
+    company, production_data, rejections = sample_report(args.days, args.rejections)
+    print(f"📋 {args.days} production days, {args.rejections:,} rejections "
+          f"(XML writer: {'lxml' if openpyxl.LXML else 'et_xmlfile'})")
+
+    before, before_size = time_render(baseline, company, production_data, rejections)
+    after, after_size = time_render(excel_generator, company, production_data, rejections)
+
+    print(f"   per-cell styles (before) : {before:8.2f} s  {before_size / 1024:8.0f} KB")
+    print(f"   write-only named (after) : {after:8.2f} s  {after_size / 1024:8.0f} KB")
+    print(f"✅ Speedup: {before / after:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -27,6 +27,32 @@ class Config:
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
     GENERATED_PDF_FOLDER = os.getenv('GENERATED_PDF_FOLDER', 'generated_pdfs')
     
+    # Background upload jobs (master data Excel ingest)
+    UPLOAD_WORKERS = int(os.getenv('UPLOAD_WORKERS', 2))
+    UPLOAD_JOBS_DB = os.getenv('UPLOAD_JOBS_DB')  # SQLite job table, defaults to system temp dir
+    
+    # Report rendering process pool for every PDF / Excel generator (defaults to one worker
+    # per CPU, IPQC_BATCH_WORKERS is still honoured). Renders beyond RENDER_MAX_PENDING
+    # queued + running jobs get a 503 (default 4 per worker), RENDER_TIMEOUT is per job (seconds)
+    RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', os.getenv('IPQC_BATCH_WORKERS', 0))) or None
+    RENDER_MAX_PENDING = int(os.getenv('RENDER_MAX_PENDING', 0)) or None
+    RENDER_TIMEOUT = float(os.getenv('RENDER_TIMEOUT', 120))
+    
+    # IPQC batch generation (packs run on the render pool)
+    IPQC_BATCH_MAX_SPECS = int(os.getenv('IPQC_BATCH_MAX_SPECS', 200))
+    
+    # Reproducible IPQC / peel test values (opt-in): seeded from the document key
+    # (customer, date, shift, line, serial range, PO) when on or when a request sends "seeded": true
+    SEEDED_GENERATION = os.getenv('SEEDED_GENERATION', 'False').lower() == 'true'
+    
+    # Render cache for generated reports (LRU on disk next to generated_pdfs, 0 bytes disables)
+    RENDER_CACHE_FOLDER = os.getenv('RENDER_CACHE_FOLDER')  # defaults to backend/render_cache
+    RENDER_CACHE_MAX_BYTES = int(os.getenv('RENDER_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    RENDER_CACHE_MAX_ENTRIES = int(os.getenv('RENDER_CACHE_MAX_ENTRIES', 2000))
+    
+    # Serial substring search via trigram table (~17 rows per module, enable for large orders)
+    SERIAL_NGRAM_INDEX = os.getenv('SERIAL_NGRAM_INDEX', 'False').lower() == 'true'
+    
     # CORS Configuration
     FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
     
@@ -1,11 +1,11 @@
 """
 Create Master Data Tables
-Run this script to create master_orders, master_modules, and daily_production tables
+Run this script to create master_orders, master_modules, master_order_stats and daily_production tables
 """
 
 from app import create_app
 from app.models.database import db
-from app.models.master_data import MasterOrder, MasterModule, DailyProduction
+from app.models.master_data import MasterOrder, MasterModule, MasterOrderStats, DailyProduction
 
 def create_tables():
     app = create_app()
@@ -27,6 +27,8 @@ def create_tables():
             print("✅ master_orders table created")
         if 'master_modules' in tables:
             print("✅ master_modules table created")
+        if 'master_order_stats' in tables:
+            print("✅ master_order_stats table created")
         if 'daily_production' in tables:
             print("✅ daily_production table created")
 
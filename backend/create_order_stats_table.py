@@ -0,0 +1,51 @@
+"""
+Create and backfill the master_order_stats counters table
+Run this script once after deploying, or any time to rebuild the counters from master_modules
+(the daily production allocation cursor is kept and derived on the next booking if empty)
+"""
+
+from app import create_app
+from app.models.database import db
+from app.models.master_data import MasterOrder, MasterOrderStats
+from app.services.order_stats import recompute_order_stats
+from sqlalchemy import text
+
+def create_order_stats_table():
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            print("Creating master_order_stats table...")
+            MasterOrderStats.__table__.create(db.engine, checkfirst=True)
+            print("✅ master_order_stats table ready")
+            
+            # Tables created before the daily production allocator lack its cursor column
+            columns = [column['name'] for column in db.inspect(db.engine).get_columns('master_order_stats')]
+            if 'allocated_sequence' not in columns:
+                print("Adding allocated_sequence column...")
+                db.session.execute(text("""
+                    ALTER TABLE master_order_stats 
+                    ADD COLUMN allocated_sequence INT NULL
+                """))
+                db.session.commit()
+                print("✅ allocated_sequence column added")
+            
+            order_ids = [order_id for (order_id,) in db.session.query(MasterOrder.id).all()]
+            print(f"Rebuilding counters for {len(order_ids)} orders (one grouped query)...")
+            stats = recompute_order_stats(db.session, order_ids)
+            db.session.commit()
+            
+            for order_id, row in stats.items():
+                print(f"   Order {order_id}: produced={row.produced_count}, "
+                      f"rejected={row.rejected_count}, delivered={row.delivered_count}")
+            
+            print("\n🎉 Order counters rebuilt successfully!")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error during migration: {str(e)}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == '__main__':
+    create_order_stats_table()
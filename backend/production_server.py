@@ -16,6 +16,12 @@ if __name__ == '__main__':
     print("Press CTRL+C to stop the server")
     print("=" * 60)
     
+    # Start the render workers before Waitress spawns its request threads
+    from app.services.render_service import get_render_service
+    service = get_render_service(app)
+    service.start()
+    print(f"✅ Render pool started ({service.max_workers} workers)")
+    
     # Waitress production server
     # threads=4 for handling multiple concurrent requests
     serve(app, host='0.0.0.0', port=5000, threads=4)
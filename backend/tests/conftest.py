@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models.database import db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    """Bare app on in-memory SQLite with every model table created"""
+    import app.models.master_data  # noqa: F401  (registers the master tables)
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SERIAL_NGRAM_INDEX'] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,50 @@
+from app.models.database import db
+from app.models.master_data import MasterModule, MasterOrder
+from app.services.serial_search import index_module_ngrams, reverse_serial, search_criteria
+
+SERIALS = ['GS04890TG3002500001', 'GS04890TG3002500002', 'GS04890TG3002600001']
+
+
+def _seed_order(index_ngrams=False):
+    order = MasterOrder(company_name='Test', order_number='PO-1', total_modules=len(SERIALS), serial_prefix='GSTG')
+    db.session.add(order)
+    db.session.flush()
+    modules = [
+        MasterModule(order_id=order.id, serial_number=serial, serial_reversed=reverse_serial(serial), sequence_number=i + 1)
+        for i, serial in enumerate(SERIALS)
+    ]
+    db.session.add_all(modules)
+    db.session.flush()
+    if index_ngrams:
+        index_module_ngrams(db.session, order.id, [(m.id, m.serial_number) for m in modules])
+    db.session.commit()
+    return order.id
+
+
+def _search(order_id, term, match='auto'):
+    criteria, mode = search_criteria(order_id, term, match)
+    serials = db.session.query(MasterModule.serial_number).filter(MasterModule.order_id == order_id, *criteria)
+    return sorted(serial for (serial,) in serials), mode
+
+
+def test_auto_matches_mid_serial_terms(app):
+    order_id = _seed_order()
+
+    assert _search(order_id, 'G3002') == (SERIALS, 'contains')
+    assert _search(order_id, '25000') == (SERIALS[:2], 'contains')
+
+
+def test_auto_matches_mid_serial_terms_with_ngram_index(app):
+    app.config['SERIAL_NGRAM_INDEX'] = True
+    order_id = _seed_order(index_ngrams=True)
+
+    assert _search(order_id, 'G3002') == (SERIALS, 'contains')
+    assert _search(order_id, '25000') == (SERIALS[:2], 'contains')
+
+
+def test_anchored_modes_only_when_requested(app):
+    order_id = _seed_order()
+
+    assert _search(order_id, 'G3002', 'prefix') == ([], 'prefix')
+    assert _search(order_id, 'GS04890TG30026', 'prefix') == (SERIALS[2:], 'prefix')
+    assert _search(order_id, '00002', 'suffix') == (SERIALS[1:2], 'suffix')
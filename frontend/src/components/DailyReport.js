@@ -4,6 +4,9 @@ import axios from 'axios';
 import { companyService } from '../services/apiService';
 import '../styles/DailyReport.css';
 
+// The company list is summary-only; the production view needs the records
+const COMPANY_DETAIL_PARAMS = { include: 'production_records,rejected_modules' };
+
 function DailyReport() {
   const [companies, setCompanies] = useState([]);
   const [loading, setLoading] = useState(false);
@@ -71,7 +74,7 @@ function DailyReport() {
   const refreshSelectedCompany = async () => {
     if (selectedCompany && selectedCompany.id) {
       try {
-        const updated = await companyService.getCompany(selectedCompany.id);
+        const updated = await companyService.getCompany(selectedCompany.id, COMPANY_DETAIL_PARAMS);
         setSelectedCompany(updated);
       } catch (error) {
         console.error('Failed to refresh company:', error);
@@ -123,7 +126,7 @@ function DailyReport() {
   const handleSelectCompany = async (company) => {
     try {
       setLoading(true);
-      const fullCompany = await companyService.getCompany(company.id);
+      const fullCompany = await companyService.getCompany(company.id, COMPANY_DETAIL_PARAMS);
       setSelectedCompany(fullCompany);
       setViewMode('production');
     } catch (error) {
@@ -421,10 +424,15 @@ function DailyReport() {
         }, 0);
 
         setLoading(true);
-        await companyService.bulkAddRejections(selectedCompany.id, rejections);
+        const result = await companyService.bulkAddRejections(selectedCompany.id, rejections);
         await refreshSelectedCompany();
         
-        let message = `✓ ${rejections.length} rejections uploaded successfully!\nDistributed across ${productionDates.length} production days based on rejection percentages.`;
+        const added = result?.added ?? rejections.length;
+        let message = `✓ ${added} rejections uploaded successfully!\nDistributed across ${productionDates.length} production days based on rejection percentages.`;
+        
+        if (result?.skipped) {
+          message += `\n\n⚠️ ${result.skipped} serial numbers were already rejected for this company and were skipped.`;
+        }
         
         if (unusedCount > 0) {
           message += `\n\n⚠️ Note: ${unusedCount} serial numbers were not used (Excel had ${serialNumbers.length} serials, but only ${totalExpectedRejections} rejections expected based on production %).`;
@@ -530,58 +538,11 @@ function DailyReport() {
     try {
       setLoading(true);
       
-      const filteredRecords = selectedCompany.productionRecords.filter(record => {
-        const recordDate = new Date(record.date);
-        const start = new Date(pdfDateRange.startDate);
-        const end = new Date(pdfDateRange.endDate);
-        return recordDate >= start && recordDate <= end;
-      });
-
-      const filteredRejections = selectedCompany.rejectedModules.filter(rej => {
-        const rejDate = new Date(rej.rejectionDate);
-        const start = new Date(pdfDateRange.startDate);
-        const end = new Date(pdfDateRange.endDate);
-        return rejDate >= start && rejDate <= end;
-      });
-
-      const sortedRejections = filteredRejections.sort((a, b) => {
-        const dateCompare = new Date(a.rejectionDate) - new Date(b.rejectionDate);
-        if (dateCompare !== 0) return dateCompare;
-        return a.serialNumber.localeCompare(b.serialNumber);
-      });
-
-      const totalProduction = filteredRecords.reduce((sum, r) => 
-        sum + (r.dayProduction || 0) + (r.nightProduction || 0), 0
-      );
-      
-      const totalMW = ((totalProduction * parseFloat(selectedCompany.moduleWattage)) / 1000000).toFixed(2);
-
+      // Records and rejections are read server-side for the selected range
       const payload = {
-        company_name: selectedCompany.companyName,
-        module_wattage: selectedCompany.moduleWattage,
-        module_type: selectedCompany.moduleType,
-        cells_per_module: selectedCompany.cellsPerModule,
-        cells_received_qty: selectedCompany.cellsReceivedQty || 0,
-        cells_received_mw: selectedCompany.cellsReceivedMW || 0,
+        company_id: selectedCompany.id,
         start_date: pdfDateRange.startDate,
         end_date: pdfDateRange.endDate,
-        production_records: filteredRecords.map(r => ({
-          date: r.date,
-          day_production: r.dayProduction || 0,
-          night_production: r.nightProduction || 0,
-          cell_rejection_percent: r.cellRejectionPercent || 0,
-          module_rejection_percent: r.moduleRejectionPercent || 0,
-          pdi: r.pdi || ''
-        })),
-        cell_stock: calculateCellStock(),
-        total_mw: totalMW,
-        total_rejected_modules: sortedRejections.length,
-        rejected_modules: sortedRejections.map(rej => ({
-          serial_number: rej.serialNumber,
-          rejection_date: rej.rejectionDate,
-          reason: rej.reason,
-          stage: rej.stage
-        })),
         remarks: reportData.remarks || '',
         report_options: reportOptions
       };
@@ -617,64 +578,11 @@ function DailyReport() {
     try {
       setLoading(true);
       
-      const filteredRecords = selectedCompany.productionRecords.filter(record => {
-        const recordDate = new Date(record.date);
-        const start = new Date(pdfDateRange.startDate);
-        const end = new Date(pdfDateRange.endDate);
-        return recordDate >= start && recordDate <= end;
-      });
-
-      const filteredRejections = selectedCompany.rejectedModules.filter(rej => {
-        const rejDate = new Date(rej.rejectionDate);
-        const start = new Date(pdfDateRange.startDate);
-        const end = new Date(pdfDateRange.endDate);
-        return rejDate >= start && rejDate <= end;
-      });
-
-      const sortedRejections = filteredRejections.sort((a, b) => {
-        const dateCompare = new Date(a.rejectionDate) - new Date(b.rejectionDate);
-        if (dateCompare !== 0) return dateCompare;
-        return a.serialNumber.localeCompare(b.serialNumber);
-      });
-
-      const totalProduction = filteredRecords.reduce((sum, r) => 
-        sum + (r.dayProduction || 0) + (r.nightProduction || 0), 0
-      );
-      
-      const totalMW = ((totalProduction * parseFloat(selectedCompany.moduleWattage)) / 1000000).toFixed(2);
-
+      // Records and rejections are read server-side for the selected range
       const payload = {
-        company: {
-          name: selectedCompany.companyName,
-          address: selectedCompany.address || 'N/A',
-          contact: selectedCompany.contact || 'N/A',
-          module_wattage: selectedCompany.moduleWattage,
-          module_type: selectedCompany.moduleType,
-          cells_per_module: selectedCompany.cellsPerModule
-        },
-        production_data: filteredRecords.map(r => ({
-          date: r.date,
-          day_of_week: new Date(r.date).toLocaleDateString('en-US', { weekday: 'long' }),
-          day_production: r.dayProduction || 0,
-          night_production: r.nightProduction || 0,
-          cell_rejection_percent: (r.cellRejectionPercent || 0) / 100,
-          module_rejection_percent: (r.moduleRejectionPercent || 0) / 100,
-          cells_rejected: Math.round(((r.dayProduction || 0) + (r.nightProduction || 0)) * 132 * (r.cellRejectionPercent || 0) / 100),
-          modules_rejected: Math.round(((r.dayProduction || 0) + (r.nightProduction || 0)) * (r.moduleRejectionPercent || 0) / 100)
-        })),
-        rejections: sortedRejections.map((rej, index) => ({
-          no: index + 1,
-          date: rej.rejectionDate,
-          serial: rej.serialNumber,
-          reason: rej.reason,
-          stage: rej.stage,
-          defect_type: rej.defectType || 'Minor',
-          remarks: rej.remarks || ''
-        })),
+        company_id: selectedCompany.id,
         start_date: pdfDateRange.startDate,
         end_date: pdfDateRange.endDate,
-        cells_received_qty: selectedCompany.cellsReceivedQty || 0,
-        cells_received_mw: selectedCompany.cellsReceivedMW || 0,
         report_options: reportOptions
       };
 
@@ -741,11 +649,11 @@ function DailyReport() {
               )}
               <div className="info-row">
                 <span className="info-label">📊 Production Records</span>
-                <span className="info-value highlight-blue">{company.productionRecords?.length || 0}</span>
+                <span className="info-value highlight-blue">{company.productionRecordCount || 0}</span>
               </div>
               <div className="info-row">
                 <span className="info-label">🚫 Rejections</span>
-                <span className="info-value highlight-red">{company.rejectedModules?.length || 0}</span>
+                <span className="info-value highlight-red">{company.rejectedModuleCount || 0}</span>
               </div>
             </div>
             <div className="card-actions">
@@ -59,6 +59,20 @@ const FTRDeliveredUpload = () => {
       if (data.rejected_warning) {
         successMsg += `\n⚠️ ${data.rejected_warning}`;
       }
+      if (data.delivered_warning) {
+        successMsg += `\n⚠️ ${data.delivered_warning}`;
+      }
+
+      // Download the complete not found / conflict lists
+      if (data.conflict_report_url) {
+        successMsg += `\n📄 Full conflict list downloaded`;
+        const a = document.createElement('a');
+        a.href = `http://backend.gspl.cloud${data.conflict_report_url}`;
+        a.download = '';
+        document.body.appendChild(a);
+        a.click();
+        document.body.removeChild(a);
+      }
 
       setMessage({ text: successMsg, type: 'success' });
       setTimeout(() => setMessage({ text: '', type: '' }), 8000);
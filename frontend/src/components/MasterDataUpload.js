@@ -34,31 +34,41 @@ const MasterDataUpload = () => {
     setUploadProgress({ percent: 0, status: 'Reading Excel file...', current: 0, total: 0 });
     setMessage({ text: '', type: '' });
 
-    // Start polling for backend progress
+    // Poll the background upload job until it finishes
     let pollInterval = null;
-    const startPolling = (orderId) => {
+    const waitForJob = (jobId) => new Promise((resolve, reject) => {
       pollInterval = setInterval(async () => {
         try {
-          const response = await fetch(`http://backend.gspl.cloud/api/master/upload-progress/${orderId}`);
+          const response = await fetch(`http://backend.gspl.cloud/api/master/upload-jobs/${jobId}`);
           const progress = await response.json();
-          
-          if (progress.percent > 50) {
-            setUploadProgress({
-              percent: 50 + (progress.percent / 2), // Scale 0-100 backend to 50-100 frontend
-              status: progress.status || `Processing: ${progress.current.toLocaleString()} / ${progress.total.toLocaleString()} rows`,
-              current: progress.current,
-              total: progress.total
-            });
+
+          if (!response.ok) {
+            clearInterval(pollInterval);
+            reject(new Error(progress.error || 'Failed to get upload progress'));
+            return;
           }
-          
-          if (progress.percent === 100) {
+
+          const eta = progress.eta_seconds ? ` - ETA ${Math.ceil(progress.eta_seconds)}s` : '';
+          const speed = progress.rows_per_sec ? ` (${Math.round(progress.rows_per_sec).toLocaleString()} rows/s${eta})` : '';
+          setUploadProgress({
+            percent: 50 + (progress.percent / 2), // Scale 0-100 backend to 50-100 frontend
+            status: `${progress.status}${speed}`,
+            current: progress.current,
+            total: progress.total
+          });
+
+          if (progress.state === 'completed') {
+            clearInterval(pollInterval);
+            resolve(progress.result);
+          } else if (progress.state === 'failed' || progress.state === 'cancelled') {
             clearInterval(pollInterval);
+            reject(new Error(progress.error || progress.status));
           }
         } catch (error) {
           console.error('Polling error:', error);
         }
       }, 2000); // Poll every 2 seconds
-    };
+    });
 
     try {
       const formDataObj = new FormData();
@@ -90,41 +100,22 @@ const MasterDataUpload = () => {
         xhr.onload = () => resolve(xhr);
         xhr.onerror = () => reject(new Error('Upload failed'));
         
-        // Start processing indication after upload completes
-        xhr.onreadystatechange = () => {
-          if (xhr.readyState === 4) {
-            if (xhr.status === 200 || xhr.status === 201) {
-              setUploadProgress(prev => ({ 
-                ...prev,
-                percent: 100, 
-                status: 'Upload complete! ✅' 
-              }));
-            }
-          }
-        };
-        
         xhr.send(formDataObj);
       });
 
-      if (response.status !== 200 && response.status !== 201) {
-        const result = JSON.parse(response.responseText);
-        throw new Error(result.error || 'Failed to upload data');
-      }
+      const accepted = JSON.parse(response.responseText);
 
-      const result = JSON.parse(response.responseText);
-
-      if (!response.ok) {
-        clearInterval(pollInterval);
-        throw new Error(result.error || 'Failed to upload data');
+      if (response.status !== 202) {
+        throw new Error(accepted.error || 'Failed to upload data');
       }
 
-      // Start polling backend progress
-      if (result.order && result.order.id) {
-        startPolling(result.order.id);
-      }
+      // File is on the server; rows are processed by a background job
+      setUploadProgress({ percent: 50, status: 'Waiting for processing to start...', current: 0, total: 0 });
+      const order = await waitForJob(accepted.job_id);
 
+      setUploadProgress(prev => ({ ...prev, percent: 100, status: 'Upload complete! ✅' }));
       setMessage({ 
-        text: `✅ Successfully uploaded ${result.order.total_modules} modules! FTR: ${result.order.ftr_count}, Rejected: ${result.order.rejection_count}`, 
+        text: `✅ Successfully uploaded ${order.total_modules} modules! FTR: ${order.ftr_count}, Rejected: ${order.rejection_count}`, 
         type: 'success' 
       });
       
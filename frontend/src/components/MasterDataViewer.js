@@ -11,6 +11,8 @@ const MasterDataViewer = () => {
   const [loading, setLoading] = useState(false);
   const [message, setMessage] = useState({ text: '', type: '' });
   const [editModule, setEditModule] = useState(null);
+  // cursors[n] = keyset cursor ("after") that loads page n + 1
+  const [cursors, setCursors] = useState([null]);
   const modulesPerPage = 50;
 
   useEffect(() => {
@@ -39,11 +41,15 @@ const MasterDataViewer = () => {
   const fetchModules = async () => {
     setLoading(true);
     try {
-      const offset = (currentPage - 1) * modulesPerPage;
-      let url = `http://backend.gspl.cloud/api/master/modules/${selectedOrder}?limit=${modulesPerPage}&offset=${offset}`;
+      // Keyset paging: every page is as fast as the first one
+      const cursor = cursors[currentPage - 1];
+      let url = `http://backend.gspl.cloud/api/master/modules/${selectedOrder}?limit=${modulesPerPage}`;
       
+      if (cursor !== null && cursor !== undefined) {
+        url += `&after=${cursor}`;
+      }
       if (searchSerial) {
-        url += `&search=${searchSerial}`;
+        url += `&search=${encodeURIComponent(searchSerial)}`;
       }
 
       const response = await fetch(url);
@@ -51,7 +57,12 @@ const MasterDataViewer = () => {
       
       if (response.ok) {
         setModules(result.modules);
-        setTotalPages(Math.ceil(result.total / modulesPerPage));
+        setTotalPages(Math.max(1, Math.ceil(result.total / modulesPerPage)));
+        setCursors(prev => {
+          const next = prev.slice(0, currentPage);
+          next[currentPage] = result.next_cursor;
+          return next;
+        });
       }
     } catch (error) {
       console.error('Error fetching modules:', error);
@@ -152,6 +163,7 @@ const MasterDataViewer = () => {
                 onClick={() => {
                   setSelectedOrder(order.id);
                   setCurrentPage(1);
+                  setCursors([null]);
                 }}
               >
                 <h3>{order.company_name}</h3>
@@ -187,6 +199,7 @@ const MasterDataViewer = () => {
               onChange={(e) => {
                 setSearchSerial(e.target.value);
                 setCurrentPage(1);
+                setCursors([null]);
               }}
             />
           </div>
@@ -251,7 +264,7 @@ const MasterDataViewer = () => {
                 <span>Page {currentPage} of {totalPages}</span>
                 <button 
                   onClick={() => setCurrentPage(prev => Math.min(totalPages, prev + 1))}
-                  disabled={currentPage === totalPages}
+                  disabled={currentPage === totalPages || !cursors[currentPage]}
                 >
                   Next →
                 </button>
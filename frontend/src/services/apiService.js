@@ -272,11 +272,13 @@ export const companyService = {
   },
 
   /**
-   * Get single company
+   * Get single company (summary only unless collections are requested)
+   * @param {number} companyId
+   * @param {Object} params - e.g. { include: 'production_records,rejected_modules' }
    */
-  getCompany: async (companyId) => {
+  getCompany: async (companyId, params = {}) => {
     try {
-      const response = await apiClient.get(`/companies/${companyId}`);
+      const response = await apiClient.get(`/companies/${companyId}`, { params });
       return response.data;
     } catch (error) {
       console.error('Failed to fetch company:', error);